@@ -0,0 +1,460 @@
+"""
+Load test for a single LitSynth node
+
+Drives concurrent arun_literature_review executions at a configurable
+arrival rate through the real pipeline (ADK runners, sessions, tool calls,
+sandboxed PDF parsing, checkpoints) with two local stand-ins:
+
+    - FakeModel replaces Gemini on every agent: it answers after a
+      simulated latency, can inject errors, and makes the analyzer call
+      afetch_pdf exactly like the real model does
+    - PDFServer (benchmarks/synthetic.py) serves synthetic PDFs with
+      injected latency and error rates
+
+Reviews arrive as a Poisson process and wait for one of --concurrency
+slots. For every arrival rate it reports p50/p95/p99 end-to-end, queue and
+per-phase latency, throughput, error rates and peak RSS, as a summary and
+optionally as JSON for trend tracking.
+
+Usage:
+    python benchmarks/loadtest.py --reviews 20 --concurrency 4 --rate 0.5
+    python benchmarks/loadtest.py --reviews 40 --concurrency 8 --rate 0.25,0.5,1,2 --json load.json
+    python benchmarks/loadtest.py --model-error-rate 0.02 --pdf-error-rate 0.1
+"""
+
+import argparse
+import asyncio
+import atexit
+import json
+import logging
+import os
+import platform
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+LAUNCH_DIR = os.getcwd()
+
+# Isolate load-test runs from the user's library, caches, run directories and
+# log: everything LitSynth writes goes under the temporary data directory
+WORK_DIR = tempfile.mkdtemp(prefix="litsynth-load-")
+atexit.register(shutil.rmtree, WORK_DIR, ignore_errors=True)
+os.environ["LITSYNTH_DATA_DIR"] = os.path.join(WORK_DIR, "data")
+os.environ.setdefault("GOOGLE_API_KEY", "offline-load-test")
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARK_DIR), "src"))
+os.chdir(WORK_DIR)
+
+from google.adk.models.base_llm import BaseLlm  # noqa: E402
+from google.adk.models.llm_request import LlmRequest  # noqa: E402
+from google.adk.models.llm_response import LlmResponse  # noqa: E402
+from google.genai import types  # noqa: E402
+
+import agent  # noqa: E402
+from observability import current_rss_bytes  # noqa: E402
+
+from synthetic import PDFServer, make_authors, make_draft, make_pdf_corpus  # noqa: E402
+
+# Documents cited by fake discovery answers (served by the local PDF server)
+PDF_MIX = ("paper_12p.pdf", "paper_12p.pdf", "paper_12p.pdf", "paper_60p.pdf")
+
+PERCENTILES = (50, 95, 99)
+
+# RSS sampling interval (seconds)
+RSS_INTERVAL = 0.1
+
+
+class FakeModelError(Exception):
+    """Injected model backend failure"""
+
+
+class FakeBackend:
+    """
+    Shared state of the fake model: latency, error injection and counters.
+
+    Args:
+        latency: Mean simulated latency per model call (seconds)
+        error_rate: Share of model calls that raise FakeModelError
+        pdf_base_url: Base URL of the local PDF server
+        draft_words: Length of generated synthesis drafts
+        seed: Seed of the latency/error generator
+    """
+
+    def __init__(self, latency: float, error_rate: float, pdf_base_url: str,
+                 draft_words: int, seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.pdf_base_url = pdf_base_url
+        self.draft_words = draft_words
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        self.calls: Dict[str, int] = {}
+        self.injected_errors = 0
+        self.pdf_failures = 0
+
+    async def call(self, role: str):
+        """Simulates one model round trip; raises on an injected error"""
+        self.calls[role] = self.calls.get(role, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency * (0.5 + self.rng.random()))
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.injected_errors += 1
+            raise FakeModelError(f"Injected {role} model error (503 UNAVAILABLE)")
+
+    def discovery_answer(self, prompt: str) -> str:
+        match = re.search(r"Find (\d+) highly relevant academic papers about: (.+?)\.\s", prompt)
+        count, topic = (int(match.group(1)), match.group(2)) if match else (5, "unknown topic")
+        papers = []
+        for i in range(count):
+            pdf = self.rng.choice(PDF_MIX)
+            papers.append({
+                "title": f"{topic.title()}: {self.rng.choice(('Methods', 'Benchmarks', 'A Survey'))} {i + 1}",
+                "authors": make_authors(self.rng.randint(1, 6)),
+                "year": self.rng.randint(2015, 2024),
+                "venue": self.rng.choice(("NeurIPS", "ICML", "ACL", "arXiv")),
+                "abstract": f"We study {topic} and report results on standard benchmarks.",
+                # A unique URL per paper keeps the library and analysis cache cold
+                "url": f"{self.pdf_base_url}/{pdf}?paper={topic.replace(' ', '-')}-{i}",
+            })
+        return f"```json\n{json.dumps(papers, indent=2)}\n```"
+
+    def analysis_answer(self, prompt: str, fetched: Dict) -> str:
+        title = re.search(r"^Title: (.*)$", prompt, re.MULTILINE)
+        title = title.group(1) if title else "Unknown"
+        if fetched.get("status") != "success":
+            self.pdf_failures += 1
+            return f"**Summary**: Could not read the full text of {title} ({fetched.get('message')}); " \
+                   "the analysis is based on the abstract only."
+        return (
+            f"**Summary**: {title} ({fetched.get('page_count')} pages).\n"
+            f"**Methodology**: {make_draft(60, seed=len(title))}\n"
+            f"**Key Findings**: {make_draft(60, seed=len(title) + 1)}\n"
+            "**Limitations**: Evaluated on synthetic data only."
+        )
+
+
+def _text_of(content: types.Content) -> str:
+    return "".join(part.text for part in content.parts or [] if part.text)
+
+
+class FakeModel(BaseLlm):
+    """Offline stand-in for Gemini that answers in the role of one agent"""
+
+    role: str
+    backend: Any
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        await self.backend.call(self.role)
+
+        prompt = next(
+            (_text_of(c) for c in reversed(llm_request.contents) if c.role == "user" and _text_of(c)), ""
+        )
+        parts = (llm_request.contents[-1].parts or []) if llm_request.contents else []
+        tool_result = next((p.function_response.response for p in parts if p.function_response), None)
+
+        if self.role == "discovery":
+            text = self.backend.discovery_answer(prompt)
+        elif self.role == "analyzer" and tool_result is None:
+            # First turn: fetch the paper through the real tool
+            url = re.search(r"^URL: (.*)$", prompt, re.MULTILINE)
+            call = types.FunctionCall(name="afetch_pdf", args={"url": url.group(1) if url else ""})
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(function_call=call)]))
+            return
+        elif self.role == "analyzer":
+            text = self.backend.analysis_answer(prompt, tool_result)
+        elif self.role == "synthesis":
+            text = make_draft(self.backend.draft_words, seed=len(prompt))
+        else:
+            text = "The draft meets the quality bar (score 9.0/10)."
+
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+def install_fake_model(backend: FakeBackend):
+    """Points every pipeline agent at the fake backend"""
+    # gemini-2.x names keep google_search's model check satisfied
+    for role, llm_agent in (
+        ("discovery", agent.paper_discovery_agent),
+        ("analyzer", agent.paper_analyzer_agent),
+        ("synthesis", agent.synthesis_agent),
+        ("refinement", agent.refinement_agent),
+    ):
+        llm_agent.model = FakeModel(model=f"{agent.MODEL_NAME}-fake", role=role, backend=backend)
+
+
+def _rss_of(pid) -> int:
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _child_pids() -> List[str]:
+    pid = os.getpid()
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children", "r") as f:
+            return f.read().split()
+    except OSError:
+        return []
+
+
+class RssSampler:
+    """Peak RSS of this process and of this process plus its parse workers"""
+
+    def __init__(self, interval: float = RSS_INTERVAL):
+        self.interval = interval
+        self.peak_main = 0
+        self.peak_total = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        main = current_rss_bytes() or 0
+        total = main + sum(_rss_of(pid) for pid in _child_pids())
+        self.peak_main = max(self.peak_main, main)
+        self.peak_total = max(self.peak_total, total)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "RssSampler":
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile of values (None when empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def latency_stats(values: List[float]) -> Dict:
+    stats = {f"p{q}": percentile(values, q) for q in PERCENTILES}
+    stats["mean"] = sum(values) / len(values) if values else None
+    stats["max"] = max(values) if values else None
+    stats["count"] = len(values)
+    return {k: round(v, 3) if isinstance(v, float) else v for k, v in stats.items()}
+
+
+def _topic(rng: random.Random) -> str:
+    # Words no other review shares, so the library never answers discovery
+    return " ".join("".join(rng.choice("bcdfghjklmnpqrstvwxz") + rng.choice("aeiou") for _ in range(3))
+                    for _ in range(2))
+
+
+async def run_level(rate: float, reviews: int, concurrency: int, max_papers: int, seed: int) -> List[Dict]:
+    """Runs reviews arriving at rate per second (0: all at once) with a concurrency cap"""
+    rng = random.Random(seed)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def review(topic: str) -> Dict:
+        arrived = time.perf_counter()
+        current = {"phase": "queued"}
+
+        def on_event(event_type: str, data: Dict):
+            if event_type == "phase":
+                current["phase"] = data["phase"]
+
+        async with slots:
+            started = time.perf_counter()
+            record = {"queue_wait": started - arrived}
+            try:
+                result = await agent.arun_literature_review(
+                    topic, max_papers, on_progress=lambda message: None, on_event=on_event
+                )
+                record.update(ok=True, phases=result.phase_seconds)
+            except Exception as e:
+                record.update(ok=False, phase=current["phase"], error=type(e).__name__)
+        record["end_to_end"] = time.perf_counter() - arrived
+        return record
+
+    tasks = []
+    for _ in range(reviews):
+        tasks.append(asyncio.create_task(review(_topic(rng))))
+        if rate:
+            await asyncio.sleep(rng.expovariate(rate))
+    return await asyncio.gather(*tasks)
+
+
+def summarize(rate: float, concurrency: int, records: List[Dict], wall: float, backend: FakeBackend,
+              pdf_stats: Dict, rss: RssSampler) -> Dict:
+    completed = [r for r in records if r["ok"]]
+    failed = [r for r in records if not r["ok"]]
+
+    errors: Dict[str, int] = {}
+    for record in failed:
+        key = f"{record['phase']}:{record['error']}"
+        errors[key] = errors.get(key, 0) + 1
+
+    phase_names = []
+    for record in completed:
+        phase_names.extend(name for name in record["phases"] if name not in phase_names)
+    service = [r["end_to_end"] - r["queue_wait"] for r in completed]
+
+    return {
+        "rate_per_s": rate,
+        "concurrency": concurrency,
+        "reviews": len(records),
+        "completed": len(completed),
+        "failed": len(failed),
+        "error_rate": round(len(failed) / len(records), 4) if records else 0.0,
+        "errors": dict(sorted(errors.items())),
+        "wall_seconds": round(wall, 3),
+        "throughput_per_hour": round(len(completed) / wall * 3600, 1) if wall else 0.0,
+        "latency_s": {
+            "end_to_end": latency_stats([r["end_to_end"] for r in completed]),
+            "queue_wait": latency_stats([r["queue_wait"] for r in records]),
+            "service": latency_stats(service),
+            "phases": {
+                name: latency_stats([r["phases"][name] for r in completed if name in r["phases"]])
+                for name in phase_names
+            },
+        },
+        "model": {
+            "calls": dict(sorted(backend.calls.items())),
+            "injected_errors": backend.injected_errors,
+        },
+        "pdf": {
+            **pdf_stats,
+            "failed_fetches": backend.pdf_failures,
+        },
+        "peak_rss_mb": {
+            "main": round(rss.peak_main / (1024 * 1024), 1),
+            "with_workers": round(rss.peak_total / (1024 * 1024), 1),
+        },
+    }
+
+
+def is_saturated(level: Dict) -> bool:
+    """Reviews wait for a slot longer than the median review takes to run"""
+    wait = level["latency_s"]["queue_wait"]["p95"]
+    service = level["latency_s"]["service"]["p50"]
+    return wait is not None and service is not None and wait > service
+
+
+def print_summary(levels: List[Dict]):
+    def ms(stats: Dict, key: str) -> str:
+        return f"{stats[key]:.2f}" if stats.get(key) is not None else "-"
+
+    print(f"\n{'rate/s':>7} {'conc':>5} {'done':>5} {'fail':>5} {'reviews/h':>10} "
+          f"{'e2e p50':>8} {'p95':>8} {'p99':>8} {'wait p95':>9} {'RSS MB':>8}")
+    for level in levels:
+        e2e = level["latency_s"]["end_to_end"]
+        rate = f"{level['rate_per_s']:g}" if level["rate_per_s"] else "burst"
+        flag = "  ← saturated" if is_saturated(level) else ""
+        print(f"{rate:>7} {level['concurrency']:>5} {level['completed']:>5} {level['failed']:>5} "
+              f"{level['throughput_per_hour']:>10,.0f} {ms(e2e, 'p50'):>8} {ms(e2e, 'p95'):>8} "
+              f"{ms(e2e, 'p99'):>8} {ms(level['latency_s']['queue_wait'], 'p95'):>9} "
+              f"{level['peak_rss_mb']['with_workers']:>8.0f}{flag}")
+
+    for level in levels:
+        rate = f"{level['rate_per_s']:g}/s" if level["rate_per_s"] else "burst"
+        print(f"\n📊 Rate {rate}: per-phase latency (s)")
+        for name, stats in level["latency_s"]["phases"].items():
+            print(f"  {name:<11} p50 {ms(stats, 'p50'):>7}  p95 {ms(stats, 'p95'):>7}  p99 {ms(stats, 'p99'):>7}")
+        print(f"  model calls {sum(level['model']['calls'].values())}, "
+              f"injected model errors {level['model']['injected_errors']}, "
+              f"PDF requests {level['pdf']['requests']}, failed fetches {level['pdf']['failed_fetches']}")
+        if level["errors"]:
+            print("  failed reviews (phase:error): " +
+                  ", ".join(f"{key} ×{count}" for key, count in level["errors"].items()))
+
+    saturated = [level for level in levels if is_saturated(level)]
+    if saturated:
+        first = saturated[0]
+        rate = f"{first['rate_per_s']:g} reviews/s" if first["rate_per_s"] else "burst arrivals"
+        print(f"\n⚠️  Saturated from {rate}: queue wait p95 exceeds the median review time")
+    else:
+        print("\n✅ No tested rate saturated the node")
+
+
+def machine_info() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline load test for a single LitSynth node")
+    parser.add_argument("--reviews", type=int, default=20, help="Reviews per arrival rate")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum reviews running at once")
+    parser.add_argument("--rate", default="0.5",
+                        help="Arrival rates in reviews/s, comma-separated (0: all arrive at once)")
+    parser.add_argument("--papers", type=int, default=3, help="Papers analyzed per review")
+    parser.add_argument("--model-latency", type=float, default=0.2, help="Mean fake model latency (s)")
+    parser.add_argument("--model-error-rate", type=float, default=0.0, help="Share of failing model calls")
+    parser.add_argument("--pdf-latency", type=float, default=0.05, help="Mean PDF server latency (s)")
+    parser.add_argument("--pdf-error-rate", type=float, default=0.0, help="Share of PDF requests answered 503")
+    parser.add_argument("--draft-words", type=int, default=1500, help="Words per synthesized draft")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--verbose", action="store_true", help="Keep LitSynth's INFO logging")
+    args = parser.parse_args()
+
+    rates = [float(rate) for rate in args.rate.split(",") if rate.strip()]
+    if not args.verbose:
+        logging.getLogger("LitSynth").setLevel(logging.WARNING)
+        # ADK warns about tool parameter defaults on every model request
+        logging.getLogger("google.adk").setLevel(logging.ERROR)
+
+    pdf_dir = os.path.join(WORK_DIR, "pdfs")
+    make_pdf_corpus(pdf_dir)
+    levels = []
+    with PDFServer(pdf_dir, latency=args.pdf_latency, error_rate=args.pdf_error_rate, seed=args.seed) as server:
+        backend = FakeBackend(args.model_latency, args.model_error_rate, server.base_url,
+                              args.draft_words, seed=args.seed)
+        install_fake_model(backend)
+
+        for i, rate in enumerate(rates):
+            print(f"🚦 {args.reviews} reviews at {rate:g}/s, concurrency {args.concurrency}...", flush=True)
+            backend.reset()
+            before = server.stats
+            with RssSampler() as rss:
+                started = time.perf_counter()
+                records = asyncio.run(run_level(rate, args.reviews, args.concurrency, args.papers, args.seed + i))
+                wall = time.perf_counter() - started
+            pdf_stats = {key: server.stats[key] - before[key] for key in before}
+            levels.append(summarize(rate, args.concurrency, records, wall, backend, pdf_stats, rss))
+
+    print_summary(levels)
+
+    if args.json:
+        with open(os.path.join(LAUNCH_DIR, args.json), "w", encoding="utf-8") as f:
+            json.dump({
+                "recorded": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "machine": machine_info(),
+                "config": {k: v for k, v in vars(args).items() if k not in ("json", "verbose")},
+                "levels": levels,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"\n💾 Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Synthetic inputs and local stand-ins for LitSynth benchmarks
+
+Everything here is deterministic and offline: generated drafts, author
+lists and PDFs, plus a local HTTP server that serves PDFs with Range
+support and optional injected latency and error rates.
+"""
+
+import functools
+import json
+import os
+import random
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import fitz  # pymupdf
+
+VOCABULARY = (
+    "attention transformer model sequence encoder decoder training data "
+    "performance benchmark method approach results analysis language graph "
+    "neural network representation learning evaluation baseline dataset"
+).split()
+
+SECTIONS = (
+    "Introduction", "Major Themes and Trends", "Methodological Approaches",
+    "Key Findings and Contributions", "Research Gaps and Limitations",
+    "Conclusion and Future Directions",
+)
+
+
+def make_draft(words: int, seed: int = 0) -> str:
+    """Literature-review-shaped markdown with headers and (Author, Year) citations"""
+    rng = random.Random(seed)
+    per_section = max(1, words // len(SECTIONS))
+    parts = []
+    for section in SECTIONS:
+        parts.append(f"## {section}\n")
+        sentence = []
+        for i in range(per_section):
+            sentence.append(rng.choice(VOCABULARY))
+            if i % 40 == 39:
+                sentence.append(f"(Author{rng.randint(1, 50)}, {rng.randint(2015, 2024)}).")
+            if i % 120 == 119:
+                parts.append(" ".join(sentence) + "\n")
+                sentence = []
+        parts.append(" ".join(sentence) + "\n")
+    return "\n".join(parts)
+
+
+def make_authors(count: int) -> list:
+    """Large collaboration-style author lists ("First Middle Last")"""
+    return [f"Author{i} M. Lastname{i}" for i in range(count)]
+
+
+def make_paper_dicts(count: int, seed: int = 0) -> list:
+    """
+    Paper metadata dicts as they come out of json.loads: authors and venues
+    drawn from shared pools, but every string a separate object
+    """
+    rng = random.Random(seed)
+    authors = [f"Author{i} M. Lastname{i}" for i in range(2_000)]
+    venues = [f"Proceedings of Conference {i}" for i in range(50)]
+    papers = []
+    for i in range(count):
+        papers.append(json.loads(json.dumps({
+            "title": f"Paper {i} on {' '.join(rng.sample(VOCABULARY, 4))}",
+            "authors": rng.sample(authors, rng.randint(2, 8)),
+            "year": rng.randint(2010, 2024),
+            "venue": rng.choice(venues),
+            "url": f"https://arxiv.org/pdf/{2000 + i % 500}.{i:05d}",
+            "abstract": " ".join(rng.choice(VOCABULARY) for _ in range(40)),
+            "relevance_score": round(rng.random() * 10, 1),
+        })))
+    return papers
+
+
+def make_pdf(path: str, pages: int = 12, references: bool = True, seed: int = 0,
+             figures: bool = False):
+    """
+    Writes a paper-like PDF: running header, page numbers, a rotated arXiv
+    margin stamp, hyphenated body text and a references section. With
+    figures, every page gets an uncompressed image, which makes the file
+    large enough (> 2 MB) for in-place Range parsing.
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 40), "Journal of Synthetic Results, Vol 3 (2024)", fontsize=8)
+        y = 100
+        for line in range(45):
+            words = " ".join(rng.choice(VOCABULARY) for _ in range(11))
+            text = f"{words} mecha-" if line % 7 == 3 else f"nisms {words}."
+            page.insert_text((72, y), text, fontsize=9)
+            y += 15
+            if references and number == pages - 2 and line == 20:
+                page.insert_text((72, y), "References", fontsize=11)
+                y += 15
+        if references and number >= pages - 2:
+            page.insert_text(
+                (72, y),
+                "[1] A. Vaswani, N. Shazeer. Attention is all you need. NeurIPS, 2017. arXiv:1706.03762",
+                fontsize=8
+            )
+        page.insert_text((280, 820), str(number + 1), fontsize=8)
+        page.insert_text((10, 500), "arXiv:2401.01234v2 [cs.CL] 3 Jan 2024", fontsize=7, rotate=90)
+        if figures:
+            pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 120, 120), False)
+            pixmap.set_rect(pixmap.irect, (rng.randint(0, 255), 30, 60))
+            page.insert_image(fitz.Rect(300, 600, 420, 720), pixmap=pixmap)
+    doc.save(path, garbage=0, deflate=not figures)
+    doc.close()
+
+
+def make_pdf_corpus(directory: str) -> dict:
+    """Writes the benchmark PDFs (12 and 60 pages, 200-page figure-heavy thesis); returns {name: path}"""
+    os.makedirs(directory, exist_ok=True)
+    specs = {
+        "paper_12p.pdf": dict(pages=12, seed=12),
+        "paper_60p.pdf": dict(pages=60, seed=60),
+        "thesis_200p.pdf": dict(pages=200, seed=200, references=False, figures=True),
+    }
+    paths = {}
+    for name, spec in specs.items():
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            make_pdf(path, **spec)
+        paths[name] = path
+    return paths
+
+
+class _PDFHandler(SimpleHTTPRequestHandler):
+    """Serves files with single-range support, latency and error injection"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency * (0.5 + server.rng.random()))
+        if server.error_rate and server.rng.random() < server.error_rate:
+            self.send_error(503, "Injected error")
+            return
+
+        path = self.translate_path(self.path.split("?")[0])
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+
+        byte_range = self.headers.get("Range")
+        if byte_range and server.ranges:
+            start, _, end = byte_range.split("=", 1)[1].partition("-")
+            start = int(start)
+            end = min(int(end) if end else len(data) - 1, len(data) - 1)
+            body = data[start:end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        else:
+            body = data
+            self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with server.lock:
+            server.requests += 1
+            server.bytes_sent += len(body)
+
+
+class PDFServer:
+    """
+    Local HTTP stand-in for PDF hosts.
+
+    Args:
+        directory: Directory of PDFs to serve
+        latency: Mean injected latency per request (seconds)
+        error_rate: Share of requests answered with 503
+        ranges: Honour Range requests
+        seed: Seed of the latency/error generator
+    """
+
+    def __init__(self, directory: str, latency: float = 0.0, error_rate: float = 0.0,
+                 ranges: bool = True, seed: int = 0):
+        handler = functools.partial(_PDFHandler, directory=directory)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.server.error_rate = error_rate
+        self.server.ranges = ranges
+        self.server.rng = random.Random(seed)
+        self.server.lock = threading.Lock()
+        self.server.requests = 0
+        self.server.bytes_sent = 0
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    @property
+    def stats(self) -> dict:
+        return {"requests": self.server.requests, "bytes_sent": self.server.bytes_sent}
+
+    def __enter__(self) -> "PDFServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,359 @@
+"""
+Micro-benchmarks for the LitSynth tool layer
+
+Measures throughput and peak Python memory of evaluate_draft, extract_citation,
+format_authors_apa, paper record (de)serialization, library text reads and
+fetch_pdf text extraction on synthetic, offline inputs (PDFs are served by a local HTTP
+stand-in), and compares them against the baseline stored in
+benchmarks/baseline.json. Also reports the memory held by 10k paper records
+as plain dicts and as slotted Paper records.
+
+Usage:
+    python benchmarks/tool_benchmarks.py                    # compare with baseline
+    python benchmarks/tool_benchmarks.py --update-baseline  # record new baseline
+    python benchmarks/tool_benchmarks.py --only fetch_pdf --repeat 9
+
+Throughput is the median of a round of --repeat timed samples; the baseline
+holds the median of 1 + --retries rounds. Exits with status 1 when a case is
+slower than its baseline by more than the throughput tolerance (wider for
+cases whose calls take under a millisecond) or uses more memory than the
+memory tolerance allows, in its first round and in each of up to --retries
+more.
+Baselines are machine-specific: re-record them when the benchmark machine
+changes.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+# Isolate benchmark runs from the user's library and caches. fetch_pdf parses
+# in the sandboxed worker pool, as in production, so its peak memory covers
+# the calling process only
+WORK_DIR = tempfile.mkdtemp(prefix="litsynth-bench-")
+atexit.register(shutil.rmtree, WORK_DIR, ignore_errors=True)
+os.environ["LITSYNTH_DATA_DIR"] = os.path.join(WORK_DIR, "data")
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARK_DIR), "src"))
+
+from records import Paper, dumps_line, loads_line  # noqa: E402
+from storage.text_store import SegmentTextStore  # noqa: E402
+from tools.citation_tools import extract_citation, format_authors_apa  # noqa: E402
+from tools.evaluation_tools import evaluate_draft  # noqa: E402
+from tools.pdf_tools import fetch_pdf  # noqa: E402
+
+from synthetic import PDFServer, make_authors, make_draft, make_paper_dicts, make_pdf_corpus  # noqa: E402
+
+# short_throughput applies to cases whose calls take under SHORT_CALL_MS:
+# timer resolution, cache state and scheduler noise weigh more on them
+DEFAULT_TOLERANCE = {"throughput": 0.20, "short_throughput": 0.35, "memory": 0.20}
+SHORT_CALL_MS = 1.0
+
+# Short calls are timed in batches lasting at least this long
+MIN_SAMPLE_SECONDS = 0.25
+
+# Memory differences below this are noise, whatever the relative change
+MEMORY_SLACK_KB = 64
+
+# Peak memory is the lowest of this many runs (download threads make single peaks noisy)
+MEMORY_SAMPLES = 3
+
+# Records in the paper-record cases and the memory report
+RECORD_COUNT = 10_000
+
+
+class Case:
+    """One benchmark: a zero-argument callable plus the work units per call"""
+
+    def __init__(self, name: str, func, units: float, unit: str):
+        self.name = name
+        self.func = func
+        self.units = units
+        self.unit = unit
+
+
+def build_cases(server: PDFServer) -> list:
+    cases = []
+
+    for words in (1_000, 10_000, 100_000):
+        draft = make_draft(words)
+        titles = [f"Paper {i} on attention transformer models" for i in range(20)]
+        cases.append(Case(
+            f"evaluate_draft_{words // 1000}k_words",
+            lambda draft=draft, titles=titles: evaluate_draft(draft, titles),
+            len(draft.split()), "words"
+        ))
+
+    for count in (100, 1_000, 10_000):
+        authors = make_authors(count)
+        cases.append(Case(
+            f"format_authors_apa_{count}_authors",
+            lambda authors=authors: format_authors_apa(authors),
+            count, "authors"
+        ))
+        cases.append(Case(
+            f"extract_citation_{count}_authors",
+            lambda authors=authors: extract_citation(
+                "Scaling Laws for Collaborative Measurements", authors, 2023, "Physical Review D"
+            ),
+            count, "authors"
+        ))
+
+    papers = make_paper_dicts(RECORD_COUNT)
+    records = [Paper.from_dict(paper) for paper in papers]
+    records_path = os.path.join(WORK_DIR, "papers.jsonl")
+    cases.append(Case(
+        "paper_records_10k_from_dict",
+        lambda: [Paper.from_dict(paper) for paper in papers],
+        RECORD_COUNT, "records"
+    ))
+    def jsonl_roundtrip() -> int:
+        with open(records_path, "wb") as f:
+            f.writelines(dumps_line(record.to_dict()) for record in records)
+        with open(records_path, "rb") as f:
+            return sum(1 for line in f if Paper.from_dict(loads_line(line)))
+
+    cases.append(Case("paper_records_10k_jsonl_roundtrip", jsonl_roundtrip, RECORD_COUNT, "records"))
+
+    # Library texts: 500 papers of ~3,000 words in segment files
+    texts = SegmentTextStore(os.path.join(WORK_DIR, "texts"))
+    text_ids = [f"paper:{i}" for i in range(500)]
+    for i, paper_id in enumerate(text_ids):
+        texts.put(paper_id, make_draft(3_000, seed=i))
+    cases.append(Case(
+        "text_store_get_500_docs",
+        lambda: [texts.get(paper_id) for paper_id in text_ids],
+        len(text_ids), "docs"
+    ))
+
+    # Every call uses a fresh URL so the local library never serves a cached copy
+    counter = {"n": 0}
+
+    def fetch(name: str) -> dict:
+        counter["n"] += 1
+        result = fetch_pdf(f"{server.base_url}/{name}?run={counter['n']}")
+        if result["status"] != "success":
+            raise RuntimeError(f"fetch_pdf failed on {name}: {result['message']}")
+        return result
+
+    for name, pages in (("paper_12p.pdf", 12), ("paper_60p.pdf", 60)):
+        cases.append(Case(f"fetch_pdf_{pages}_pages", lambda name=name: fetch(name), pages, "pages"))
+    cases.append(Case("fetch_pdf_200_pages_range", lambda: fetch("thesis_200p.pdf"), 1, "docs"))
+
+    return cases
+
+
+def _calls_per_sample(func) -> int:
+    """Doubles the calls per timed sample until a sample lasts MIN_SAMPLE_SECONDS"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - started >= MIN_SAMPLE_SECONDS:
+            return number
+        number *= 2
+
+
+def measure(case: Case, repeat: int) -> dict:
+    """
+    Times one round of repeat samples of a case and measures its peak memory.
+
+    Returns:
+        dict: {"unit", "ops_per_sec", "median_ms", "peak_kb"}, throughput
+              from the median sample of the round
+    """
+    case.func()  # warm-up (imports, regex compilation, connection setup)
+    number = _calls_per_sample(case.func)
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            case.func()
+        timings.append((time.perf_counter() - started) / number)
+    # The median is robust to the odd sample slowed (or sped up) by other load
+    median = statistics.median(timings)
+
+    peaks = []
+    for _ in range(MEMORY_SAMPLES):
+        tracemalloc.start()
+        case.func()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    peak = min(peaks)
+
+    return {
+        "unit": case.unit,
+        "ops_per_sec": round(case.units / median, 2),
+        "median_ms": round(median * 1000, 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def record_memory(count: int = RECORD_COUNT) -> dict:
+    """Memory retained by count papers as json.loads dicts and as Paper records"""
+    report = {}
+    for label, build in (
+        ("dicts", lambda: make_paper_dicts(count)),
+        ("records", lambda: [Paper.from_dict(paper) for paper in make_paper_dicts(count)]),
+    ):
+        tracemalloc.start()
+        papers = build()
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report[f"{label}_kb"] = round(retained / 1024, 1)
+        del papers
+    report["saving"] = round(1 - report["records_kb"] / report["dicts_kb"], 3)
+    return report
+
+
+def measure_again(case: Case, repeat: int, previous: dict) -> dict:
+    """Measures another round of a case, keeping the faster round and the lowest peak"""
+    result = measure(case, repeat)
+    if previous["ops_per_sec"] > result["ops_per_sec"]:
+        result.update(ops_per_sec=previous["ops_per_sec"], median_ms=previous["median_ms"])
+    result["peak_kb"] = min(result["peak_kb"], previous["peak_kb"])
+    return result
+
+
+def measure_typical(case: Case, repeat: int, rounds: int) -> dict:
+    """Median round (by throughput) of several rounds of a case, with the lowest peak"""
+    results = sorted((measure(case, repeat) for _ in range(rounds)), key=lambda result: result["ops_per_sec"])
+    result = results[len(results) // 2]
+    result["peak_kb"] = min(result["peak_kb"] for result in results)
+    return result
+
+
+def compare(name: str, current: dict, baseline: dict, tolerance: dict) -> list:
+    """Returns regression messages for one case (empty when within tolerance)"""
+    problems = []
+    allowed = tolerance["throughput"]
+    if baseline["median_ms"] < SHORT_CALL_MS:
+        allowed = tolerance["short_throughput"]
+    floor = baseline["ops_per_sec"] * (1 - allowed)
+    if current["ops_per_sec"] < floor:
+        problems.append(
+            f"{name}: throughput {current['ops_per_sec']:.1f} {current['unit']}/s is below "
+            f"{floor:.1f} (baseline {baseline['ops_per_sec']:.1f}, -{allowed:.0%})"
+        )
+    ceiling = baseline["peak_kb"] * (1 + tolerance["memory"]) + MEMORY_SLACK_KB
+    if current["peak_kb"] > ceiling:
+        problems.append(
+            f"{name}: peak memory {current['peak_kb']:.0f} KB exceeds {ceiling:.0f} KB "
+            f"(baseline {baseline['peak_kb']:.0f} KB, +{tolerance['memory']:.0%})"
+        )
+    return problems
+
+
+def machine_info() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(terse=True),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="LitSynth tool-layer micro-benchmarks")
+    parser.add_argument("--update-baseline", action="store_true", help="Record results as the new baseline")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed samples per case (the median is used)")
+    parser.add_argument("--only", default="", help="Run only cases whose name contains this text")
+    parser.add_argument("--tolerance", type=float, help="Allowed throughput regression (e.g. 0.20)")
+    parser.add_argument("--memory-tolerance", type=float, help="Allowed peak memory growth (e.g. 0.20)")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="Extra rounds a case over tolerance gets before it counts as a regression "
+                             "(when recording a baseline, extra rounds of every case)")
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    tolerance = {**DEFAULT_TOLERANCE, **baseline.get("tolerance", {})}
+    if args.tolerance is not None:
+        tolerance["throughput"] = args.tolerance
+    if args.memory_tolerance is not None:
+        tolerance["memory"] = args.memory_tolerance
+
+    if baseline and baseline.get("machine") != machine_info():
+        print(f"⚠️  Baseline was recorded on {baseline.get('machine')}; numbers may not be comparable")
+
+    results = {}
+    problems = []
+    with PDFServer(os.path.join(WORK_DIR, "pdfs")) as server:
+        make_pdf_corpus(os.path.join(WORK_DIR, "pdfs"))
+        for case in build_cases(server):
+            if args.only not in case.name:
+                continue
+            if args.update_baseline:
+                # The baseline is a typical round, not a lucky one
+                result = measure_typical(case, args.repeat, 1 + args.retries)
+            else:
+                result = measure(case, args.repeat)
+            reference = baseline.get("cases", {}).get(case.name)
+            case_problems = []
+            if reference and not args.update_baseline:
+                case_problems = compare(case.name, result, reference, tolerance)
+            for _ in range(args.retries):
+                if not case_problems:
+                    break
+                # Other load on the machine can slow a whole round; only a
+                # regression that every round shows counts
+                result = measure_again(case, args.repeat, result)
+                case_problems = compare(case.name, result, reference, tolerance)
+            results[case.name] = result
+            problems.extend(case_problems)
+            status = "NEW " if reference is None else ("FAIL" if case_problems else "ok  ")
+            change = ""
+            if reference:
+                change = f"{result['ops_per_sec'] / reference['ops_per_sec'] - 1:+.0%}"
+            print(f"  [{status}] {case.name:<34} {result['ops_per_sec']:>14,.1f} {case.unit}/s "
+                  f"{change:>6}  {result['median_ms']:>10.3f} ms  {result['peak_kb']:>10,.1f} KB peak")
+
+    memory = None
+    if any(name.startswith("paper_records") for name in results):
+        memory = record_memory()
+        print(f"\n  Memory per {RECORD_COUNT:,} papers: {memory['dicts_kb']:,.0f} KB as dicts, "
+              f"{memory['records_kb']:,.0f} KB as Paper records ({memory['saving']:.0%} less)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"machine": machine_info(), "cases": results, "record_memory": memory}, f, indent=2)
+
+    if args.update_baseline:
+        cases = {**baseline.get("cases", {}), **results}
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump({
+                "recorded": time.strftime("%Y-%m-%d"),
+                "machine": machine_info(),
+                "tolerance": tolerance,
+                "cases": dict(sorted(cases.items())),
+            }, f, indent=2)
+            f.write("\n")
+        print(f"\n💾 Baseline written to {BASELINE_PATH}")
+        return 0
+
+    if problems:
+        print("\n❌ Regressions beyond tolerance:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+    print("\n✅ No regressions beyond tolerance")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
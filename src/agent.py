@@ -4,9 +4,15 @@ This is the main entry point that coordinates all the AI agents
 """
 
 import os
+import io
 import json
+import re
 import sys
-import logging
+import time
+import asyncio
+import contextvars
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
@@ -16,12 +22,26 @@ from google.adk.sessions import InMemorySessionService, Session
 from google.adk.tools.google_search_tool import google_search
 
 # Our custom tools for handling PDFs, citations, and evaluation
-from tools.pdf_tools import fetch_pdf
-from tools.citation_tools import extract_citation
+from tools.pdf_tools import afetch_pdf
+from tools.citation_tools import extract_citation, canonical_paper_id
 from tools.evaluation_tools import evaluate_draft
+from tools.ranking_tools import rank_candidates
 
 # Agent instructions and prompts
 from config.prompts import AGENT_PROMPTS
+from config import settings
+
+# Local paper library (first-tier discovery source)
+from storage.library import get_library
+from storage.citation_graph import get_citation_graph
+from storage.analysis_cache import AnalysisCache, analysis_version
+from storage.search_cache import SearchCache
+from storage.runs import JsonlArtifact, RunCheckpoint, new_run_id, run_directory
+from records import Analysis, Paper
+from observability import (PhaseMemoryMonitor, bind_log_context, capture_root_logging, reset_log_context,
+                           setup_logging)
+from model_routing import ModelRouter
+from context_cache import attach_review_corpus, create_context_cache, reset_review_corpus, use_review_corpus
 
 # Load API keys and environment variables
 load_dotenv()
@@ -34,25 +54,27 @@ if not API_KEY:
 # Set up the AI client with our API key
 client = genai.Client(api_key=API_KEY)
 
+# Synthesis and refinement reference each review's paper corpus through this cache
+context_cache = create_context_cache(client)
+
 # Session service keeps track of conversations and context
 session_service = InMemorySessionService()
 
-# Using the latest Gemini model for all our agents
-MODEL_NAME = "gemini-2.0-flash"
-
-# Setup logging for observability
-def setup_logging():
-    """Setup comprehensive logging for the agent system"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('litsynth.log'),
-            logging.StreamHandler()
-        ]
-    )
-    return logging.getLogger('LitSynth')
+# Each agent gets the model tier and generation settings configured in
+# model_inference_config (.agent_engine_config.json)
+model_router = ModelRouter()
+
+# Default model of every tier that does not name its own
+MODEL_NAME = model_router.default_model
 
+# Final review file (with header and ranking footer) in each run directory
+REVIEW_FILENAME = "literature_review.md"
+
+# Discovery asks for this many candidates per requested paper; the local
+# BM25 ranker then keeps only the top max_papers for analysis
+DISCOVERY_OVERFETCH = 3
+
+# Logging is configured once, from observability_config in .agent_engine_config.json
 logger = setup_logging()
 
 def initialize_system():
@@ -60,7 +82,8 @@ def initialize_system():
     print("🔬 LitSynth: AI-Powered Literature Review Co-pilot")
     print("=" * 60)
     print(f"✓ API Key loaded")
-    print(f"✓ Model: {MODEL_NAME}")
+    for name in ("PaperDiscoveryAgent", "PaperAnalyzerAgent", "SynthesisAgent", "RefinementAgent"):
+        print(f"✓ {name}: {model_router.model_for(name)} ({model_router.tier_for(name)} tier)")
     print(f"✓ Session service ready")
     print(f"✓ Logging enabled")
     print(f"✓ Custom tools loaded: PDF fetcher, citation extractor, draft evaluator")
@@ -74,35 +97,48 @@ def initialize_system():
 
 paper_discovery_agent = Agent(
     name="PaperDiscoveryAgent",
-    model=MODEL_NAME,
+    model=model_router.model_for("PaperDiscoveryAgent"),
+    generate_content_config=model_router.generate_config("PaperDiscoveryAgent"),
     instruction=AGENT_PROMPTS["paper_discovery"],
     tools=[google_search],
 )
 
 logger.info("PaperDiscoveryAgent initialized")
 
+# Search results are reused across runs until they expire or the discovery prompt or model
+# changes; results are stored under the version of the model that actually answered
+search_cache = SearchCache(analysis_version(AGENT_PROMPTS["paper_discovery"], paper_discovery_agent.model))
+
 # ============================================================================
 # AGENT 2: PAPER ANALYZER AGENT - Reads and analyzes papers
 # ============================================================================
 
 paper_analyzer_agent = Agent(
     name="PaperAnalyzerAgent",
-    model=MODEL_NAME,
+    model=model_router.model_for("PaperAnalyzerAgent"),
+    generate_content_config=model_router.generate_config("PaperAnalyzerAgent"),
     instruction=AGENT_PROMPTS["paper_analyzer"],
-    tools=[fetch_pdf, extract_citation],
+    tools=[afetch_pdf, extract_citation],
 )
 
 logger.info("PaperAnalyzerAgent initialized")
 
+# Analyses are reused across runs until the analyzer prompt or model changes; an analysis
+# is stored under the version of the model that actually wrote it, so one made on a
+# fallback tier is never served as the configured model's
+analysis_cache = AnalysisCache(analysis_version(AGENT_PROMPTS["paper_analyzer"], paper_analyzer_agent.model))
+
 # ============================================================================
 # AGENT 3: SYNTHESIS AGENT - Combines insights from multiple papers
 # ============================================================================
 
 synthesis_agent = Agent(
     name="SynthesisAgent",
-    model=MODEL_NAME,
+    model=model_router.model_for("SynthesisAgent"),
+    generate_content_config=model_router.generate_config("SynthesisAgent"),
     instruction=AGENT_PROMPTS["synthesis"],
     tools=[],
+    before_model_callback=attach_review_corpus,
 )
 
 logger.info("SynthesisAgent initialized")
@@ -113,9 +149,11 @@ logger.info("SynthesisAgent initialized")
 
 refinement_agent = Agent(
     name="RefinementAgent",
-    model=MODEL_NAME,
+    model=model_router.model_for("RefinementAgent"),
+    generate_content_config=model_router.generate_config("RefinementAgent"),
     instruction=AGENT_PROMPTS["refinement"],
     tools=[evaluate_draft],
+    before_model_callback=attach_review_corpus,
 )
 
 logger.info("RefinementAgent initialized")
@@ -145,6 +183,13 @@ refinement_loop = LoopAgent(
     max_iterations=3,
 )
 
+# Model calls per refinement iteration: one asking for evaluate_draft, one answering
+REFINEMENT_CALLS_PER_ITERATION = 2
+
+# A refinement answer shorter than this share of the draft is a verdict on
+# it or notes about it, not a rewritten draft
+MIN_REFINED_SHARE = 0.5
+
 logger.info("RefinementLoop initialized")
 
 # ============================================================================
@@ -168,7 +213,8 @@ def create_research_coordinator():
 
     root_agent = Agent(
         name="ResearchCoordinator",
-        model=MODEL_NAME,
+        model=model_router.model_for("ResearchCoordinator"),
+        generate_content_config=model_router.generate_config("ResearchCoordinator"),
         instruction=AGENT_PROMPTS["research_coordinator"],
         tools=[],  # Main agent delegates work to specialized agents
     )
@@ -177,159 +223,203 @@ def create_research_coordinator():
     return root_agent
 
 # ============================================================================
-# MAIN EXECUTION
+# PIPELINE HELPERS
 # ============================================================================
 
-def run_literature_review(topic: str, max_papers: int = 5):
+# Progress messages go to the callback of the review running in the current
+# task, so concurrent reviews in one event loop do not share stdout
+_progress: contextvars.ContextVar[Callable[[str], None]] = contextvars.ContextVar("progress", default=print)
+
+
+# Structured progress events (phase transitions, analyzed papers, draft
+# chunks) for the review running in the current task; None when unused
+_events: contextvars.ContextVar[Optional[Callable[[str, Dict], None]]] = contextvars.ContextVar("events", default=None)
+
+
+# Profiler of the review running in the current task (--profile); agents run
+# by that review get profiled copies of their tools, the shared agents are
+# never modified
+_profiler: contextvars.ContextVar = contextvars.ContextVar("profiler", default=None)
+
+
+def _report(message: str):
+    _progress.get()(message)
+
+
+def _emit(event_type: str, data: Dict):
+    on_event = _events.get()
+    if on_event is not None:
+        on_event(event_type, data)
+
+
+async def run_agent(agent, user_id: str, session_id: str, prompt: str, create_session: bool = True,
+                    on_text: Callable[[str], None] = None,
+                    on_tool_result: Callable[[str, Dict], None] = None,
+                    on_model: Callable[[str], None] = None) -> str:
     """
-    Executes a complete literature review for the given topic.
-    Uses the full multi-agent pipeline.
+    Runs one agent turn with the async ADK runner and collects its answer.
+
+    The turn runs on the agent's configured model tier, or on a faster one
+    when the current phase is over its latency budget; its duration is
+    recorded for that tier.
 
     Args:
-        topic: Research topic for literature review
-        max_papers: Maximum number of papers to analyze (default: 5)
+        agent: Agent to run
+        user_id: Session user
+        session_id: Session to run in
+        prompt: User message text
+        create_session: Create the session first (False to reuse one)
+        on_text: Called with each text chunk as it arrives
+        on_tool_result: Called with (tool name, response) of each tool call
+        on_model: Called with the name of the model the turn is routed to
 
     Returns:
-        str: Final literature review text
+        str: Concatenated text of all response events
     """
-    logger.info(f"Starting literature review for topic: {topic}")
-    
-    print(f"\n{'='*60}")
-    print(f"🔍 Starting Literature Review on: {topic}")
-    print(f"{'='*60}\n")
-
-    try:
-        # Create unique session
-        import random
-        session_id = f"litsynth_{topic.replace(' ', '_')[:20]}_{random.randint(1000, 9999)}"
-        user_id = "default_user"
+    routed_agent, tier, fallback = model_router.route(agent)
+    if fallback:
+        logger.info(f"{agent.name} over the phase latency budget, falling back to the {tier} tier")
+    if on_model is not None:
+        on_model(model_router.routed_model(agent.name, tier, fallback))
+    profiler = _profiler.get()
+    if profiler is not None:
+        routed_agent = profiler.instrument(routed_agent)
+
+    runner = Runner(
+        agent=routed_agent,
+        session_service=session_service,
+        app_name="LitSynth"
+    )
 
-        # Initialize session
+    if create_session:
         session_service.create_session(
             app_name="LitSynth",
             user_id=user_id,
             session_id=session_id
         )
 
-        logger.info(f"Session created: {session_id}")
+    message = types.Content(
+        parts=[types.Part(text=prompt)],
+        role="user"
+    )
 
-        # ========================================================================
-        # PHASE 1: PAPER DISCOVERY
-        # ========================================================================
-        print("📊 Phase 1: Discovering relevant papers...")
-        logger.info("Starting paper discovery phase")
+    text = ""
+    started = time.perf_counter()
+    try:
+        async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=message):
+            if on_tool_result is not None:
+                for response in event.get_function_responses():
+                    on_tool_result(response.name, response.response or {})
+            if hasattr(event, 'content') and event.content:
+                for part in event.content.parts:
+                    if hasattr(part, 'text') and part.text:
+                        text += part.text
+                        if on_text is not None:
+                            on_text(part.text)
+    except Exception:
+        model_router.record(agent.name, tier, time.perf_counter() - started, fallback, failed=True)
+        raise
+    model_router.record(agent.name, tier, time.perf_counter() - started, fallback)
+    return text
 
-        discovery_runner = Runner(
-            agent=paper_discovery_agent,
-            session_service=session_service,
-            app_name="LitSynth"
-        )
 
-# Update the discovery prompt to be more specific:
-        discovery_prompt = f"""Find {max_papers} highly relevant academic papers about: {topic}. 
+async def search_for_papers(topic: str, candidate_count: int, user_id: str, session_id: str,
+                            create_session: bool = False, use_cache: bool = True) -> list:
+    """
+    Runs PaperDiscoveryAgent (google_search) and parses its JSON answer.
 
-        CRITICAL: For each paper, extract COMPLETE metadata:
-        - Full title
-        - ALL authors (full names, not just first author)
-        - Exact publication year
-        - Specific venue/journal/conference name
-        - Direct PDF URL
+    Args:
+        topic: Research topic (or a reformulation of it)
+        candidate_count: Number of candidate papers to ask for
+        user_id: Session user
+        session_id: Session to run discovery in
+        create_session: Create the session first (False to reuse one)
+        use_cache: Answer from the search cache when possible (fresh
+                   results still refresh it)
 
-        Return ONLY a JSON array with complete, verified information for each paper."""
+    Returns:
+        list: Candidate paper metadata dicts
+    """
+    cached = search_cache.get(topic, candidate_count) if use_cache else None
+    if cached is not None:
+        logger.info(f"Search cache hit for query: {topic}")
+        _report(f"♻️  Reusing cached search results ({len(cached)} candidates)")
+        return cached
+
+    discovery_prompt = f"""Find {candidate_count} highly relevant academic papers about: {topic}. 
+
+    CRITICAL: For each paper, extract COMPLETE metadata:
+    - Full title
+    - ALL authors (full names, not just first author)
+    - Exact publication year
+    - Specific venue/journal/conference name
+    - A short abstract snippet (1-2 sentences)
+    - Direct PDF URL
+
+    Return ONLY a JSON array with complete, verified information for each paper."""
+
+    models = []
+    papers_json = await run_agent(
+        paper_discovery_agent, user_id, session_id, discovery_prompt, create_session=create_session,
+        on_model=models.append
+    )
 
-        user_message = types.Content(
-            parts=[types.Part(text=discovery_prompt)],
-            role="user"
-        )
+    logger.info(f"Paper discovery completed for query: {topic}")
+    _report(f"✅ Found papers!\n")
 
-        events = discovery_runner.run(
-            user_id=user_id,
-            session_id=session_id,
-            new_message=user_message
-        )
-
-        papers_json = ""
-        for event in events:
-            if hasattr(event, 'content') and event.content:
-                for part in event.content.parts:
-                    if hasattr(part, 'text') and part.text:
-                        papers_json += part.text
+    # Parse the JSON
+    try:
+        # Extract JSON from markdown code blocks if present
+        if "```json" in papers_json:
+            papers_json = papers_json.split("```json")[1].split("```")[0].strip()
+        elif "```" in papers_json:
+            papers_json = papers_json.split("```")[1].split("```")[0].strip()
+
+        papers = json.loads(papers_json)
+        _report(f"📄 Discovered {len(papers)} candidate papers")
+        logger.info(f"Successfully parsed {len(papers)} candidates")
+        if isinstance(papers, list):
+            search_cache.put(topic, candidate_count, papers,
+                             version=analysis_version(AGENT_PROMPTS["paper_discovery"], models[0]))
+
+    except json.JSONDecodeError as e:
+        logger.error(f"JSON parsing failed: {str(e)}")
+        _report("⚠️  JSON parsing failed, using mock data for demo")
+        papers = [
+            {
+                "title": "Attention Is All You Need", 
+                "authors": ["Vaswani et al."], 
+                "year": 2017, 
+                "venue": "NeurIPS",
+                "url": "https://arxiv.org/pdf/1706.03762.pdf"
+            },
+            {
+                "title": "BERT: Pre-training of Deep Bidirectional Transformers",
+                "authors": ["Devlin et al."],
+                "year": 2019,
+                "venue": "NAACL", 
+                "url": "https://arxiv.org/pdf/1810.04805.pdf"
+            }
+        ]
 
-        logger.info("Paper discovery completed")
-        print(f"✅ Found papers!\n")
+    return papers
 
-        # Parse the JSON
-        try:
-            # Extract JSON from markdown code blocks if present
-            if "```json" in papers_json:
-                papers_json = papers_json.split("```json")[1].split("```")[0].strip()
-            elif "```" in papers_json:
-                papers_json = papers_json.split("```")[1].split("```")[0].strip()
 
-            papers = json.loads(papers_json)
-            
-            # Limit to max_papers
-            if len(papers) > max_papers:
-                papers = papers[:max_papers]
-                logger.info(f"Limited papers to {max_papers} as requested")
-                
-            print(f"📄 Discovered {len(papers)} papers")
-            logger.info(f"Successfully parsed {len(papers)} papers")
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON parsing failed: {str(e)}")
-            print("⚠️  JSON parsing failed, using mock data for demo")
-            papers = [
-                {
-                    "title": "Attention Is All You Need", 
-                    "authors": ["Vaswani et al."], 
-                    "year": 2017, 
-                    "venue": "NeurIPS",
-                    "url": "https://arxiv.org/pdf/1706.03762.pdf"
-                },
-                {
-                    "title": "BERT: Pre-training of Deep Bidirectional Transformers",
-                    "authors": ["Devlin et al."],
-                    "year": 2019,
-                    "venue": "NAACL", 
-                    "url": "https://arxiv.org/pdf/1810.04805.pdf"
-                }
-            ]
-
-        # Display discovered papers
-        print("\n📋 Discovered Papers:")
-        for i, paper in enumerate(papers, 1):
-            title = paper.get('title', 'Unknown Title')
-            authors = paper.get('authors', ['Unknown'])[0] if paper.get('authors') else 'Unknown'
-            year = paper.get('year', 'Unknown')
-            print(f"  {i}. {title[:60]}... ({authors}, {year})")
-
-        # ========================================================================
-        # PHASE 2: PAPER ANALYSIS (Parallel Processing)
-        # ========================================================================
-        print(f"\n🔍 Phase 2: Analyzing papers...")
-        logger.info("Starting paper analysis")
-
-        # For now, we'll use sequential analysis due to complexity
-        # In a full implementation, we'd use the parallel processor
-        analyzed_papers = []
-        for i, paper in enumerate(papers, 1):
-            print(f"  Analyzing paper {i}/{len(papers)}: {paper.get('title', 'Unknown')[:50]}...")
-            
-            analysis_runner = Runner(
-                agent=paper_analyzer_agent,
-                session_service=session_service,
-                app_name="LitSynth"
-            )
+async def analyze_paper(paper: dict, user_id: str, analysis_session_id: str) -> Tuple[str, bool, str]:
+    """
+    Runs PaperAnalyzerAgent on a single paper.
 
-            analysis_session_id = f"{session_id}_analysis_{i}"
-            session_service.create_session(
-                app_name="LitSynth",
-                user_id=user_id,
-                session_id=analysis_session_id
-            )
+    Args:
+        paper: Paper metadata dict
+        user_id: Session user
+        analysis_session_id: Fresh session ID for this analysis
 
-            analysis_prompt = f"""Analyze this paper in detail:
+    Returns:
+        tuple: (the analyzer's full answer text, whether the analysis read
+               the paper's full text - False when its fetch failed, the
+               model that wrote it)
+    """
+    analysis_prompt = f"""Analyze this paper in detail:
 
 Title: {paper.get('title', 'Unknown')}
 Authors: {', '.join(paper.get('authors', []))}
@@ -338,58 +428,165 @@ URL: {paper.get('url', '')}
 
 Provide a comprehensive analysis with summary, methodology, key findings, and limitations."""
 
-            analysis_message = types.Content(
-                parts=[types.Part(text=analysis_prompt)],
-                role="user"
-            )
+    fetches = []
 
-            events = analysis_runner.run(
-                user_id=user_id,
-                session_id=analysis_session_id,
-                new_message=analysis_message
+    def on_tool_result(name: str, response: Dict):
+        if name in ("afetch_pdf", "fetch_pdf"):
+            fetches.append(response.get("status") == "success")
+
+    models = []
+    text = await run_agent(
+        paper_analyzer_agent, user_id, analysis_session_id, analysis_prompt, on_tool_result=on_tool_result,
+        on_model=models.append
+    )
+    return text, any(fetches) and bool(text.strip()), models[0]
+
+
+def reformulate_topic(topic: str, count: int) -> List[str]:
+    """
+    Builds search-query variants of a topic: the topic itself, then survey,
+    method, evaluation and recency angles on it.
+
+    Args:
+        topic: Research topic
+        count: Number of queries wanted (at least 1)
+
+    Returns:
+        List[str]: Queries, the original topic first
+    """
+    variants = [
+        topic,
+        f"{topic} survey OR review",
+        f"{topic} methods and techniques",
+        f"{topic} benchmark evaluation results",
+        f"recent advances in {topic}",
+        f"{topic} applications and open problems",
+    ]
+    return variants[:max(1, min(count, len(variants)))]
+
+
+async def search_concurrently(topic: str, queries: List[str], per_query: int, enough: int,
+                              user_id: str, session_id: str, use_cache: bool = True) -> list:
+    """
+    Runs the discovery search for every query concurrently and merges the
+    results as they arrive.
+
+    Outstanding searches are cancelled as soon as the merged pool holds
+    enough fetchable candidates relevant to the original topic, so one slow
+    search chain no longer stalls discovery. A failed query only costs its
+    own results; the first error is raised when every query failed.
+
+    Args:
+        topic: Original research topic (relevance is judged against it)
+        queries: Search queries to run
+        per_query: Candidates to ask for per query
+        enough: Relevant candidates after which outstanding searches stop
+        user_id: Session user
+        session_id: Base session ID (each query runs in its own session)
+        use_cache: Answer queries from the search cache when possible
+
+    Returns:
+        list: Merged, deduplicated candidate paper metadata dicts
+    """
+    tasks = [
+        asyncio.create_task(search_for_papers(
+            query, per_query, user_id, f"{session_id}_search_{i}", create_session=True,
+            use_cache=use_cache
+        ))
+        for i, query in enumerate(queries)
+    ]
+    merged = []
+    errors = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                papers = await next_done
+            except Exception as e:
+                logger.warning(f"Discovery query failed: {str(e) or type(e).__name__}")
+                errors.append(e)
+                continue
+
+            merged = merge_candidates(merged, papers)
+            relevant = sum(
+                1 for paper in rank_candidates(topic, merged)["papers"]
+                if paper["relevance_score"] > 0 and paper.get("url")
             )
+            if relevant >= enough:
+                outstanding = sum(1 for task in tasks if not task.done())
+                if outstanding:
+                    logger.info(f"Collected {relevant} relevant candidates, cancelling {outstanding} searches")
+                    _report(f"⏹️  Enough candidates collected, stopping {outstanding} outstanding searches")
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    if errors and len(errors) == len(queries):
+        raise errors[0]
+    logger.info(f"Concurrent discovery merged {len(merged)} candidates from {len(queries)} queries")
+    return merged
+
+
+def expand_by_citations(topic: str, seeds: list, limit: int) -> list:
+    """
+    Expands seed papers by backward/forward snowballing and co-citation.
 
-            analysis_text = ""
-            for event in events:
-                if hasattr(event, 'content') and event.content:
-                    for part in event.content.parts:
-                        if hasattr(part, 'text') and part.text:
-                            analysis_text += part.text
-
-            analyzed_papers.append({
-                "metadata": paper,
-                "analysis": analysis_text
-            })
-
-        logger.info(f"Completed analysis of {len(analyzed_papers)} papers")
-
-        # ========================================================================
-        # PHASE 3: SYNTHESIS
-        # ========================================================================
-        print(f"\n📝 Phase 3: Synthesizing literature review...")
-        logger.info("Starting synthesis phase")
-
-        synthesis_runner = Runner(
-            agent=synthesis_agent,
-            session_service=session_service,
-            app_name="LitSynth"
-        )
+    Only neighbours with a fetchable URL that share at least one term with
+    the topic are kept, so the expansion never costs a search call.
 
-        # Create new session for synthesis
-        synthesis_session_id = f"{session_id}_synthesis"
-        session_service.create_session(
-            app_name="LitSynth",
-            user_id=user_id,
-            session_id=synthesis_session_id
-        )
+    Args:
+        topic: Research topic
+        seeds: Candidate papers found so far
+        limit: Maximum number of expansion candidates
 
-        synthesis_prompt = f"""Create a comprehensive literature review draft based on these analyzed papers:
+    Returns:
+        list: Additional candidate paper metadata dicts
+    """
+    if not seeds:
+        return []
+    neighbours = [
+        paper for paper in get_citation_graph().snowball(seeds, limit=limit * 3)
+        if paper.get("url") and paper.get("title")
+    ]
+    relevant = [
+        paper for paper in rank_candidates(topic, neighbours)["papers"]
+        if paper["relevance_score"] > 0
+    ][:limit]
+    logger.info(f"Citation snowballing added {len(relevant)} of {len(neighbours)} neighbours")
+    return relevant
+
+
+def _write_json_array(out, values) -> None:
+    """Writes values as an indented JSON array, one value at a time"""
+    out.write("[")
+    empty = True
+    for value in values:
+        out.write("\n  " if empty else ",\n  ")
+        out.write(json.dumps(value, indent=2).replace("\n", "\n  "))
+        empty = False
+    out.write("]" if empty else "\n]")
+
+
+def build_paper_corpus(analyses: Iterable[Dict]) -> str:
+    """
+    Builds the paper corpus shared by synthesis and refinement by streaming
+    analyses from the run artifact (or a list of its records).
 
-Paper Analyses:
-{json.dumps([p['analysis'] for p in analyzed_papers], indent=2)}
+    The artifact is read twice (analyses, then metadata) so only one record
+    is decoded at a time besides the corpus under construction.
+    """
+    corpus = io.StringIO()
+    corpus.write("Paper Analyses:\n")
+    _write_json_array(corpus, (record["analysis"] for record in analyses))
+    corpus.write("\n\nPaper Metadata:\n")
+    _write_json_array(corpus, (record["metadata"] for record in analyses))
+    return corpus.getvalue()
 
-Paper Metadata:
-{json.dumps([p['metadata'] for p in analyzed_papers], indent=2)}
+
+def build_synthesis_prompt(topic: str) -> str:
+    """Builds the synthesis instructions; the papers come from the shared corpus"""
+    return f"""Create a comprehensive literature review draft based on the analyzed papers in the shared paper corpus.
 
 Write a structured literature review about {topic} with:
 - Introduction (context and importance)
@@ -401,56 +598,220 @@ Write a structured literature review about {topic} with:
 
 Include proper citations using (Author, Year) format. Aim for 1000-1500 words."""
 
-        synthesis_message = types.Content(
-            parts=[types.Part(text=synthesis_prompt)],
-            role="user"
-        )
 
-        events = synthesis_runner.run(
-            user_id=user_id,
-            session_id=synthesis_session_id,
-            new_message=synthesis_message
-        )
+def split_sections(review: str) -> List[Tuple[str, str]]:
+    """
+    Splits a markdown review into (heading line, body) pairs. Text before
+    the first heading comes first with an empty heading; joining all pairs
+    gives back the review.
+    """
+    sections = []
+    heading, body = "", []
+    for line in review.splitlines(keepends=True):
+        if re.match(r"#{1,6}\s", line):
+            if heading or body:
+                sections.append((heading, "".join(body)))
+            heading, body = line, []
+        else:
+            body.append(line)
+    if heading or body:
+        sections.append((heading, "".join(body)))
+    return sections
 
-        draft_text = ""
-        for event in events:
-            if hasattr(event, 'content') and event.content:
-                for part in event.content.parts:
-                    if hasattr(part, 'text') and part.text:
-                        draft_text += part.text
-                        # Print progress for long outputs
-                        if len(draft_text) % 500 < 100:  # Print every ~500 chars
-                            print(".", end="", flush=True)
-
-        word_count = len(draft_text.split())
-        print(f"\n✅ Draft created ({word_count} words)")
-        logger.info(f"Synthesis completed - draft with {word_count} words")
-
-        # ========================================================================
-        # PHASE 4: REFINEMENT LOOP
-        # ========================================================================
-        print(f"\n🔄 Phase 4: Iterative refinement...")
-        logger.info("Starting refinement loop")
-
-        refinement_runner = Runner(
-            agent=refinement_loop,
-            session_service=session_service,
-            app_name="LitSynth"
-        )
 
-        # Create session for refinement
-        refinement_session_id = f"{session_id}_refinement"
-        session_service.create_session(
-            app_name="LitSynth",
-            user_id=user_id,
-            session_id=refinement_session_id
+def _section_key(heading: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", heading.lower()).strip()
+
+
+def merge_sections(review: str, revisions: str) -> Tuple[str, List[str]]:
+    """
+    Replaces the sections of a review that a revision answer returns (matched
+    by heading); sections with headings the review does not have are added
+    before its last section.
+
+    Returns:
+        tuple: (merged review, headings of the revised and added sections)
+    """
+    revised = {}
+    for heading, body in split_sections(revisions):
+        if heading:
+            revised[_section_key(heading)] = (heading, body.strip("\n") + "\n\n")
+
+    merged, changed = [], []
+    for heading, body in split_sections(review):
+        replacement = revised.pop(_section_key(heading), None) if heading else None
+        if replacement is None:
+            merged.append(heading + body)
+        else:
+            merged.append(heading + replacement[1])
+            changed.append(heading.strip("#* \n"))
+
+    added = [heading + body for heading, body in revised.values()]
+    changed += [heading.strip("#* \n") for heading, _ in revised.values()]
+    if added:
+        position = len(merged) - 1 if len(merged) > 1 else len(merged)
+        if merged and not merged[position - 1].endswith("\n\n"):
+            merged[position - 1] = merged[position - 1].rstrip("\n") + "\n\n"
+        merged[position:position] = added
+    return "".join(merged), changed
+
+
+def build_update_prompt(topic: str, review: str, new_paper_count: int) -> str:
+    """Builds the revision instructions of an update; the new papers come from the shared corpus"""
+    headings = "; ".join(heading.strip() for heading, _ in split_sections(review) if heading)
+    return f"""Update an existing literature review about {topic} with {new_paper_count} newly found papers. Their analyses and metadata are in the shared paper corpus; papers the review already covers are not repeated there.
+
+Existing review:
+
+{review}
+
+Revise only the sections whose content the new papers change, working their findings in with (Author, Year) citations. Return each revised section in full, starting with its exact heading line from the existing review ({headings}). Do not return sections that need no change. If a new paper opens a theme that no existing section covers, return it as a new section with its own heading."""
+
+
+async def discover_papers(topic: str, max_papers: int, user_id: str, session_id: str,
+                          fresh: bool = False) -> dict:
+    """
+    Phase 1: finds candidates (library, citation graph, then web search) and
+    keeps the max_papers most relevant ones.
+
+    Args:
+        fresh: Search the web even when the library alone has enough
+               candidates, bypassing the search cache (updates look for
+               papers published since the previous review)
+
+    Returns:
+        dict: rank_candidates result ("papers", "candidate_count", ...)
+    """
+    # Over-fetch candidates; only the most relevant ones get analyzed
+    candidate_count = max_papers * DISCOVERY_OVERFETCH
+
+    # First tier: the local library answers repeat topics without any network calls
+    library = get_library()
+    library_hits = [
+        hit for hit in library.search(topic, limit=candidate_count, min_score=settings.LIBRARY_MIN_SCORE)
+        if hit.get("title")
+    ]
+    logger.info(
+        f"Library query returned {len(library_hits)} candidates in "
+        f"{library.last_query_ms:.2f} ms ({library.stats()['documents']} papers in library)"
+    )
+
+    # Snowball through the citation graph from what the library already knows
+    first_tier = merge_candidates(library_hits, expand_by_citations(topic, library_hits, candidate_count))
+
+    if len(first_tier) >= max_papers and not fresh:
+        _report(f"📚 Found {len(first_tier)} candidates in the local library, skipping web search")
+        papers = first_tier
+    else:
+        queries = reformulate_topic(topic, settings.DISCOVERY_QUERIES)
+        if len(queries) == 1:
+            searched = await search_for_papers(topic, candidate_count, user_id, session_id, use_cache=not fresh)
+        else:
+            # Each query asks for enough that all but the slowest one can fill the pool
+            per_query = max(max_papers, -(-candidate_count // (len(queries) - 1)))
+            _report(f"🔎 Searching with {len(queries)} query variants in parallel...")
+            searched = await search_concurrently(
+                topic, queries, per_query, candidate_count, user_id, session_id, use_cache=not fresh
+            )
+        papers = merge_candidates(
+            first_tier,
+            searched,
+            expand_by_citations(topic, searched, candidate_count)
         )
 
-        refinement_prompt = f"""Evaluate and refine this literature review draft about {topic}:
+    # Keep only the top max_papers candidates by local BM25 relevance
+    ranking = rank_candidates(topic, papers, top_k=max_papers)
+    logger.info(
+        f"Ranked {ranking['candidate_count']} candidates in "
+        f"{ranking['elapsed_ms']:.2f} ms, kept {len(ranking['papers'])}"
+    )
+    if ranking["status"] != "success":
+        logger.warning(ranking["message"])
+    logger.info(f"Search cache stats: {search_cache.stats()}")
+    return ranking
+
+
+async def synthesize_draft(topic: str, user_id: str, session_id: str) -> str:
+    """Phase 3: runs SynthesisAgent over the review's shared paper corpus"""
+    synthesis_prompt = build_synthesis_prompt(topic)
+    return await run_agent(
+        synthesis_agent, user_id, f"{session_id}_synthesis", synthesis_prompt,
+        on_text=lambda chunk: _emit("draft", {"text": chunk})
+    )
+
+
+async def revise_review(topic: str, review: str, new_paper_count: int, user_id: str,
+                        session_id: str) -> Tuple[str, List[str]]:
+    """
+    Phase 3 of an update: has SynthesisAgent rewrite only the sections of
+    the previous review that the new papers in the shared corpus affect.
+
+    Returns:
+        tuple: (updated review, headings of the revised and added sections)
+    """
+    answer = await run_agent(
+        synthesis_agent, user_id, f"{session_id}_update", build_update_prompt(topic, review, new_paper_count),
+        on_text=lambda chunk: _emit("draft", {"text": chunk})
+    )
+    updated, changed = merge_sections(review, answer)
+    if not changed:
+        logger.warning("Update answer contained no section of the review; keeping it unchanged")
+    return updated, changed
+
+
+def open_previous_review(run_id: str) -> RunCheckpoint:
+    """Opens a finished review to update; raises ValueError if there is none"""
+    previous = RunCheckpoint.open_existing(run_id)
+    if not previous.is_complete("refinement"):
+        raise ValueError(f"Run '{run_id}' has no finished review to update (resume it first)")
+    return previous
+
+
+def plan_update(previous: RunCheckpoint, ranking: dict) -> dict:
+    """
+    Diffs fresh discovery results against the papers of a previous review.
+
+    Returns:
+        dict: papers.json record of the update: the previous papers followed
+              by the new ones, plus "new_paper_ids"
+    """
+    previous_papers = previous.load_json("papers.json")["papers"]
+    known = {canonical_paper_id(paper) for paper in previous_papers}
+    new_papers = [paper for paper in ranking["papers"] if canonical_paper_id(paper) not in known]
+    return {
+        "papers": previous_papers + new_papers,
+        "candidate_count": ranking["candidate_count"],
+        "new_paper_ids": [canonical_paper_id(paper) for paper in new_papers],
+    }
+
+
+async def refine_draft(topic: str, draft_text: str, user_id: str, session_id: str) -> str:
+    """
+    Phase 4: runs the refinement loop over the draft.
+
+    Returns:
+        str: The last draft the loop rewrote, or the draft itself when no
+             iteration rewrote it
+    """
+    refinement_runner = Runner(
+        agent=refinement_loop,
+        session_service=session_service,
+        app_name="LitSynth"
+    )
+
+    # Create session for refinement
+    refinement_session_id = f"{session_id}_refinement"
+    session_service.create_session(
+        app_name="LitSynth",
+        user_id=user_id,
+        session_id=refinement_session_id
+    )
+
+    refinement_prompt = f"""Evaluate and refine this literature review draft about {topic}:
 
 {draft_text}
 
-Use the evaluate_draft tool to assess quality. If score < 8, improve it based on feedback and re-evaluate. Loop until score >= 8 or max 3 iterations.
+Check it against the analyzed papers in the shared paper corpus. Use the evaluate_draft tool to assess quality. If score < 8, improve it based on feedback and re-evaluate. Loop until score >= 8 or max 3 iterations.
 
 Focus on:
 - Structural coherence and logical flow
@@ -459,56 +820,560 @@ Focus on:
 - Academic clarity and readability
 - Identification of research gaps"""
 
-        refinement_message = types.Content(
-            parts=[types.Part(text=refinement_prompt)],
-            role="user"
-        )
+    refinement_message = types.Content(
+        parts=[types.Part(text=refinement_prompt)],
+        role="user"
+    )
 
-        events = refinement_runner.run(
-            user_id=user_id,
-            session_id=refinement_session_id,
-            new_message=refinement_message
-        )
+    refined = draft_text
+    min_words = MIN_REFINED_SHARE * len(draft_text.split())
+    async for event in refinement_runner.run_async(
+        user_id=user_id,
+        session_id=refinement_session_id,
+        new_message=refinement_message
+    ):
+        if not event.is_final_response() or not event.content:
+            continue
+        text = "".join(part.text for part in event.content.parts or [] if part.text)
+        if len(text.split()) >= min_words:
+            refined = text
+
+    return refined
+
+
+def merge_candidates(*candidate_lists: list) -> list:
+    """Merges candidate lists, dropping papers already seen (by canonical ID)"""
+    merged = []
+    seen = set()
+    for candidates in candidate_lists:
+        for paper in candidates:
+            paper_id = canonical_paper_id(paper)
+            if paper_id not in seen:
+                seen.add(paper_id)
+                merged.append(paper)
+    return merged
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+class PhaseTimeout(Exception):
+    """Raised when a review phase overruns its configured timeout"""
+
+    def __init__(self, phase: str, seconds: float):
+        super().__init__(f"Phase '{phase}' exceeded its {seconds:g}s timeout")
+        self.phase = phase
+        self.seconds = seconds
+
+
+@dataclass
+class ReviewResult:
+    """Outcome of one literature review run"""
+    run_id: str
+    topic: str
+    review: str
+    papers: List[Dict]
+    candidate_count: int
+    output_file: str
+    word_count: int
+    phase_seconds: Dict[str, float] = field(default_factory=dict)
+    peak_memory_mb: Dict[str, float] = field(default_factory=dict)
+    resumed_phases: List[str] = field(default_factory=list)
+    # Set when the run updated a previous review
+    updated_from: Optional[str] = None
+    new_papers: List[Dict] = field(default_factory=list)
+    revised_sections: List[str] = field(default_factory=list)
+
+
+class _PhaseTracker:
+    """Tracks wall time, peak memory and the deadline of each phase of a review"""
+
+    def __init__(self, deadline: asyncio.Timeout, timeouts: Dict[str, float], memory: PhaseMemoryMonitor,
+                 profiler=None):
+        self.deadline = deadline
+        self.timeouts = timeouts
+        self.memory = memory
+        self.profiler = profiler
+        self.current: Optional[str] = None
+        self.seconds: Dict[str, float] = {}
+        self._started = 0.0
+
+    def _close(self):
+        if self.current is not None:
+            self.seconds[self.current] = round(time.perf_counter() - self._started, 3)
+            self.current = None
+
+    def start(self, name: str):
+        self._close()
+        self.current = name
+        self._started = time.perf_counter()
+        self.memory.start_phase(name)
+        model_router.start_phase(name)
+        if self.profiler is not None:
+            self.profiler.start_phase(name)
+        bind_log_context(phase=name, paper=None)
+        _emit("phase", {"phase": name})
+        seconds = self.timeouts.get(name)
+        loop = asyncio.get_running_loop()
+        self.deadline.reschedule(loop.time() + seconds if seconds else None)
+
+    def finish(self):
+        self._close()
+        self.memory.finish()
+        self.deadline.reschedule(None)
+
+
+async def arun_literature_review(
+    topic: str,
+    max_papers: int = 5,
+    run_id: str = None,
+    phase_timeouts: Dict[str, float] = None,
+    on_progress: Callable[[str], None] = None,
+    on_event: Callable[[str, Dict], None] = None,
+    profiler=None,
+    update_from: str = None,
+) -> ReviewResult:
+    """
+    Executes a complete literature review for the given topic.
+    Uses the full multi-agent pipeline on the async ADK runner, so several
+    reviews can run concurrently in one event loop.
 
-        final_review = draft_text  # Keep the original high-quality draft
-        iteration_count = 1
-        print(f"  Refinement completed - draft accepted with score 9.0/10")
+    Every phase is checkpointed to the run directory. Passing the run_id of
+    an interrupted review resumes it: completed phases are skipped and
+    papers that were already analyzed are not analyzed again. Cancelling
+    the task stops the review; completed phases stay checkpointed.
 
-        # ========================================================================
-        # FINAL OUTPUT
-        # ========================================================================
-        print(f"\n{'='*60}")
-        print(f"📚 FINAL LITERATURE REVIEW")
-        print(f"{'='*60}\n")
+    With update_from, the run brings a finished review up to date instead:
+    discovery runs again and is diffed against the papers of that review,
+    only papers it did not cover are analyzed (its analyses are carried
+    over), and synthesis revises just the sections the new papers affect.
+
+    Args:
+        topic: Research topic for literature review
+        max_papers: Maximum number of papers to analyze (default: 5)
+        run_id: ID of a previous run to resume (default: start a new run)
+        phase_timeouts: Seconds allowed per phase, by phase name
+                        (default: settings.PHASE_TIMEOUTS)
+        on_progress: Receives progress messages (default: print)
+        on_event: Receives structured events as (type, data): "phase",
+                  "paper" (per analyzed paper) and "draft" (draft chunks)
+        profiler: profiling.ReviewProfiler to profile phases and tool calls
+                  with (default: no profiling)
+        update_from: Run ID of a finished review to update (resuming an
+                     update run picks it up from the run's manifest)
+
+    Returns:
+        ReviewResult: Review text, papers, output file and per-phase metrics
+
+    Raises:
+        PhaseTimeout: A phase overran its timeout
+        ValueError: update_from names no finished review
+    """
+    previous = open_previous_review(update_from) if update_from else None
+    run_id = run_id or new_run_id(topic)
+    checkpoint = RunCheckpoint(run_id)
+    if previous is None and checkpoint.manifest.get("update_of"):
+        previous = open_previous_review(checkpoint.manifest["update_of"])
+    checkpoint.start(topic, max_papers, update_of=previous.run_id if previous else None)
+    resumed_phases = list(checkpoint.manifest.get("completed_phases", []))
+    timeouts = {**settings.PHASE_TIMEOUTS, **(phase_timeouts or {})}
+
+    progress_token = _progress.set(on_progress or print)
+    events_token = _events.set(on_event)
+    profiler_token = _profiler.set(profiler)
+    log_token = bind_log_context(run_id=run_id)
+    memory = PhaseMemoryMonitor()
+    phases = None
+    corpus = None
+    corpus_token = None
+    if profiler is not None:
+        profiler.start()
+
+    logger.info(f"Starting literature review for topic: {topic} (run {run_id})")
+    
+    _report(f"\n{'='*60}")
+    _report(f"🔍 Starting Literature Review on: {topic}")
+    _report(f"🆔 Run ID: {run_id}")
+    if previous is not None:
+        _report(f"🔁 Updating review of run {previous.run_id}")
+    _report(f"{'='*60}\n")
+
+    try:
+        async with asyncio.timeout(None) as deadline:
+            phases = _PhaseTracker(deadline, timeouts, memory, profiler)
+
+            # Create unique session
+            import random
+            session_id = f"litsynth_{topic.replace(' ', '_')[:20]}_{random.randint(1000, 9999)}"
+            user_id = "default_user"
+
+            # Initialize session
+            session_service.create_session(
+                app_name="LitSynth",
+                user_id=user_id,
+                session_id=session_id
+            )
+
+            logger.info(f"Session created: {session_id}")
+
+            # ========================================================================
+            # PHASE 1: PAPER DISCOVERY
+            # ========================================================================
+            _report("📊 Phase 1: Discovering relevant papers...")
+            phases.start("discovery")
+            logger.info("Starting paper discovery phase")
+
+            if checkpoint.is_complete("discovery"):
+                ranking = checkpoint.load_json("papers.json")
+                _report(f"⏭️  Reusing {len(ranking['papers'])} papers from checkpoint")
+            else:
+                ranking = await discover_papers(
+                    topic, max_papers, user_id, session_id, fresh=previous is not None
+                )
+                if previous is not None:
+                    ranking = plan_update(previous, ranking)
+                    checkpoint.save_json("papers.json", ranking)
+                else:
+                    checkpoint.save_json("papers.json", {
+                        "papers": ranking["papers"],
+                        "candidate_count": ranking["candidate_count"],
+                    })
+                checkpoint.complete("discovery")
+            papers = ranking["papers"]
+            new_ids = set(ranking.get("new_paper_ids", []))
+            if previous is not None:
+                _report(f"🆕 {len(new_ids)} new papers since run {previous.run_id}")
+
+            # Display discovered papers
+            _report("\n📋 Discovered Papers:")
+            for i, paper in enumerate(papers, 1):
+                title = paper.get('title', 'Unknown Title')
+                authors = paper.get('authors', ['Unknown'])[0] if paper.get('authors') else 'Unknown'
+                year = paper.get('year', 'Unknown')
+                score = paper.get('relevance_score', 0.0)
+                _report(f"  {i}. {title[:60]}... ({authors}, {year}) [relevance {score:.2f}]")
+
+            # ========================================================================
+            # PHASE 2: PAPER ANALYSIS (Parallel Processing)
+            # ========================================================================
+            _report(f"\n🔍 Phase 2: Analyzing papers...")
+            logger.info("Starting paper analysis")
+            phases.start("analysis")
+
+            library = get_library()
+            citation_graph = get_citation_graph()
+
+            # For now, we'll use sequential analysis due to complexity
+            # In a full implementation, we'd use the parallel processor
+            # Each analysis goes straight to disk; synthesis streams them back
+            analyses = JsonlArtifact(checkpoint.path("analyses.jsonl"))
+            if previous is not None and not len(analyses):
+                # The previous review's papers keep their analyses
+                for record in JsonlArtifact(previous.path("analyses.jsonl")):
+                    analyses.append(record)
+            analyzed_ids = {record["paper_id"] for record in analyses}
+            for i, paper in enumerate(papers, 1):
+                bind_log_context(paper=i)
+                _report(f"  Analyzing paper {i}/{len(papers)}: {paper.get('title', 'Unknown')[:50]}...")
+            
+                paper_id = canonical_paper_id(paper)
+                if paper_id in analyzed_ids:
+                    if previous is not None and paper_id not in new_ids:
+                        _report(f"    ⏭️  Covered by the previous review")
+                    else:
+                        _report(f"    ⏭️  Already analyzed in this run")
+                    continue
+
+                analysis_text = analysis_cache.get(paper_id)
+                cached = analysis_text is not None
+                if cached:
+                    _report(f"    ♻️  Reusing cached analysis")
+                else:
+                    analysis_text, complete, model = await analyze_paper(
+                        paper, user_id, f"{session_id}_analysis_{i}"
+                    )
+                    if complete:
+                        analysis_cache.put(paper_id, analysis_text,
+                                           version=analysis_version(AGENT_PROMPTS["paper_analyzer"], model))
+                    else:
+                        # A failed fetch may succeed next time; analyze the paper again then
+                        logger.info(f"Not caching analysis of {paper_id}: its full text was not read")
+
+                analyses.append(Analysis(i, paper_id, Paper.from_dict(paper), analysis_text).to_dict())
+                analyzed_ids.add(paper_id)
+                analysis_text = None
+                _emit("paper", {
+                    "index": i,
+                    "total": len(papers),
+                    "paper_id": paper_id,
+                    "title": paper.get("title", "Unknown"),
+                    "cached": cached,
+                })
+
+                # File the discovery metadata with the text and references fetch_pdf stored
+                library.update_metadata(paper)
+                citation_graph.update_metadata(paper)
+
+            bind_log_context(paper=None)
+            checkpoint.complete("analysis")
+            logger.info(
+                f"Completed analysis of {len(analyses)} papers "
+                f"({analyses.size_bytes()} bytes in {analyses.path})"
+            )
+            logger.info(f"Analysis cache stats: {analysis_cache.stats()}")
+            logger.info(f"Library stats: {library.stats()}")
+            logger.info(f"Citation graph stats: {citation_graph.stats()}")
+
+            # ========================================================================
+            # PHASE 3: SYNTHESIS
+            # ========================================================================
+            _report(f"\n📝 Phase 3: Synthesizing literature review...")
+            logger.info("Starting synthesis phase")
+            phases.start("synthesis")
+
+            # An update only sends the new papers; the previous review carries the rest
+            corpus_records = analyses
+            if previous is not None:
+                corpus_records = [record for record in analyses if record["paper_id"] in new_ids]
+
+            # Synthesis and every call of the refinement loop reference one registered copy
+            # of the paper corpus. An update without new papers keeps the previous review
+            corpus_readers = []
+            corpus_reads = 0
+            if previous is None or new_ids:
+                if not checkpoint.is_complete("synthesis"):
+                    corpus_readers.append(synthesis_agent)
+                    corpus_reads += 1
+                if not checkpoint.is_complete("refinement"):
+                    corpus_readers.append(refinement_agent)
+                    corpus_reads += REFINEMENT_CALLS_PER_ITERATION * refinement_loop.max_iterations
+            if corpus_readers:
+                corpus = await context_cache.register(
+                    run_id, build_paper_corpus(corpus_records), corpus_readers, reads=corpus_reads
+                )
+                corpus_token = use_review_corpus(context_cache, corpus)
+
+            revised_sections = []
+            if checkpoint.is_complete("synthesis"):
+                draft_text = checkpoint.load_text("draft.md")
+                revised_sections = (checkpoint.load_json("update.json") or {}).get("revised_sections", [])
+                _report(f"⏭️  Reusing draft from checkpoint")
+            elif previous is not None:
+                draft_text = previous.load_text("review.md")
+                if new_ids:
+                    _report(f"  Revising the sections affected by {len(new_ids)} new papers...")
+                    draft_text, revised_sections = await revise_review(
+                        topic, draft_text, len(corpus_records), user_id, session_id
+                    )
+                else:
+                    _report(f"  No new papers: the previous review is still current")
+                checkpoint.save_json("update.json", {
+                    "updated_from": previous.run_id,
+                    "new_paper_ids": sorted(new_ids),
+                    "revised_sections": revised_sections,
+                })
+                checkpoint.save_text("draft.md", draft_text)
+                checkpoint.complete("synthesis")
+            else:
+                draft_text = await synthesize_draft(topic, user_id, session_id)
+                checkpoint.save_text("draft.md", draft_text)
+                checkpoint.complete("synthesis")
+            if revised_sections:
+                _report(f"  Revised sections: {', '.join(revised_sections)}")
+
+            word_count = len(draft_text.split())
+            _report(f"\n✅ Draft created ({word_count} words)")
+            logger.info(f"Synthesis completed - draft with {word_count} words")
+
+            # ========================================================================
+            # PHASE 4: REFINEMENT LOOP
+            # ========================================================================
+            _report(f"\n🔄 Phase 4: Iterative refinement...")
+            logger.info("Starting refinement loop")
+            phases.start("refinement")
+
+            if checkpoint.is_complete("refinement"):
+                final_review = checkpoint.load_text("review.md")
+                _report(f"⏭️  Reusing refined review from checkpoint")
+            elif previous is not None and not new_ids:
+                final_review = draft_text
+                checkpoint.save_text("review.md", final_review)
+                checkpoint.complete("refinement")
+            else:
+                final_review = await refine_draft(topic, draft_text, user_id, session_id)
+                checkpoint.save_text("review.md", final_review)
+                checkpoint.complete("refinement")
+
+            # ========================================================================
+            # FINAL OUTPUT
+            # ========================================================================
+            phases.start("output")
+
+            _report(f"\n{'='*60}")
+            _report(f"📚 FINAL LITERATURE REVIEW")
+            _report(f"{'='*60}\n")
         
-        # Display preview
-        preview_lines = final_review.split('\n')[:10]  # Show first 10 lines
-        for line in preview_lines:
-            print(line)
-        if len(final_review.split('\n')) > 10:
-            print("...\n[Full review saved to file]")
+            # Display preview
+            preview_lines = final_review.split('\n')[:10]  # Show first 10 lines
+            for line in preview_lines:
+                _report(line)
+            if len(final_review.split('\n')) > 10:
+                _report("...\n[Full review saved to file]")
         
-        # Save detailed output to file
-        output_filename = f"literature_review_{topic.replace(' ', '_')[:30]}.md"
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            f.write(f"# Literature Review: {topic}\n\n")
-            f.write(f"**Generated by LitSynth AI Agent**\n\n")
-            f.write(final_review)
-            f.write(f"\n\n---\n")
-            f.write(f"*This literature review was automatically generated using LitSynth's multi-agent AI system.*\n")
-            f.write(f"*Based on analysis of {len(papers)} academic papers.*\n")
-
-        print(f"\n💾 Full review saved to: {output_filename}")
-        logger.info(f"Literature review completed and saved to {output_filename}")
-
-        return final_review
-
-    except Exception as e:
-        logger.error(f"Literature review failed: {str(e)}")
-        print(f"\n❌ Error during literature review: {str(e)}")
+            # Save detailed output to the run directory, so concurrent reviews never share a file
+            output = io.StringIO()
+            output.write(f"# Literature Review: {topic}\n\n")
+            output.write(f"**Generated by LitSynth AI Agent**\n\n")
+            output.write(final_review)
+            output.write(f"\n\n---\n")
+            output.write(f"*This literature review was automatically generated using LitSynth's multi-agent AI system.*\n")
+            output.write(f"*Based on analysis of {len(papers)} academic papers.*\n")
+            if previous is not None:
+                output.write(f"*Updated from run {previous.run_id} with {len(new_ids)} new papers"
+                             f"{'; revised sections: ' + ', '.join(revised_sections) if revised_sections else ''}.*\n")
+            output.write(f"\n*Relevance ranking (BM25 over title, venue and abstract, "
+                         f"top {len(papers)} of {ranking['candidate_count']} candidates):*\n\n")
+            for i, paper in enumerate(papers, 1):
+                output.write(f"{i}. {paper.get('title', 'Unknown Title')} "
+                             f"(score {paper.get('relevance_score', 0.0):.2f})\n")
+            checkpoint.save_text(REVIEW_FILENAME, output.getvalue())
+            output_filename = checkpoint.path(REVIEW_FILENAME)
+
+            _report(f"\n💾 Full review saved to: {output_filename}")
+            logger.info(f"Literature review completed and saved to {output_filename}")
+            logger.info(f"Model tier stats: {model_router.stats()}")
+            logger.info(f"Context cache stats: {context_cache.stats()}")
+
+            phases.finish()
+
+        word_count = len(final_review.split())
+        peak_memory = {phase: usage["peak_mb"] for phase, usage in memory.report().items()}
+        logger.info(f"Phase timings (s): {phases.seconds}")
+        logger.info(f"Peak memory per phase: {memory.report()}")
+
+        return ReviewResult(
+            run_id=run_id,
+            topic=topic,
+            review=final_review,
+            papers=papers,
+            candidate_count=ranking["candidate_count"],
+            output_file=output_filename,
+            word_count=word_count,
+            phase_seconds=phases.seconds,
+            peak_memory_mb=peak_memory,
+            resumed_phases=resumed_phases,
+            updated_from=previous.run_id if previous is not None else None,
+            new_papers=[paper for paper in papers if canonical_paper_id(paper) in new_ids],
+            revised_sections=revised_sections,
+        )
+
+    except TimeoutError as e:
+        if phases is None or not deadline.expired():
+            raise
+        timeout_error = PhaseTimeout(phases.current, timeouts[phases.current])
+        logger.error(f"Literature review failed: {timeout_error} (run {run_id})")
+        _report(f"\n❌ Error during literature review: {timeout_error}")
+        _report(f"💾 Completed phases are checkpointed. Resume with: python src/agent.py --resume {run_id}")
+        raise timeout_error from e
+
+    except (Exception, KeyboardInterrupt, asyncio.CancelledError) as e:
+        logger.error(f"Literature review failed: {str(e) or type(e).__name__} (run {run_id})")
+        _report(f"\n❌ Error during literature review: {str(e) or type(e).__name__}")
+        _report(f"💾 Completed phases are checkpointed. Resume with: python src/agent.py --resume {run_id}")
         raise
 
-def interactive_mode():
+    finally:
+        memory.finish()
+        if corpus_token is not None:
+            reset_review_corpus(corpus_token)
+        if corpus is not None:
+            await context_cache.release(corpus)
+        if profiler is not None:
+            profiler.finish()
+        _progress.reset(progress_token)
+        _events.reset(events_token)
+        _profiler.reset(profiler_token)
+        reset_log_context(log_token)
+
+
+def run_literature_review(topic: str, max_papers: int = 5, run_id: str = None, profile: bool = False,
+                          update_from: str = None):
+    """
+    Synchronous wrapper around arun_literature_review for scripts and the CLI.
+
+    Args:
+        topic: Research topic for literature review
+        max_papers: Maximum number of papers to analyze (default: 5)
+        run_id: ID of a previous run to resume (default: start a new run)
+        profile: Profile phases and tool calls into the run's profile/ directory
+        update_from: Run ID of a finished review to bring up to date
+
+    Returns:
+        str: Final literature review text
+    """
+    profiler = None
+    if profile:
+        from profiling import ReviewProfiler
+        run_id = run_id or new_run_id(topic)
+        profiler = ReviewProfiler(os.path.join(run_directory(run_id), "profile"))
+
+    result = asyncio.run(arun_literature_review(
+        topic, max_papers, run_id=run_id, profiler=profiler, update_from=update_from
+    ))
+
+    print("\n📈 Phase timings and peak memory:")
+    for phase, seconds in result.phase_seconds.items():
+        peak = result.peak_memory_mb.get(phase, 0.0)
+        print(f"  {phase:<11} {seconds:>8.2f} s  {peak:>8.1f} MB peak")
+
+    if profiler is not None:
+        print(f"\n🔬 Profile reports written to: {profiler.output_dir}")
+        for name, section in profiler.tools.items():
+            print(f"  tool {name:<18} {section.calls:>4} calls  {section.seconds:>8.2f} s")
+
+    return result.review
+
+
+def resume_literature_review(run_id: str, profile: bool = False):
+    """
+    Resumes an interrupted review from its checkpoints.
+
+    Args:
+        run_id: Run ID printed when the review started
+        profile: Profile the resumed phases (see run_literature_review)
+
+    Returns:
+        str: Final literature review text
+    """
+    checkpoint = RunCheckpoint.open_existing(run_id)
+    return run_literature_review(
+        checkpoint.manifest["topic"],
+        checkpoint.manifest["max_papers"],
+        run_id=run_id,
+        profile=profile
+    )
+
+def update_literature_review(previous_run_id: str, profile: bool = False):
+    """
+    Brings a finished review up to date: only papers found since are
+    analyzed, and only the sections they affect are rewritten.
+
+    Args:
+        previous_run_id: Run ID of the review to update
+        profile: Profile the update's phases (see run_literature_review)
+
+    Returns:
+        str: Updated literature review text
+    """
+    previous = open_previous_review(previous_run_id)
+    return run_literature_review(
+        previous.manifest["topic"],
+        previous.manifest["max_papers"],
+        profile=profile,
+        update_from=previous_run_id
+    )
+
+def interactive_mode(profile: bool = False):
     """Run LitSynth in interactive mode"""
     print("🔬 LitSynth Interactive Mode")
     print("=" * 40)
@@ -527,9 +1392,11 @@ def interactive_mode():
     print(f"\nStarting literature review for: {topic}")
     print(f"Maximum papers: {max_papers}")
     
-    return run_literature_review(topic, max_papers)
+    return run_literature_review(topic, max_papers, profile=profile)
 
 if __name__ == "__main__":
+    capture_root_logging()
+
     # Initialize system
     initialize_system()
     
@@ -537,6 +1404,11 @@ if __name__ == "__main__":
     print("🎯 LITSYNTH - AI Literature Review System")
     print("="*60)
     
+    # --profile can be combined with any mode
+    profile = "--profile" in sys.argv[1:]
+    if profile:
+        sys.argv.remove("--profile")
+
     # Check for command line arguments
     if len(sys.argv) > 1:
         if sys.argv[1] in ['-h', '--help']:
@@ -544,13 +1416,36 @@ if __name__ == "__main__":
             print("  python src/agent.py                    # Interactive mode")
             print("  python src/agent.py 'your topic'       # Direct topic")
             print("  python src/agent.py --test            # Test run")
+            print("  python src/agent.py --resume <run-id> # Resume an interrupted review")
+            print("  python src/agent.py --update <run-id> # Update a finished review with new papers")
+            print("  python src/agent.py --profile ...     # Profile phases and tool calls (any mode)")
+            print("  python src/service.py                 # Review-job HTTP service")
+            print("  python src/ingest.py <reading-list>   # Pre-warm the paper library (.bib/.csv/IDs)")
             sys.exit(0)
+        elif sys.argv[1] == '--resume':
+            if len(sys.argv) < 3:
+                print("❌ Usage: python src/agent.py --resume <run-id>")
+                sys.exit(1)
+            try:
+                resume_literature_review(sys.argv[2], profile=profile)
+            except ValueError as e:
+                print(f"❌ {str(e)}")
+                sys.exit(1)
+        elif sys.argv[1] == '--update':
+            if len(sys.argv) < 3:
+                print("❌ Usage: python src/agent.py --update <run-id>")
+                sys.exit(1)
+            try:
+                update_literature_review(sys.argv[2], profile=profile)
+            except ValueError as e:
+                print(f"❌ {str(e)}")
+                sys.exit(1)
         elif sys.argv[1] == '--test':
             # Test with a sample topic
             test_topic = "attention mechanisms in transformer models"
             print(f"\nRunning test with topic: {test_topic}")
             try:
-                result = run_literature_review(test_topic, max_papers=2)
+                result = run_literature_review(test_topic, max_papers=2, profile=profile)
                 print("\n" + "="*60)
                 print("✅ Test completed successfully!")
                 print("="*60)
@@ -561,9 +1456,9 @@ if __name__ == "__main__":
         else:
             # Direct topic from command line
             topic = " ".join(sys.argv[1:])
-            run_literature_review(topic)
+            run_literature_review(topic, profile=profile)
     else:
         # Interactive mode
-        result = interactive_mode()
+        result = interactive_mode(profile)
         if result:
             print("\n🎉 Literature review completed successfully!")
\ No newline at end of file
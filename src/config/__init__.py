@@ -3,5 +3,6 @@ Configuration module for LitSynth
 """
 
 from .prompts import AGENT_PROMPTS
+from . import settings
 
-__all__ = ["AGENT_PROMPTS"]
\ No newline at end of file
+__all__ = ["AGENT_PROMPTS", "settings"]
@@ -0,0 +1,59 @@
+"""
+Reader for LitSynth's .agent_engine_config.json
+
+The file lives in the repository root (override the path with
+LITSYNTH_ENGINE_CONFIG). Sections are plain dicts; a missing file or
+section reads as empty so every caller can fall back to its defaults.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+from .settings import PROJECT_ROOT
+
+ENGINE_CONFIG_PATH = os.getenv(
+    "LITSYNTH_ENGINE_CONFIG", os.path.join(PROJECT_ROOT, ".agent_engine_config.json")
+)
+
+_config: Optional[Dict] = None
+_config_lock = threading.Lock()
+
+
+def load_engine_config(path: str = None) -> Dict:
+    """
+    Loads the engine config (cached after the first read of the default path).
+
+    Args:
+        path: Config file to read (default: ENGINE_CONFIG_PATH)
+
+    Returns:
+        dict: Parsed config, or {} when the file does not exist
+
+    Raises:
+        ValueError: The file is not valid JSON
+    """
+    global _config
+    if path is None:
+        with _config_lock:
+            if _config is None:
+                _config = _read(ENGINE_CONFIG_PATH)
+            return _config
+    return _read(path)
+
+
+def _read(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid engine config {path}: {e}") from e
+
+
+def engine_config_section(name: str) -> Dict:
+    """Returns one section of the engine config ({} when absent)"""
+    section = load_engine_config().get(name)
+    return dict(section) if isinstance(section, dict) else {}
@@ -24,7 +24,7 @@ TASK:
 1. Receive a research topic/query
 2. Use the Google Search tool to find 5-7 highly relevant academic papers
 3. Focus on: recent papers (last 5 years), high-impact venues, seminal works
-4. Extract: title, authors, publication venue, year, and URL/DOI
+4. Extract: title, authors, publication venue, year, a short abstract snippet, and URL/DOI
 5. Return a structured list of papers with metadata
 
 SEARCH STRATEGY:
@@ -40,6 +40,7 @@ Return a JSON array of papers:
     "authors": ["..."],
     "year": 2023,
     "venue": "...",
+    "abstract": "1-2 sentence abstract snippet",
     "url": "https://..."
   }
 ]""",
@@ -48,7 +49,7 @@ Return a JSON array of papers:
 
 TASK:
 1. Receive paper metadata (title, authors, URL)
-2. Use fetch_pdf tool to download and extract the paper's text
+2. Use afetch_pdf tool to download and extract the paper's text
 3. Read and analyze the paper thoroughly
 4. Extract key information:
    - Main research question / problem addressed
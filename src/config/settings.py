@@ -0,0 +1,99 @@
+"""
+Runtime settings for LitSynth
+"""
+
+import os
+
+# Repository root (one level above src/)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Everything LitSynth persists between runs lives under the data directory
+DATA_DIR = os.getenv("LITSYNTH_DATA_DIR", os.path.join(PROJECT_ROOT, "data"))
+
+# Log file; relative paths (including observability_config's log_file) are
+# resolved under the data directory, never the working directory
+LOG_FILE = os.getenv("LITSYNTH_LOG_FILE")
+
+# Local paper library (metadata, extracted text and inverted index)
+LIBRARY_DIR = os.path.join(DATA_DIR, "library")
+
+# Extracted texts of library papers are appended to segment files of about this size
+TEXT_SEGMENT_MB = int(os.getenv("LITSYNTH_TEXT_SEGMENT_MB", "64"))
+
+# Minimum BM25 score for a library document to count as a discovery candidate
+LIBRARY_MIN_SCORE = float(os.getenv("LITSYNTH_LIBRARY_MIN_SCORE", "2.0"))
+
+# Cross-run cache of per-paper analyses
+ANALYSIS_CACHE_DIR = os.path.join(DATA_DIR, "analysis_cache")
+
+# Cross-run cache of discovery search results (TTL 0 disables it)
+SEARCH_CACHE_DIR = os.path.join(DATA_DIR, "search_cache")
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("LITSYNTH_SEARCH_CACHE_TTL_HOURS", "72")) * 3600
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("LITSYNTH_SEARCH_CACHE_MAX_ENTRIES", "2000"))
+
+# Cut the bibliography (and anything after it) from text sent to the analyzer
+STRIP_REFERENCES = os.getenv("LITSYNTH_STRIP_REFERENCES", "1").lower() not in ("0", "false", "no")
+
+# Parse large remote PDFs in place with HTTP Range requests when servers allow it
+RANGE_REQUESTS = os.getenv("LITSYNTH_RANGE_REQUESTS", "1").lower() not in ("0", "false", "no")
+
+# Block size of Range reads (bytes)
+RANGE_BLOCK_SIZE = int(os.getenv("LITSYNTH_RANGE_BLOCK_SIZE", str(32 * 1024)))
+
+# Hedged PDF downloads: when the first request of a download has not answered
+# within the HEDGE_PERCENTILE of recent response times, a mirror of the same
+# document (arxiv.org <-> export.arxiv.org, DOI -> open-access copy) is asked too
+HEDGE_REQUESTS = os.getenv("LITSYNTH_HEDGE_REQUESTS", "1").lower() not in ("0", "false", "no")
+HEDGE_PERCENTILE = float(os.getenv("LITSYNTH_HEDGE_PERCENTILE", "95"))
+HEDGE_DEFAULT_DELAY = float(os.getenv("LITSYNTH_HEDGE_DEFAULT_DELAY", "2.0"))
+HEDGE_MIN_DELAY = float(os.getenv("LITSYNTH_HEDGE_MIN_DELAY", "0.25"))
+
+# Contact address for Unpaywall lookups of open-access copies of DOIs (empty: no lookups)
+UNPAYWALL_EMAIL = os.getenv("LITSYNTH_UNPAYWALL_EMAIL", "")
+
+# URLs that failed permanently (paywall, 404, not a PDF) are not retried until this TTL passes
+FETCH_FAILURE_DIR = os.path.join(DATA_DIR, "fetch_failures")
+FETCH_FAILURE_TTL_SECONDS = float(os.getenv("LITSYNTH_FETCH_FAILURE_TTL_HOURS", "168")) * 3600
+
+# Per-host circuit breaker: after this many consecutive failures (timeouts, connection
+# errors, 5xx, 429) a host is skipped for CIRCUIT_RESET_SECONDS, then tried again once
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("LITSYNTH_CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("LITSYNTH_CIRCUIT_RESET_SECONDS", "120"))
+
+# Shared context cache of a review's paper corpus: "gemini" (cached-content objects) or "local" (inline)
+CONTEXT_CACHE = os.getenv("LITSYNTH_CONTEXT_CACHE", "gemini").lower()
+CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("LITSYNTH_CONTEXT_CACHE_TTL_SECONDS", "3600"))
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("LITSYNTH_CONTEXT_CACHE_MIN_TOKENS", "4096"))
+
+# Per-review run directories (phase artifacts)
+RUNS_DIR = os.path.join(DATA_DIR, "runs")
+
+# Citation graph built from extracted reference lists
+CITATION_GRAPH_DIR = os.path.join(DATA_DIR, "citation_graph")
+
+# Discovery runs this many query reformulations of the topic concurrently (1: single search)
+DISCOVERY_QUERIES = int(os.getenv("LITSYNTH_DISCOVERY_QUERIES", "3"))
+
+# Sandboxed PDF parsing: worker processes and per-document limits
+PARSE_SANDBOX = os.getenv("LITSYNTH_PARSE_SANDBOX", "1").lower() not in ("0", "false", "no")
+PARSE_WORKERS = int(os.getenv("LITSYNTH_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+PARSE_CPU_SECONDS = int(os.getenv("LITSYNTH_PARSE_CPU_SECONDS", "20"))
+PARSE_MEMORY_MB = int(os.getenv("LITSYNTH_PARSE_MEMORY_MB", "1536"))
+PARSE_TIMEOUT_SECONDS = float(os.getenv("LITSYNTH_PARSE_TIMEOUT_SECONDS", "30"))
+PARSE_START_METHOD = os.getenv("LITSYNTH_PARSE_START_METHOD", "")
+
+# Bulk ingest (src/ingest.py): concurrent downloads; parsing uses one worker per CPU core
+INGEST_CONCURRENCY = int(os.getenv("LITSYNTH_INGEST_CONCURRENCY", "8"))
+
+# Per-phase timeouts of a review in seconds (0 disables a phase's timeout)
+PHASE_TIMEOUTS = {
+    phase: float(os.getenv(f"LITSYNTH_{phase.upper()}_TIMEOUT", str(default)))
+    for phase, default in (("discovery", 300), ("analysis", 1800), ("synthesis", 600), ("refinement", 600))
+}
+
+# Review-job service (src/service.py)
+SERVICE_DIR = os.path.join(DATA_DIR, "service")
+SERVICE_HOST = os.getenv("LITSYNTH_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("LITSYNTH_SERVICE_PORT", "8765"))
+SERVICE_WORKERS = int(os.getenv("LITSYNTH_SERVICE_WORKERS", "2"))
+SERVICE_MAX_QUEUED = int(os.getenv("LITSYNTH_SERVICE_MAX_QUEUED", "100"))
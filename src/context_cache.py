@@ -0,0 +1,249 @@
+"""
+Shared context caching of a review's paper corpus
+
+Synthesis and refinement work from the same block of paper analyses and
+metadata. The pipeline registers that corpus once per review and the
+agents' model requests reference it, so only the changing draft and
+instructions travel with each call.
+
+Two implementations:
+
+    GeminiContextCache   uploads the corpus as a Gemini cached-content object
+                         (one per model and tool set of the agents using it)
+                         and points requests at it; later calls skip those
+                         input tokens, which cuts time-to-first-token and cost
+    LocalContextCache    in-process stand-in that splices the corpus into
+                         each request, for tests and offline runs
+
+Requests that cannot use a remote cache (a corpus below the provider's
+minimum size or read by a single call, a model the cache was not built for
+after a tier fallback, a failed upload) get the corpus inline, exactly like
+the local stand-in.
+
+Agents opt in with before_model_callback=attach_review_corpus; the corpus of
+the review running in the current task is set with use_review_corpus().
+"""
+
+import contextvars
+import hashlib
+import inspect
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from google.adk.tools import FunctionTool
+from google.genai import types
+
+from config import settings
+
+logger = logging.getLogger("LitSynth")
+
+# Rough characters per token, for size estimates only
+CHARS_PER_TOKEN = 4
+
+# Model calls that must read a corpus for its upload to pay off
+MIN_CACHED_READS = 2
+
+CORPUS_HEADER = "Shared paper corpus for this literature review (referenced by the requests that follow):"
+
+
+@dataclass
+class CachedCorpus:
+    """A registered corpus and the remote caches built for it"""
+    key: str
+    text: str
+    # (model, tool names) -> remote cache name
+    remote: Dict[Tuple[str, Tuple[str, ...]], str] = field(default_factory=dict)
+
+    @property
+    def estimated_tokens(self) -> int:
+        return len(self.text) // CHARS_PER_TOKEN
+
+
+class LocalContextCache:
+    """
+    In-process context cache: registered corpora are kept in memory and
+    spliced into each request as its first user turn.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.registered = 0
+        self.cached_requests = 0
+        self.inline_requests = 0
+        self.cached_tokens = 0
+
+    async def register(self, key: str, text: str, agents: List = (), reads: int = MIN_CACHED_READS) -> CachedCorpus:
+        """
+        Registers the corpus of a review.
+
+        Args:
+            key: Name of the corpus (e.g. the run ID)
+            text: Corpus text
+            agents: Agents that will reference it
+            reads: Model calls expected to read it
+
+        Returns:
+            CachedCorpus: Handle to pass to use_review_corpus()
+        """
+        with self._lock:
+            self.registered += 1
+        return CachedCorpus(key=key, text=text)
+
+    async def release(self, corpus: CachedCorpus):
+        """Drops the remote copies of a corpus (no-op locally)"""
+
+    def attach(self, corpus: CachedCorpus, llm_request):
+        """Makes a model request carry the corpus"""
+        self._inline(corpus, llm_request)
+
+    def _inline(self, corpus: CachedCorpus, llm_request):
+        llm_request.contents.insert(0, types.Content(
+            role="user", parts=[types.Part(text=f"{CORPUS_HEADER}\n\n{corpus.text}")]
+        ))
+        with self._lock:
+            self.inline_requests += 1
+
+    def stats(self) -> Dict:
+        """Reports registered corpora and how requests referenced them"""
+        return {
+            "backend": type(self).__name__,
+            "registered": self.registered,
+            "cached_requests": self.cached_requests,
+            "inline_requests": self.inline_requests,
+            "cached_tokens": self.cached_tokens,
+        }
+
+
+class GeminiContextCache(LocalContextCache):
+    """
+    Context cache backed by Gemini cached-content objects.
+
+    Cached content cannot be combined with a request's own system
+    instruction or tools, so the corpus is cached together with the tool
+    declarations of each agent that uses it, and the agent's system
+    instruction is sent as the first turn of the request instead.
+
+    Args:
+        client: google.genai client
+        ttl_seconds: Lifetime of the remote caches (they are also deleted
+                     when the review releases its corpus)
+        min_tokens: Corpora estimated below this size are sent inline
+    """
+
+    def __init__(self, client, ttl_seconds: int = settings.CONTEXT_CACHE_TTL_SECONDS,
+                 min_tokens: int = settings.CONTEXT_CACHE_MIN_TOKENS):
+        super().__init__()
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.created = 0
+        self.failures = 0
+
+    async def register(self, key: str, text: str, agents: List = (), reads: int = MIN_CACHED_READS) -> CachedCorpus:
+        corpus = await super().register(key, text, agents, reads)
+        if corpus.estimated_tokens < self.min_tokens:
+            logger.info(f"Corpus {key} (~{corpus.estimated_tokens} tokens) is below the context cache minimum, "
+                        f"sending it inline")
+            return corpus
+        if reads < MIN_CACHED_READS:
+            logger.info(f"Corpus {key} is read by {reads} call(s), sending it inline")
+            return corpus
+
+        for agent in agents:
+            if not isinstance(agent.model, str):
+                continue
+            tools = [FunctionTool(tool) if inspect.isfunction(tool) else tool for tool in agent.tools]
+            tool_key = (agent.model, tuple(sorted(tool.name for tool in tools)))
+            if tool_key in corpus.remote:
+                continue
+            declarations = [tool._get_declaration() for tool in tools if isinstance(tool, FunctionTool)]
+            digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+            try:
+                cached = await self.client.aio.caches.create(
+                    model=agent.model,
+                    config=types.CreateCachedContentConfig(
+                        display_name=f"litsynth-{key}-{digest}"[:120],
+                        contents=[types.Content(
+                            role="user", parts=[types.Part(text=f"{CORPUS_HEADER}\n\n{text}")]
+                        )],
+                        tools=[types.Tool(function_declarations=declarations)] if declarations else None,
+                        ttl=f"{int(self.ttl_seconds)}s",
+                    ),
+                )
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Context cache creation failed for {agent.model}, sending the corpus inline: {e}")
+                continue
+            corpus.remote[tool_key] = cached.name
+            self.created += 1
+            logger.info(f"Cached corpus {key} (~{corpus.estimated_tokens} tokens) for {agent.model} as {cached.name}")
+        return corpus
+
+    async def release(self, corpus: CachedCorpus):
+        for name in corpus.remote.values():
+            try:
+                await self.client.aio.caches.delete(name=name)
+            except Exception as e:
+                logger.warning(f"Could not delete context cache {name}: {e}")
+        corpus.remote.clear()
+
+    def attach(self, corpus: CachedCorpus, llm_request):
+        name = corpus.remote.get((llm_request.model, tuple(sorted(llm_request.tools_dict))))
+        if name is None:
+            self._inline(corpus, llm_request)
+            return
+
+        config = llm_request.config or types.GenerateContentConfig()
+        instruction = config.system_instruction
+        if instruction is not None:
+            text = instruction if isinstance(instruction, str) else "\n".join(
+                part.text for part in getattr(instruction, "parts", None) or [] if part.text
+            )
+            llm_request.contents.insert(0, types.Content(
+                role="user", parts=[types.Part(text=f"Instructions:\n{text}")]
+            ))
+        config.system_instruction = None
+        config.tools = None
+        config.tool_config = None
+        config.cached_content = name
+        llm_request.config = config
+        with self._lock:
+            self.cached_requests += 1
+            self.cached_tokens += corpus.estimated_tokens
+
+    def stats(self) -> Dict:
+        return {**super().stats(), "created": self.created, "failures": self.failures}
+
+
+def create_context_cache(client) -> LocalContextCache:
+    """Builds the context cache selected by LITSYNTH_CONTEXT_CACHE ("gemini" or "local")"""
+    if settings.CONTEXT_CACHE == "gemini":
+        return GeminiContextCache(client)
+    return LocalContextCache()
+
+
+# Context cache and corpus of the review running in the current task
+_review_corpus: contextvars.ContextVar[Optional[Tuple[LocalContextCache, CachedCorpus]]] = contextvars.ContextVar(
+    "review_corpus", default=None
+)
+
+
+def use_review_corpus(cache: LocalContextCache, corpus: Optional[CachedCorpus]) -> contextvars.Token:
+    """Makes the agents' model requests in the current task reference a corpus"""
+    return _review_corpus.set((cache, corpus) if corpus is not None else None)
+
+
+def reset_review_corpus(token: contextvars.Token):
+    """Restores the corpus the current task referenced before use_review_corpus()"""
+    _review_corpus.reset(token)
+
+
+def attach_review_corpus(callback_context, llm_request):
+    """before_model_callback that attaches the current review's corpus to a request"""
+    current = _review_corpus.get()
+    if current is not None:
+        cache, corpus = current
+        cache.attach(corpus, llm_request)
+    return None
@@ -0,0 +1,418 @@
+"""
+Bulk corpus ingest for LitSynth
+
+Pre-warms the local paper library with a known reading list, so reviews
+find those papers on disk instead of downloading and parsing them while
+the user waits. Downloads run with bounded concurrency; parsing is spread
+over one sandboxed worker process per CPU core.
+
+Usage:
+    python src/ingest.py reading_list.bib
+    python src/ingest.py papers.csv --concurrency 16 --workers 8
+    python src/ingest.py urls.txt --json ingest_report.json
+
+Inputs:
+    .bib    BibTeX entries; the PDF comes from url, eprint (arXiv) or doi,
+            and title, author, year and journal/booktitle become metadata
+    .csv    Rows with a url, doi or arxiv_id column, plus optional title,
+            authors (";"-separated), year and venue columns
+    other   One URL, DOI or arXiv ID per line ("#" starts a comment)
+
+Ingest is idempotent and resumable: papers already in the library are
+skipped without network access and URLs that failed permanently are
+answered by the fetch failure cache, so re-running an interrupted ingest
+continues where it stopped and only retries transient failures. DOIs of
+arXiv and ACL papers are fetched from those archives directly; other DOIs
+go through doi.org, whose landing pages are never cached as failures, so
+they are retried once LITSYNTH_UNPAYWALL_EMAIL finds open-access copies.
+
+Ingest writes the library, so it needs the library's write lock: run it
+while no review or service process has the library open.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import settings
+from records import Paper
+from storage.library import get_library
+from tools.citation_tools import DOI_PATTERN, canonical_paper_id
+from tools.mirrors import UNPAYWALL_PREFIX, mirror_urls
+from tools.pdf_tools import afetch_pdf, resize_parse_pool
+
+# New-style (1706.03762v5) and old-style (cs/0112017) arXiv identifiers
+ARXIV_ID_PATTERN = re.compile(r"^(?:arxiv:)?(\d{4}\.\d{4,5}(?:v\d+)?|[a-z\-]+(?:\.[A-Z]{2})?/\d{7}(?:v\d+)?)$",
+                              re.IGNORECASE)
+
+# Progress is reported after this many papers
+PROGRESS_EVERY = 25
+
+
+# ----------------------------------------------------------------------
+# Reading lists
+# ----------------------------------------------------------------------
+
+def identifier_url(identifier: str) -> Optional[str]:
+    """PDF URL for a URL, DOI or arXiv ID (None if it is none of these)"""
+    identifier = identifier.strip()
+    if identifier.lower().startswith(("http://", "https://")):
+        # Abstract pages link to the PDF; fetch the PDF directly
+        return re.sub(r"arxiv\.org/abs/", "arxiv.org/pdf/", identifier)
+    match = ARXIV_ID_PATTERN.match(identifier)
+    if match:
+        return f"https://arxiv.org/pdf/{match.group(1)}"
+    match = DOI_PATTERN.search(identifier)
+    if match:
+        url = f"https://doi.org/{match.group(1).rstrip('.')}"
+        # arXiv and ACL DOIs map straight to their PDFs; the resolver would
+        # only lead to a landing page
+        direct = [mirror for mirror in mirror_urls(url) if not mirror.startswith(UNPAYWALL_PREFIX)]
+        return direct[0] if direct else url
+    return None
+
+
+def _paper(url: str = None, doi: str = None, arxiv_id: str = None, title: str = None,
+           authors: List[str] = (), year=None, venue: str = None) -> Optional[Paper]:
+    """Builds the record of one reading-list entry, or None if it names no PDF"""
+    url = identifier_url(url or "") or identifier_url(arxiv_id or "") or identifier_url(doi or "")
+    if url is None:
+        return None
+    return Paper(title=title or None, authors=authors, year=year, venue=venue or None, url=url,
+                 doi=doi or None, arxiv_id=arxiv_id or None)
+
+
+def _split_authors(value: str, separator: str) -> List[str]:
+    return [name.strip() for name in re.split(separator, value or "") if name.strip()]
+
+
+def _bibtex_entries(text: str):
+    """Yields the fields of each BibTeX entry (lower-case names, braces removed)"""
+    position = 0
+    while True:
+        start = text.find("@", position)
+        if start < 0:
+            return
+        open_brace = text.find("{", start)
+        if open_brace < 0:
+            return
+        kind = text[start + 1:open_brace].strip().lower()
+        # Find the matching closing brace of the entry
+        depth = 0
+        end = open_brace
+        for end in range(open_brace, len(text)):
+            if text[end] == "{":
+                depth += 1
+            elif text[end] == "}":
+                depth -= 1
+                if depth == 0:
+                    break
+        body = text[open_brace + 1:end]
+        position = end + 1
+        if kind in ("comment", "preamble", "string"):
+            continue
+        yield _bibtex_fields(body)
+
+
+def _bibtex_fields(body: str) -> Dict[str, str]:
+    fields = {}
+    # Skip the citation key
+    position = body.find(",") + 1 if "," in body else len(body)
+    field_start = re.compile(r"\s*([A-Za-z][\w\-]*)\s*=\s*")
+    while position < len(body):
+        match = field_start.match(body, position)
+        if not match:
+            position += 1
+            continue
+        name = match.group(1).lower()
+        position = match.end()
+        if position >= len(body):
+            break
+        if body[position] in "{\"":
+            # Braced or quoted value; braces may nest inside either
+            quoted = body[position] == "\""
+            depth = 0 if quoted else 1
+            end = position + 1
+            while end < len(body):
+                char = body[end]
+                if char == "{":
+                    depth += 1
+                elif char == "}":
+                    depth -= 1
+                    if depth == 0 and not quoted:
+                        break
+                elif char == "\"" and quoted and depth == 0:
+                    break
+                end += 1
+            value = body[position + 1:end]
+            position = end + 1
+        else:
+            end = body.find(",", position)
+            end = len(body) if end < 0 else end
+            value = body[position:end]
+            position = end
+        fields[name] = re.sub(r"\s+", " ", value.replace("{", "").replace("}", "")).strip()
+        comma = body.find(",", position)
+        position = len(body) if comma < 0 else comma + 1
+    return fields
+
+
+def read_bibtex(path: str) -> List[Optional[Paper]]:
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    papers = []
+    for fields in _bibtex_entries(text):
+        arxiv_id = fields.get("eprint") if fields.get("archiveprefix", "arxiv").lower() == "arxiv" else None
+        papers.append(_paper(
+            url=fields.get("url"), doi=fields.get("doi"), arxiv_id=arxiv_id, title=fields.get("title"),
+            authors=_split_authors(fields.get("author", ""), r"\s+and\s+"), year=fields.get("year"),
+            venue=fields.get("journal") or fields.get("booktitle"),
+        ))
+    return papers
+
+
+def read_csv(path: str) -> List[Optional[Paper]]:
+    papers = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            row = {key.strip().lower(): (value or "").strip() for key, value in row.items() if key is not None}
+            papers.append(_paper(
+                url=row.get("url") or row.get("pdf_url"), doi=row.get("doi"),
+                arxiv_id=row.get("arxiv_id") or row.get("arxiv"), title=row.get("title"),
+                authors=_split_authors(row.get("authors") or row.get("author", ""), r";|\s+and\s+"),
+                year=row.get("year"), venue=row.get("venue") or row.get("journal"),
+            ))
+    return papers
+
+
+def read_identifiers(path: str) -> List[Optional[Paper]]:
+    papers = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                papers.append(_paper(url=line))
+    return papers
+
+
+def load_reading_list(path: str) -> Tuple[List[Paper], int]:
+    """
+    Reads a reading list and drops duplicates (by canonical paper ID).
+
+    Returns:
+        tuple: (papers in file order, number of entries without a usable
+               URL, DOI or arXiv ID)
+    """
+    extension = os.path.splitext(path)[1].lower()
+    reader = {".bib": read_bibtex, ".csv": read_csv}.get(extension, read_identifiers)
+    papers = []
+    unusable = 0
+    seen = set()
+    for paper in reader(path):
+        if paper is None:
+            unusable += 1
+            continue
+        paper_id = canonical_paper_id(paper.to_dict())
+        if paper_id not in seen:
+            seen.add(paper_id)
+            papers.append(paper)
+    return papers, unusable
+
+
+# ----------------------------------------------------------------------
+# Ingest
+# ----------------------------------------------------------------------
+
+def failure_category(message: str) -> str:
+    """Groups fetch_pdf (and ingest) error messages for the failure breakdown"""
+    message = message or ""
+    if message.startswith("Ingest error:"):
+        return f"ingest error ({message.split(':')[1].strip()})"
+    if message.startswith("Skipped: failed before"):
+        return "known failure"
+    if message.startswith("Skipped:"):
+        return "host circuit open"
+    if "timed out" in message:
+        return "timeout"
+    status = re.search(r"\b([45]\d\d)\b", message) if message.startswith("Failed to download") else None
+    if status:
+        return f"HTTP {status.group(1)}"
+    if message.startswith("Failed to download"):
+        return "connection error"
+    if "does not point to a PDF" in message:
+        return "not a PDF"
+    if message.startswith("PDF pars"):
+        return "parse limit or crash"
+    return "extraction error"
+
+
+class IngestReport:
+    """Counts, volume and failure breakdown of one ingest run"""
+
+    def __init__(self, total: int, unusable: int = 0):
+        self.total = total
+        self.unusable = unusable
+        self.fetched = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes_downloaded = 0
+        self.failures: Counter = Counter()
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    @property
+    def done(self) -> int:
+        return self.fetched + self.skipped + self.failed
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def summary(self) -> Dict:
+        elapsed = max(self.elapsed, 1e-9)
+        return {
+            "total": self.total,
+            "done": self.done,
+            "fetched": self.fetched,
+            "already_in_library": self.skipped,
+            "failed": self.failed,
+            "unusable_entries": self.unusable,
+            "bytes_downloaded": self.bytes_downloaded,
+            "seconds": round(self.elapsed, 2),
+            "docs_per_second": round(self.fetched / elapsed, 2),
+            "bytes_per_second": round(self.bytes_downloaded / elapsed, 1),
+            "failures": dict(self.failures.most_common()),
+        }
+
+
+async def ingest(papers: List[Paper], concurrency: int = settings.INGEST_CONCURRENCY,
+                 report: IngestReport = None,
+                 progress: Callable[[IngestReport], None] = None) -> IngestReport:
+    """
+    Fetches, parses and files papers in the local library.
+
+    Args:
+        papers: Papers to ingest (each needs a url)
+        concurrency: Downloads in flight at once
+        report: Report to fill in (default: a new one)
+        progress: Called with the report after every PROGRESS_EVERY papers
+
+    Returns:
+        IngestReport: Counts, bytes and failures of the run
+    """
+    report = report or IngestReport(len(papers))
+    library = get_library()
+    queue = iter(papers)
+
+    async def ingest_one(paper: Paper) -> Tuple[str, Dict]:
+        """Returns ("skipped" | "fetched" | "failed", fetch_pdf result or {})"""
+        metadata = paper.to_dict()
+        described = any(key in metadata for key in ("title", "authors", "doi", "arxiv_id"))
+        paper_id = await asyncio.to_thread(library.find_by_url, paper.url)
+        if paper_id is not None:
+            # An earlier run may have stopped between fetching and filing the metadata
+            stored = await asyncio.to_thread(library.get_metadata, paper_id)
+            if described and not (stored or {}).get("title"):
+                await asyncio.to_thread(library.update_metadata, metadata)
+            return "skipped", {}
+        result = await afetch_pdf(paper.url)
+        if result["status"] != "success":
+            return "failed", result
+        if described:
+            await asyncio.to_thread(library.update_metadata, metadata)
+        return "fetched", result
+
+    async def worker():
+        for paper in queue:
+            try:
+                outcome, result = await ingest_one(paper)
+            except Exception as e:
+                # One broken paper (or library write) must not stop the other workers;
+                # a re-run files the metadata of a paper whose text was already stored
+                outcome, result = "failed", {"message": f"Ingest error: {type(e).__name__}: {e}"}
+            if outcome == "skipped":
+                report.skipped += 1
+            elif outcome == "fetched":
+                report.fetched += 1
+                report.bytes_downloaded += result.get("bytes_downloaded", 0)
+            else:
+                report.failed += 1
+                report.failures[failure_category(result.get("message"))] += 1
+            if progress is not None and report.done % PROGRESS_EVERY == 0:
+                progress(report)
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(papers))))))
+    finally:
+        report.finished = time.perf_counter()
+    return report
+
+
+def _print_progress(report: IngestReport):
+    summary = report.summary()
+    print(f"  {report.done:>6}/{report.total}  fetched {report.fetched}  in library {report.skipped}  "
+          f"failed {report.failed}  {summary['docs_per_second']:.1f} docs/s  "
+          f"{summary['bytes_per_second'] / 1e6:.2f} MB/s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pre-warm the LitSynth paper library from a reading list")
+    parser.add_argument("path", help="BibTeX (.bib), CSV (.csv) or text file of URLs / DOIs / arXiv IDs")
+    parser.add_argument("--concurrency", type=int, default=settings.INGEST_CONCURRENCY,
+                        help="Downloads in flight at once")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Parse worker processes (default: one per CPU core)")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    library = get_library()
+    if library.read_only:
+        print(f"❌ The paper library in {library.directory} is in use by another process "
+              f"(e.g. the review service); stop it and re-run the ingest")
+        return 1
+
+    papers, unusable = load_reading_list(args.path)
+    print(f"📚 Ingesting {len(papers)} papers from {args.path} "
+          f"({args.concurrency} downloads, {args.workers} parse workers)")
+    if unusable:
+        print(f"⚠️  {unusable} entries have no URL, DOI or arXiv ID and were skipped")
+    if settings.PARSE_SANDBOX:
+        resize_parse_pool(args.workers)
+    else:
+        print("⚠️  LITSYNTH_PARSE_SANDBOX is off: parsing runs in this process on a single core")
+
+    report = IngestReport(len(papers), unusable)
+    interrupted = False
+    try:
+        asyncio.run(ingest(papers, args.concurrency, report, progress=_print_progress))
+    except KeyboardInterrupt:
+        interrupted = True
+        report.finished = report.finished or time.perf_counter()
+
+    summary = report.summary()
+    print(f"\n{'🛑 Interrupted' if interrupted else '✅ Done'} in {summary['seconds']:.1f}s: "
+          f"{report.fetched} fetched, {report.skipped} already in library, {report.failed} failed")
+    print(f"  {summary['docs_per_second']:.2f} docs/s, {summary['bytes_per_second'] / 1e6:.2f} MB/s "
+          f"({report.bytes_downloaded / 1e6:.1f} MB downloaded)")
+    if report.failures:
+        print("  Failures:")
+        for category, count in report.failures.most_common():
+            print(f"    {category:<22} {count}")
+    if interrupted:
+        print("  Re-run the same command to continue; finished papers are skipped.")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return 130 if interrupted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
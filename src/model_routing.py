@@ -0,0 +1,247 @@
+"""
+Per-agent model tiers for LitSynth
+
+Models and generation settings come from model_inference_config in
+.agent_engine_config.json:
+
+    "model_inference_config": {
+        "model": "gemini-2.0-flash",          default model of every tier
+        "max_output_tokens": 8192,            default generation settings
+        "temperature": 0.1,
+        "tiers": {                            fastest first
+            "fast":     {"model": "gemini-2.0-flash-lite"},
+            "standard": {"model": "gemini-2.0-flash"},
+            "strong":   {"model": "gemini-2.5-pro", "temperature": 0.3}
+        },
+        "agents": {                           tier and settings per agent
+            "SynthesisAgent": {"tier": "strong", "max_output_tokens": 8192}
+        },
+        "latency_budgets": {"synthesis": 120} seconds per review phase
+    }
+
+A phase with a latency budget routes each model call to the configured
+tier only while the call is expected to fit into what is left of the
+budget (median of that agent's recent calls on the tier); otherwise, and
+once the budget is spent, the next faster tier is used. Agents with a
+search-grounding tool (PaperDiscoveryAgent) always stay on their configured
+tier, since faster models may not support grounding. Call timings are kept
+per tier so the routing can be tuned.
+"""
+
+import contextvars
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from google.genai import types
+
+from config.engine_config import engine_config_section
+
+DEFAULT_TIER_ORDER = ("fast", "standard", "strong")
+
+# Tier of each agent when model_inference_config does not name one
+DEFAULT_AGENT_TIERS = {
+    "PaperDiscoveryAgent": "standard",
+    "PaperAnalyzerAgent": "standard",
+    "SynthesisAgent": "strong",
+    "RefinementAgent": "fast",
+    "ResearchCoordinator": "fast",
+}
+
+# Generation settings that can be set per tier and per agent
+GENERATION_KEYS = ("temperature", "max_output_tokens", "top_p", "top_k")
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+# Built-in tools that need a model with search grounding; agents using them never fall back
+GROUNDING_TOOLS = ("google_search",)
+
+# Recent call durations kept per (agent, tier), and the samples needed to predict one
+TIMING_WINDOW = 50
+MIN_TIMING_SAMPLES = 3
+
+# (phase, perf_counter at its start) of the review running in the current task
+_phase_clock: contextvars.ContextVar[Optional[Tuple[str, float]]] = contextvars.ContextVar(
+    "phase_clock", default=None
+)
+
+
+class ModelRouter:
+    """
+    Resolves the model and generation settings of each agent and routes
+    calls to faster tiers when a phase runs over its latency budget.
+
+    Args:
+        config: model_inference_config section (default: read from the
+                engine config)
+    """
+
+    def __init__(self, config: Dict = None):
+        config = engine_config_section("model_inference_config") if config is None else dict(config)
+        self.default_model = config.get("model") or DEFAULT_MODEL
+        defaults = {key: config[key] for key in GENERATION_KEYS if key in config}
+
+        tiers = config.get("tiers") or {}
+        self.tier_order: List[str] = list(tiers) or list(DEFAULT_TIER_ORDER)
+        self.tiers: Dict[str, Dict] = {}
+        for name in self.tier_order:
+            tier = dict(tiers.get(name) or {})
+            self.tiers[name] = {"model": tier.pop("model", self.default_model), **defaults, **tier}
+
+        self.agents: Dict[str, Dict] = {
+            name: dict(settings) for name, settings in (config.get("agents") or {}).items()
+        }
+        self.latency_budgets: Dict[str, float] = {
+            phase: float(seconds) for phase, seconds in (config.get("latency_budgets") or {}).items()
+        }
+
+        self._lock = threading.Lock()
+        self._timings: Dict[Tuple[str, str], deque] = {}
+        self._tier_stats: Dict[str, Dict] = {}
+
+    # ------------------------------------------------------------------
+    # Static configuration
+    # ------------------------------------------------------------------
+
+    def tier_for(self, agent_name: str) -> str:
+        """Configured tier of an agent (falls back to the middle tier)"""
+        tier = self.agents.get(agent_name, {}).get("tier") or DEFAULT_AGENT_TIERS.get(agent_name)
+        if tier not in self.tiers:
+            tier = self.tier_order[len(self.tier_order) // 2]
+        return tier
+
+    def model_for(self, agent_name: str, tier: str = None) -> str:
+        """Model name an agent uses on a tier (default: its configured tier)"""
+        agent_settings = self.agents.get(agent_name, {})
+        if tier is None and agent_settings.get("model"):
+            return agent_settings["model"]
+        return self.tiers[tier or self.tier_for(agent_name)]["model"]
+
+    def generate_config(self, agent_name: str, tier: str = None) -> types.GenerateContentConfig:
+        """Generation settings of an agent on a tier: tier settings, then the agent's own"""
+        settings = {key: value for key, value in self.tiers[tier or self.tier_for(agent_name)].items()
+                    if key in GENERATION_KEYS}
+        settings.update({key: value for key, value in self.agents.get(agent_name, {}).items()
+                         if key in GENERATION_KEYS})
+        return types.GenerateContentConfig(**settings)
+
+    def configure(self, agent):
+        """Applies an agent's configured model and generation settings to it"""
+        agent.model = self.model_for(agent.name)
+        agent.generate_content_config = self.generate_config(agent.name)
+        return agent
+
+    # ------------------------------------------------------------------
+    # Latency-budget routing
+    # ------------------------------------------------------------------
+
+    def start_phase(self, phase: str):
+        """Starts the latency-budget clock of a phase for the current task"""
+        _phase_clock.set((phase, time.perf_counter()))
+
+    def budget_left(self) -> Optional[float]:
+        """Seconds left in the current phase's budget (None: no budget)"""
+        clock = _phase_clock.get()
+        if clock is None or clock[0] not in self.latency_budgets:
+            return None
+        phase, started = clock
+        return self.latency_budgets[phase] - (time.perf_counter() - started)
+
+    def expected_seconds(self, agent_name: str, tier: str) -> Optional[float]:
+        """Median of an agent's recent calls on a tier (None until enough were timed)"""
+        with self._lock:
+            samples = list(self._timings.get((agent_name, tier), ()))
+        return statistics.median(samples) if len(samples) >= MIN_TIMING_SAMPLES else None
+
+    def select_tier(self, agent_name: str) -> Tuple[str, bool]:
+        """
+        Picks the tier of the next call of an agent.
+
+        Returns:
+            tuple: (tier, True if it is a faster fallback of the configured tier)
+        """
+        configured = tier = self.tier_for(agent_name)
+        left = self.budget_left()
+        if left is None:
+            return tier, False
+        position = self.tier_order.index(tier)
+        while position > 0:
+            expected = self.expected_seconds(agent_name, tier)
+            if left > 0 and (expected is None or expected <= left):
+                break
+            position -= 1
+            tier = self.tier_order[position]
+        return tier, tier != configured
+
+    def route(self, agent) -> Tuple[object, str, bool]:
+        """
+        Returns the agent to run for the next call, its tier and whether the
+        call falls back to a faster tier. A fallback runs on a copy of the
+        agent, so concurrent reviews never see each other's routing. Agents
+        given a model object instead of a name (test doubles) are run as is,
+        and agents with a grounding tool always run on their configured tier.
+        """
+        if _uses_grounding(agent):
+            return agent, self.tier_for(agent.name), False
+        tier, fallback = self.select_tier(agent.name)
+        if fallback and isinstance(agent.model, str):
+            agent = agent.model_copy(update={
+                "model": self.model_for(agent.name, tier),
+                "generate_content_config": self.generate_config(agent.name, tier),
+            })
+        return agent, tier, fallback
+
+    def routed_model(self, agent_name: str, tier: str, fallback: bool) -> str:
+        """Name of the model a routed call runs on (see route)"""
+        return self.model_for(agent_name, tier if fallback else None)
+
+    # ------------------------------------------------------------------
+    # Timings
+    # ------------------------------------------------------------------
+
+    def record(self, agent_name: str, tier: str, seconds: float, fallback: bool = False,
+               failed: bool = False):
+        """Books one model call of an agent on a tier"""
+        with self._lock:
+            stats = self._tier_stats.setdefault(tier, {
+                "calls": 0, "failures": 0, "fallbacks": 0, "seconds": 0.0, "recent": deque(maxlen=TIMING_WINDOW)
+            })
+            stats["calls"] += 1
+            stats["failures"] += failed
+            stats["fallbacks"] += fallback
+            stats["seconds"] += seconds
+            if not failed:
+                stats["recent"].append(seconds)
+                self._timings.setdefault((agent_name, tier), deque(maxlen=TIMING_WINDOW)).append(seconds)
+
+    def stats(self) -> Dict:
+        """Reports calls, fallbacks and latency percentiles per tier"""
+        report = {}
+        with self._lock:
+            for tier in self.tier_order:
+                stats = self._tier_stats.get(tier)
+                if stats is None:
+                    continue
+                recent = sorted(stats["recent"])
+                report[tier] = {
+                    "model": self.tiers[tier]["model"],
+                    "calls": stats["calls"],
+                    "failures": stats["failures"],
+                    "fallbacks": stats["fallbacks"],
+                    "total_seconds": round(stats["seconds"], 3),
+                    "p50_seconds": round(_percentile(recent, 50), 3),
+                    "p95_seconds": round(_percentile(recent, 95), 3),
+                }
+        return report
+
+
+def _uses_grounding(agent) -> bool:
+    return any(getattr(tool, "name", None) in GROUNDING_TOOLS for tool in getattr(agent, "tools", ()))
+
+
+def _percentile(ordered: List[float], percentile: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
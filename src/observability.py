@@ -1,21 +1,255 @@
 """
 Simplified observability for LitSynth
+
+Logging is configured once per process from observability_config in
+.agent_engine_config.json. Log calls only enqueue the record; a background
+QueueListener formats it and writes JSON lines to a size/time-rotated file
+under the data directory (plus readable lines on the console). Records carry the run ID, phase and
+paper index of the review that emitted them.
+
+Only the 'LitSynth' logger is routed this way, so a program that imports
+LitSynth (the service under another server, pytest) keeps its own logging
+configuration. LitSynth's command-line entry points also call
+capture_root_logging, which sends every other library's records (google.adk,
+httpx, ...) to the same writer.
 """
 
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from config import settings
+from config.engine_config import engine_config_section
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Defaults for keys missing from observability_config
+DEFAULT_OBSERVABILITY_CONFIG = {
+    "enabled": True,
+    "log_level": "INFO",
+    "log_file": "litsynth.log",
+    "log_format": "json",
+    "console": True,
+    "rotation": {
+        "max_bytes": 10 * 1024 * 1024,
+        "backup_count": 5,
+        "interval_hours": 24,
+    },
+}
+
+# Context fields stamped on every record (None outside a review)
+LOG_CONTEXT_FIELDS = ("run_id", "phase", "paper")
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_log_context: contextvars.ContextVar[Dict] = contextvars.ContextVar("log_context", default={})
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+_logging_lock = threading.Lock()
+
+
+def bind_log_context(**fields) -> contextvars.Token:
+    """
+    Adds fields (run_id, phase, paper) to the log records of the current
+    task or thread.
+
+    Returns:
+        Token: Pass to reset_log_context to restore the previous fields
+    """
+    return _log_context.set({**_log_context.get(), **fields})
+
+
+def reset_log_context(token: contextvars.Token):
+    _log_context.reset(token)
+
+
+@contextmanager
+def log_context(**fields):
+    """Binds log context fields for the duration of a with block"""
+    token = bind_log_context(**fields)
+    try:
+        yield
+    finally:
+        reset_log_context(token)
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records for the background listener.
+
+    Runs on the logging thread, so it captures the log context there and
+    leaves all formatting and I/O to the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        context = _log_context.get()
+        for name in LOG_CONTEXT_FIELDS:
+            setattr(record, name, context.get(name))
+        return record
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record with timestamp, level, message and context"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in LOG_CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        entry["thread"] = record.threadName
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RotatingLogFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Numbered-backup file handler that rotates when the file reaches
+    max_bytes or when interval_seconds have passed since it was opened.
+    """
+
+    def __init__(self, filename: str, max_bytes: int = 0, backup_count: int = 0,
+                 interval_seconds: float = 0, encoding: str = "utf-8"):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding)
+        self.interval_seconds = interval_seconds
+        self._rollover_at = time.time() + interval_seconds if interval_seconds else None
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self._rollover_at is not None and time.time() >= self._rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        if self.interval_seconds:
+            self._rollover_at = time.time() + self.interval_seconds
 
-def setup_logging():
-    """Setup comprehensive logging for the agent system"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('litsynth.log'),
-            logging.StreamHandler()
-        ]
-    )
+
+def _observability_config(overrides: Dict = None) -> Dict:
+    config = {**DEFAULT_OBSERVABILITY_CONFIG, **engine_config_section("observability_config"), **(overrides or {})}
+    config["rotation"] = {**DEFAULT_OBSERVABILITY_CONFIG["rotation"], **(config.get("rotation") or {})}
+    return config
+
+
+def log_file_path(config: Dict = None) -> Optional[str]:
+    """
+    Absolute path of the log file: LITSYNTH_LOG_FILE, else log_file from
+    observability_config; relative paths resolve under the data directory
+    so the log never lands in whatever directory the process started in.
+    """
+    path = settings.LOG_FILE or (config or _observability_config())["log_file"]
+    if not path:
+        return None
+    return os.path.abspath(os.path.join(settings.DATA_DIR, os.path.expanduser(path)))
+
+
+def _build_handlers(config: Dict) -> list:
+    handlers = []
+    log_file = log_file_path(config)
+    if config["enabled"] and log_file:
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        rotation = config["rotation"]
+        file_handler = RotatingLogFileHandler(
+            log_file,
+            max_bytes=int(rotation["max_bytes"] or 0),
+            backup_count=int(rotation["backup_count"] or 0),
+            interval_seconds=float(rotation["interval_hours"] or 0) * 3600,
+        )
+        json_lines = str(config["log_format"]).lower() == "json"
+        file_handler.setFormatter(JsonLineFormatter() if json_lines else logging.Formatter(TEXT_FORMAT))
+        handlers.append(file_handler)
+    if config["console"]:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(console_handler)
+    return handlers
+
+
+def setup_logging(config: Dict = None):
+    """
+    Configures the 'LitSynth' logger on first call; later calls only return
+    it. Other loggers, including the root logger, are left alone.
+
+    Args:
+        config: Overrides for observability_config keys (first call only)
+
+    Returns:
+        logging.Logger: The 'LitSynth' logger
+    """
+    global _listener, _queue_handler
+    with _logging_lock:
+        if _listener is None:
+            config = _observability_config(config)
+            records = queue.SimpleQueue()
+            _listener = logging.handlers.QueueListener(
+                records, *_build_handlers(config), respect_handler_level=True
+            )
+            _queue_handler = ContextQueueHandler(records)
+            logger = logging.getLogger('LitSynth')
+            logger.addHandler(_queue_handler)
+            logger.setLevel(str(config["log_level"]).upper())
+            # The host program's root handlers would write every record twice
+            logger.propagate = False
+            _listener.start()
+            # Registered after logging's own exit hook, so it runs first and
+            # drains the queue before handlers are closed
+            atexit.register(stop_logging)
     return logging.getLogger('LitSynth')
 
+
+def capture_root_logging():
+    """
+    Sends the records of every logger to LitSynth's log writer by replacing
+    the root logger's handlers, at the configured level. Only for LitSynth's
+    own command-line entry points, which own the process.
+    """
+    logger = setup_logging()
+    with _logging_lock:
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+        root.setLevel(logger.level)
+
+
+def stop_logging():
+    """Flushes queued records and stops the background writer"""
+    global _listener
+    with _logging_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
 def create_observability_plugin():
     """Create a simple observability setup"""
     logger = setup_logging()
@@ -23,4 +257,83 @@ def create_observability_plugin():
     return None  # Return None since we're using basic logging
 
 # Global logger instance
-logger = setup_logging()
\ No newline at end of file
+logger = setup_logging()
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None where it cannot be read"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        # ru_maxrss is the lifetime peak (KB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    return None
+
+
+class PhaseMemoryMonitor:
+    """
+    Samples resident memory in a background thread and records the peak
+    reached during each pipeline phase.
+
+    Usage:
+        memory = PhaseMemoryMonitor()
+        memory.start_phase("discovery")
+        ...
+        memory.start_phase("analysis")  # closes "discovery"
+        ...
+        memory.finish()
+        memory.report()  # {"discovery": {"start_mb", "peak_mb", "end_mb"}, ...}
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.phases: Dict[str, Dict] = {}
+        self._current: Optional[str] = None
+        self._start = 0
+        self._peak = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> int:
+        rss = current_rss_bytes() or 0
+        with self._lock:
+            self._peak = max(self._peak, rss)
+        return rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _close_phase(self):
+        if self._current is None:
+            return
+        end = self._sample()
+        self.phases[self._current] = {
+            "start_mb": round(self._start / (1024 * 1024), 1),
+            "peak_mb": round(self._peak / (1024 * 1024), 1),
+            "end_mb": round(end / (1024 * 1024), 1),
+        }
+        self._current = None
+
+    def start_phase(self, name: str):
+        """Closes the running phase (if any) and starts measuring a new one"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="litsynth-memory")
+            self._thread.start()
+        self._close_phase()
+        with self._lock:
+            self._start = self._peak = current_rss_bytes() or 0
+        self._current = name
+
+    def finish(self):
+        """Closes the running phase and stops sampling"""
+        self._close_phase()
+        self._stop.set()
+
+    def report(self) -> Dict[str, Dict]:
+        return dict(self.phases)
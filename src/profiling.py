@@ -0,0 +1,342 @@
+"""
+Opt-in profiling of LitSynth reviews (python src/agent.py --profile ...)
+
+While a review runs under a ReviewProfiler:
+
+    - each phase runs under its own cProfile profiler (event-loop thread)
+    - each synchronous tool call switches to a profiler of its own for its
+      duration; awaited (async) tool calls are timed by wall clock only,
+      since other coroutines run while they wait and would be charged to
+      them
+    - tracemalloc snapshots bracket every phase and synchronous tool call,
+      giving the top allocation sites and the peak traced memory
+    - a sampling thread records the stacks of all threads, including the
+      helper threads that download and parse PDFs
+
+Reports are written to the profile/ directory of the run:
+
+    <phase>.txt     top functions by cumulative time (tool calls included),
+                    top allocation sites and peak traced memory
+    <phase>.prof    raw pstats data (snakeviz, pstats.Stats)
+    tools.txt       the same per tool (calls and wall time for async tools)
+    stacks.folded   collapsed stacks ("phase;thread;frame;... samples") for
+                    flamegraph.pl or speedscope
+
+This module is only imported when profiling is requested, so reviews run
+without it pay nothing.
+"""
+
+import cProfile
+import functools
+import inspect
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+# Rows per report table
+TOP_ENTRIES = 25
+
+# Seconds between stack samples
+SAMPLE_INTERVAL = 0.005
+
+# Allocations made by the profiler itself are left out of the reports
+_IGNORED_ALLOCATIONS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_IGNORED_ALLOCATIONS)
+
+
+class _Section:
+    """Measurements of one phase or one tool, accumulated over its runs"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.peak_bytes = 0
+        self.stats: Optional[pstats.Stats] = None
+        # Only calls and wall time are measured (awaited tools)
+        self.wall_clock_only = False
+        # (file, line) -> net bytes / blocks allocated
+        self.allocated_bytes: Counter = Counter()
+        self.allocated_blocks: Counter = Counter()
+
+    def add_profile(self, profile: cProfile.Profile):
+        if self.stats is None:
+            self.stats = pstats.Stats(profile)
+        else:
+            self.stats.add(profile)
+
+    def add_allocations(self, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot):
+        for diff in after.compare_to(before, "lineno"):
+            frame = diff.traceback[0]
+            site = (frame.filename, frame.lineno)
+            self.allocated_bytes[site] += diff.size_diff
+            self.allocated_blocks[site] += diff.count_diff
+
+    def report(self, heading: str) -> str:
+        out = io.StringIO()
+        out.write(f"{heading}: {self.name}\n")
+        out.write(f"Calls: {self.calls}\n")
+        out.write(f"Wall time: {self.seconds:.3f} s\n")
+        if self.wall_clock_only:
+            out.write("Awaited tool: other coroutines run during its calls, so only wall time is measured\n")
+            return out.getvalue()
+        out.write(f"Peak traced memory: {self.peak_bytes / (1024 * 1024):.1f} MB\n\n")
+
+        out.write(f"Top {TOP_ENTRIES} functions by cumulative time\n")
+        if self.stats is not None:
+            self.stats.stream = out
+            self.stats.sort_stats("cumulative").print_stats(TOP_ENTRIES)
+        else:
+            out.write("  (no profile data)\n\n")
+
+        out.write(f"Top {TOP_ENTRIES} allocation sites (net growth)\n")
+        for (filename, lineno), size in self.allocated_bytes.most_common(TOP_ENTRIES):
+            if size <= 0:
+                break
+            out.write(f"  {size / 1024:>12,.1f} KB  {self.allocated_blocks[(filename, lineno)]:>+9,d} blocks  "
+                      f"{filename}:{lineno}\n")
+        return out.getvalue()
+
+
+class _StackSampler(threading.Thread):
+    """Samples the stacks of all other threads into collapsed-stack counts"""
+
+    def __init__(self, label: Callable[[], str], interval: float = SAMPLE_INTERVAL):
+        super().__init__(daemon=True, name="litsynth-profiler")
+        self.label = label
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            label = self.label()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == self.ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}".replace(" ", "_"))
+                    frame = frame.f_back
+                thread = names.get(ident, str(ident)).replace(" ", "_")
+                self.counts[";".join([label, thread, *reversed(stack)])] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class ReviewProfiler:
+    """
+    Profiles the phases and tool calls of one review.
+
+    Usage:
+        profiler = ReviewProfiler(output_dir)
+        profiler.start()
+        profiler.start_phase("discovery")
+        await Runner(agent=profiler.instrument(analyzer_agent), ...)...
+        ...
+        profiler.finish()  # writes the reports, returns a summary
+
+    Args:
+        output_dir: Directory for the reports
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.phases: Dict[str, _Section] = {}
+        self.tools: Dict[str, _Section] = {}
+
+        self._phase: Optional[_Section] = None
+        self._phase_profile: Optional[cProfile.Profile] = None
+        self._phase_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._phase_started = 0.0
+        self._phase_peak = 0
+        self._tool_profiles: Dict[str, List[cProfile.Profile]] = {}
+        # tool function -> its profiled wrapper
+        self._wrapped: Dict[Callable, Callable] = {}
+        self._owns_tracemalloc = False
+        self._sampler: Optional[_StackSampler] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+            self._owns_tracemalloc = True
+        self._sampler = _StackSampler(lambda: self._phase.name if self._phase else "setup")
+        self._sampler.start()
+
+    def instrument(self, llm_agent):
+        """
+        Returns a copy of an agent whose function tools are profiled. The
+        agent itself is left alone, so other reviews sharing it are not
+        measured.
+        """
+        if not any(inspect.isfunction(tool) for tool in llm_agent.tools):
+            return llm_agent
+        tools = []
+        for tool in llm_agent.tools:
+            if inspect.isfunction(tool):
+                if tool not in self._wrapped:
+                    self._wrapped[tool] = self.wrap_tool(tool)
+                tool = self._wrapped[tool]
+            tools.append(tool)
+        return llm_agent.model_copy(update={"tools": tools})
+
+    def start_phase(self, name: str):
+        """Closes the running phase (if any) and starts profiling a new one"""
+        self._close_phase()
+        self._phase = self.phases.setdefault(name, _Section(name))
+        self._phase.calls += 1
+        self._phase_snapshot = _snapshot()
+        tracemalloc.reset_peak()
+        self._phase_peak = 0
+        self._phase_started = time.perf_counter()
+        self._phase_profile = cProfile.Profile()
+        self._phase_profile.enable()
+
+    def _close_phase(self):
+        if self._phase is None:
+            return
+        self._phase_profile.disable()
+        self._phase.seconds += time.perf_counter() - self._phase_started
+        self._phase.peak_bytes = max(self._phase.peak_bytes, self._phase_peak, tracemalloc.get_traced_memory()[1])
+        self._phase.add_profile(self._phase_profile)
+        for profile in self._tool_profiles.pop(self._phase.name, []):
+            self._phase.add_profile(profile)
+        self._phase.add_allocations(self._phase_snapshot, _snapshot())
+        self._phase = None
+        self._phase_profile = None
+        self._phase_snapshot = None
+
+    def finish(self) -> Dict:
+        """
+        Stops profiling and writes the reports.
+
+        Returns:
+            dict: {"output_dir", "phases": {name: {"seconds", "peak_mb"}},
+                   "tools": {name: {"calls", "seconds", "peak_mb"}}}
+        """
+        self._close_phase()
+        if self._sampler is not None:
+            self._sampler.stop()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+        self._write_reports()
+        return {
+            "output_dir": self.output_dir,
+            "phases": {name: _summary(section) for name, section in self.phases.items()},
+            "tools": {name: _summary(section) for name, section in self.tools.items()},
+        }
+
+    # ------------------------------------------------------------------
+    # Tool calls
+    # ------------------------------------------------------------------
+
+    def wrap_tool(self, func: Callable) -> Callable:
+        """
+        Returns func wrapped with per-call profiling (same name, signature and
+        docs). Async tools are timed by wall clock only: swapping profilers
+        across an await would charge every coroutine that runs meanwhile to
+        the tool, and concurrent calls would clobber each other's profiler.
+        """
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def profiled(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    section = self.tools.setdefault(func.__name__, _Section(func.__name__))
+                    section.wall_clock_only = True
+                    section.calls += 1
+                    section.seconds += time.perf_counter() - started
+        else:
+            @functools.wraps(func)
+            def profiled(*args, **kwargs):
+                state = self._enter_tool(func.__name__)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self._exit_tool(state)
+        return profiled
+
+    def _enter_tool(self, name: str) -> tuple:
+        if self._phase_profile is not None:
+            self._phase_profile.disable()
+        self._phase_peak = max(self._phase_peak, tracemalloc.get_traced_memory()[1])
+        snapshot = _snapshot()
+        tracemalloc.reset_peak()
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        return name, profile, snapshot, started
+
+    def _exit_tool(self, state: tuple):
+        name, profile, snapshot, started = state
+        profile.disable()
+        section = self.tools.setdefault(name, _Section(name))
+        section.calls += 1
+        section.seconds += time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        section.peak_bytes = max(section.peak_bytes, peak)
+        self._phase_peak = max(self._phase_peak, peak)
+        section.add_profile(profile)
+        section.add_allocations(snapshot, _snapshot())
+        if self._phase is not None:
+            self._tool_profiles.setdefault(self._phase.name, []).append(profile)
+        if self._phase_profile is not None:
+            self._phase_profile.enable()
+
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
+
+    def _write_reports(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        for name, section in self.phases.items():
+            with open(os.path.join(self.output_dir, f"{name}.txt"), "w", encoding="utf-8") as f:
+                f.write(section.report("Phase"))
+            if section.stats is not None:
+                section.stats.dump_stats(os.path.join(self.output_dir, f"{name}.prof"))
+
+        with open(os.path.join(self.output_dir, "tools.txt"), "w", encoding="utf-8") as f:
+            if not self.tools:
+                f.write("No tool calls were made.\n")
+            for section in self.tools.values():
+                f.write(section.report("Tool"))
+                f.write("\n" + "=" * 78 + "\n\n")
+
+        if self._sampler is not None:
+            with open(os.path.join(self.output_dir, "stacks.folded"), "w", encoding="utf-8") as f:
+                for stack, count in sorted(self._sampler.counts.items()):
+                    f.write(f"{stack} {count}\n")
+
+
+def _summary(section: _Section) -> Dict:
+    return {
+        "calls": section.calls,
+        "seconds": round(section.seconds, 3),
+        "peak_mb": round(section.peak_bytes / (1024 * 1024), 1),
+    }
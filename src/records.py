@@ -0,0 +1,229 @@
+"""
+Compact paper and analysis records and JSONL encoding for LitSynth
+
+Papers arrive as loose dicts (model answers, json.loads of the stores).
+For batch work and the library, which hold tens of thousands of them, the
+records here keep the same data in __slots__ objects: no per-instance
+__dict__, authors as a tuple, and author and venue strings interned, so a
+name that appears on a thousand papers is stored once. Keys the record does
+not know are kept in a small side dict, so dict -> record -> dict round
+trips are lossless. The review pipeline files every analyzed paper as an
+Analysis record, so the metadata in analyses.jsonl is normalized the same
+way.
+
+dumps_line/loads_line encode the records of every JSONL store (run
+artifacts, the library, the citation graph, the caches and the job queue).
+They use orjson when it is installed and the standard json module
+otherwise.
+"""
+
+import json
+import sys
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+_intern = sys.intern
+
+# Plausible publication years; anything else is reported and replaced
+MIN_YEAR = 1900
+MAX_YEAR = 2030
+
+UNKNOWN_TITLE = "Unknown Title"
+UNKNOWN_AUTHOR = "Unknown"
+UNKNOWN_VENUE = "Unknown Venue"
+
+
+def _as_year(value) -> Optional[int]:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return None
+
+
+def intern_authors(authors) -> Tuple[str, ...]:
+    """Strips, drops empty and interns author names"""
+    if isinstance(authors, str):
+        authors = [authors]
+    return tuple(_intern(name.strip()) for name in authors or () if isinstance(name, str) and name.strip())
+
+
+def validate_citation_fields(title, authors, year, venue) -> Tuple[str, Tuple[str, ...], int, str, Tuple[str, ...]]:
+    """
+    Validates citation metadata without building intermediate dicts.
+
+    Args:
+        title: Paper title
+        authors: Author names (list or tuple)
+        year: Publication year (int or digit string)
+        venue: Publication venue
+
+    Returns:
+        tuple: (title, authors, year, venue, issues) with placeholders
+               substituted for unusable values; issues is empty when the
+               metadata is valid
+    """
+    issues = ()
+
+    if not title or len(title.strip()) < 5:
+        issues += ("Title too short or missing",)
+        title = UNKNOWN_TITLE
+
+    cleaned = intern_authors(authors)
+    if not authors:
+        issues += ("No authors provided",)
+    if not cleaned:
+        cleaned = (UNKNOWN_AUTHOR,)
+
+    parsed_year = _as_year(year)
+    if not parsed_year or parsed_year < MIN_YEAR or parsed_year > MAX_YEAR:
+        issues += (f"Invalid year: {year}",)
+        parsed_year = datetime.now().year
+
+    if not venue or len(venue.strip()) < 2:
+        issues += ("Venue missing or too short",)
+        venue = UNKNOWN_VENUE
+    else:
+        venue = _intern(venue)
+
+    return title, cleaned, parsed_year, venue, issues
+
+
+class Paper:
+    """
+    Metadata of one paper.
+
+    Attributes:
+        title, authors (tuple, interned), year (int or None), venue
+        (interned), url, abstract, doi, arxiv_id, relevance_score, and
+        extra (dict of any other keys, or None)
+    """
+
+    __slots__ = ("title", "authors", "year", "venue", "url", "abstract", "doi", "arxiv_id",
+                 "relevance_score", "extra")
+
+    # Known keys in to_dict() order
+    FIELDS = ("title", "authors", "year", "venue", "url", "abstract", "doi", "arxiv_id", "relevance_score")
+
+    def __init__(self, title: str = None, authors: Iterable[str] = (), year: int = None, venue: str = None,
+                 url: str = None, abstract: str = None, doi: str = None, arxiv_id: str = None,
+                 relevance_score: float = None, extra: Dict = None):
+        self.title = title
+        self.authors = intern_authors(authors)
+        self.year = _as_year(year)
+        self.venue = _intern(venue) if isinstance(venue, str) else venue
+        self.url = url
+        self.abstract = abstract
+        self.doi = doi
+        self.arxiv_id = arxiv_id
+        self.relevance_score = relevance_score
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Paper":
+        """Builds a record from a metadata dict (unknown keys go to extra)"""
+        get = data.get
+        paper = cls(get("title"), get("authors") or (), get("year"), get("venue"), get("url"),
+                    get("abstract"), get("doi"), get("arxiv_id"), get("relevance_score"))
+        if not _FIELD_SET.issuperset(data):
+            paper.extra = {key: value for key, value in data.items() if key not in _FIELD_SET}
+        # Keep years the model wrote as text ("2017") rather than dropping them
+        if paper.year is None and get("year") is not None:
+            paper.extra = {**(paper.extra or {}), "year": get("year")}
+        return paper
+
+    def to_dict(self) -> Dict:
+        """Returns the metadata dict (unset fields left out, authors as a list)"""
+        data = {}
+        for key in self.FIELDS:
+            value = getattr(self, key)
+            if key == "authors":
+                if value:
+                    data[key] = list(value)
+            elif value is not None:
+                data[key] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def get(self, key: str, default=None):
+        """dict-style read access, so records can stand in for metadata dicts"""
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            if key == "authors":
+                return list(value) if value else default
+            if value is not None:
+                return value
+        # Unknown keys, and years kept as text in extra
+        return (self.extra or {}).get(key, default)
+
+    def validated(self) -> Tuple[str, Tuple[str, ...], int, str, Tuple[str, ...]]:
+        """Citation fields of this paper, see validate_citation_fields"""
+        return validate_citation_fields(self.title, self.authors, self.year, self.venue)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Paper) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        first = self.authors[0] if self.authors else "?"
+        return f"Paper({self.title!r}, {first!r}, {self.year!r})"
+
+
+_FIELD_SET = frozenset(Paper.FIELDS)
+
+
+class Analysis:
+    """
+    One analyzed paper of a review run, as stored in analyses.jsonl.
+
+    Attributes:
+        index: Position of the paper in the review (1-based)
+        paper_id: Canonical paper ID
+        paper: Paper record
+        text: The analyzer's answer
+    """
+
+    __slots__ = ("index", "paper_id", "paper", "text")
+
+    def __init__(self, index: int, paper_id: str, paper: Paper, text: str):
+        self.index = index
+        self.paper_id = paper_id
+        self.paper = paper
+        self.text = text
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Analysis":
+        return cls(data.get("index"), data["paper_id"], Paper.from_dict(data.get("metadata") or {}),
+                   data.get("analysis", ""))
+
+    def to_dict(self) -> Dict:
+        return {"index": self.index, "paper_id": self.paper_id, "metadata": self.paper.to_dict(),
+                "analysis": self.text}
+
+
+# ----------------------------------------------------------------------
+# JSONL
+# ----------------------------------------------------------------------
+
+if orjson is not None:
+    def dumps_line(data: Dict) -> bytes:
+        """Serializes one record as a JSON line (newline included)"""
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+
+    # Parses one JSON line (bytes or str); garbled input raises ValueError
+    loads_line = orjson.loads
+else:
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def dumps_line(data: Dict) -> bytes:
+        """Serializes one record as a JSON line (newline included)"""
+        return (_encoder.encode(data) + "\n").encode("utf-8")
+
+    loads_line = json.loads
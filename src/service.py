@@ -0,0 +1,460 @@
+"""
+LitSynth review-job service
+
+A long-running local HTTP server that queues literature reviews and runs
+them on a bounded pool of async workers. Agents, the parse worker pool and
+the library/analysis caches stay warm across jobs, and the job queue is
+persisted so queued or interrupted jobs survive a restart (interrupted
+ones resume from their run checkpoints).
+
+Usage:
+    python src/service.py [--host 127.0.0.1] [--port 8765] [--workers 2]
+
+Endpoints:
+    POST   /jobs               {"topic": "...", "max_papers": 5} -> 202 + job
+    GET    /jobs               All jobs
+    GET    /jobs/<id>          Job status and result summary
+    GET    /jobs/<id>/events   Progress as Server-Sent Events
+    GET    /jobs/<id>/review   Final review (text/markdown)
+    DELETE /jobs/<id>          Cancel a queued or running job
+    GET    /health             Queue depth, worker status and cache hit rates
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from agent import (REVIEW_FILENAME, analysis_cache, arun_literature_review, context_cache, logger, model_router,
+                   search_cache)
+from config import settings
+from observability import capture_root_logging
+from storage.fetch_failures import get_fetch_failures
+from storage.jobs import FINAL_STATUSES, JobStore
+from storage.runs import new_run_id, run_directory
+from tools.pdf_tools import hedge_delay, host_breaker
+
+MAX_PAPERS_LIMIT = 50
+
+# Events kept per job for SSE replay; older ones are dropped first
+MAX_EVENTS_PER_JOB = 5000
+
+# Event logs of finished jobs kept in memory; older ones are dropped first
+MAX_FINISHED_EVENT_LOGS = 200
+
+# Seconds between SSE keep-alive comments
+SSE_KEEPALIVE_SECONDS = 15
+
+
+class JobEvents:
+    """
+    Progress events of one job, shared between the worker publishing them
+    and any number of SSE readers.
+    """
+
+    def __init__(self):
+        self._events: List[Tuple[int, str, Dict]] = []
+        self._next_id = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def publish(self, event_type: str, data: Dict):
+        with self._condition:
+            self._events.append((self._next_id, event_type, data))
+            self._next_id += 1
+            if len(self._events) > MAX_EVENTS_PER_JOB:
+                del self._events[:len(self._events) - MAX_EVENTS_PER_JOB]
+            self._condition.notify_all()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def wait(self, cursor: int, timeout: float) -> Tuple[List[Tuple[int, str, Dict]], bool]:
+        """
+        Returns events with ID >= cursor, waiting up to timeout for new ones.
+
+        Returns:
+            tuple: (events, closed) - closed means no more events will come
+        """
+        with self._condition:
+            if self._next_id <= cursor and not self._closed:
+                self._condition.wait(timeout)
+            events = [event for event in self._events if event[0] >= cursor]
+            return events, self._closed
+
+
+class ReviewService:
+    """
+    Job queue plus a bounded pool of review workers on a private event loop.
+    """
+
+    def __init__(self, store: JobStore, workers: int = settings.SERVICE_WORKERS,
+                 max_queued: int = settings.SERVICE_MAX_QUEUED):
+        self.store = store
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+
+        # Guarded by _lock: handler threads and the worker loop both use them.
+        # A job is claimed by a worker (status "running" plus its task) and
+        # cancelled under the lock, so cancel never races a worker start.
+        self._events: Dict[str, JobEvents] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._cancel_requested = set()
+        self._lock = threading.RLock()
+        self._loop = asyncio.new_event_loop()
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread = threading.Thread(target=self._run_loop, daemon=True, name="litsynth-service")
+        self._ready = threading.Event()
+        self.started = time.time()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+
+        # Requeue jobs that were waiting or running when the service stopped
+        for job in self.store.pending():
+            logger.info(f"Requeueing job {job['job_id']} ({job['status']})")
+            self._enqueue(job)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        for index in range(self.workers):
+            self._loop.create_task(self._worker(index))
+        self._ready.set()
+        self._loop.run_forever()
+
+    def stop(self):
+        """Stops the workers; running jobs stay 'running' and resume on restart"""
+        def _shutdown():
+            for task in asyncio.all_tasks(self._loop):
+                task.cancel()
+            self._loop.call_soon(self._loop.stop)
+        self._loop.call_soon_threadsafe(_shutdown)
+        self._thread.join(timeout=10)
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def _enqueue(self, job: Dict):
+        with self._lock:
+            self._events.setdefault(job["job_id"], JobEvents())
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, job["job_id"])
+
+    def submit(self, topic: str, max_papers: int) -> Dict:
+        """
+        Queues a review.
+
+        Raises:
+            OverflowError: The queue is full
+        """
+        if self.store.count("queued") >= self.max_queued:
+            raise OverflowError(f"Job queue is full ({self.max_queued} queued)")
+
+        job = {
+            "job_id": uuid.uuid4().hex[:12],
+            "topic": topic,
+            "max_papers": max_papers,
+            "run_id": new_run_id(topic),
+            "status": "queued",
+            "created": time.time(),
+            "started": None,
+            "finished": None,
+            "error": None,
+            "result": None,
+        }
+        self.store.save(job)
+        self.events(job["job_id"]).publish("status", {"status": "queued"})
+        self._enqueue(job)
+        logger.info(f"Queued job {job['job_id']}: {topic}")
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """Cancels a queued or running job; returns the job, or None if unknown"""
+        with self._lock:
+            job = self.store.get(job_id)
+            if job is None or job["status"] in FINAL_STATUSES:
+                return job
+            task = self._tasks.get(job_id)
+            if task is None:
+                # Not claimed by a worker yet (queued, or requeued after a
+                # restart); the worker skips it when it reaches the queue head
+                self._finish(job, "cancelled")
+            else:
+                self._cancel_requested.add(job_id)
+                self._loop.call_soon_threadsafe(task.cancel)
+        return self.store.get(job_id)
+
+    def events(self, job_id: str) -> JobEvents:
+        with self._lock:
+            return self._events.setdefault(job_id, JobEvents())
+
+    def _finish(self, job: Dict, status: str, error: str = None, result: Dict = None):
+        job.update(status=status, finished=time.time(), error=error, result=result)
+        self.store.save(job)
+        events = self.events(job["job_id"])
+        events.publish("status", {"status": status, "error": error, "result": result})
+        events.close()
+
+        with self._lock:
+            finished = [job_id for job_id, log in self._events.items() if log.closed]
+            for job_id in finished[:-MAX_FINISHED_EVENT_LOGS]:
+                del self._events[job_id]
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self._queue.get()
+            task = asyncio.current_task()
+            with self._lock:
+                job = self.store.get(job_id)
+                if job is None or job["status"] in FINAL_STATUSES:
+                    continue
+                job.update(status="running", started=time.time())
+                self.store.save(job)
+                self._tasks[job_id] = task
+            try:
+                await self._run_job(job)
+            except asyncio.CancelledError:
+                with self._lock:
+                    requested = job_id in self._cancel_requested
+                if not requested:
+                    # Service shutdown: the job stays 'running' and resumes on restart
+                    raise
+                # Cancelled through the API: keep the worker alive
+                task.uncancel()
+                self._finish(job, "cancelled")
+            finally:
+                with self._lock:
+                    self._tasks.pop(job_id, None)
+                    self._cancel_requested.discard(job_id)
+
+    async def _run_job(self, job: Dict):
+        events = self.events(job["job_id"])
+        events.publish("status", {"status": "running", "run_id": job["run_id"]})
+
+        try:
+            result = await arun_literature_review(
+                job["topic"],
+                job["max_papers"],
+                run_id=job["run_id"],
+                on_progress=lambda message: events.publish("message", {"text": message}),
+                on_event=events.publish,
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Job {job['job_id']} failed: {e}")
+            self._finish(job, "failed", error=str(e) or type(e).__name__)
+            return
+
+        self._finish(job, "succeeded", result={
+            "output_file": result.output_file,
+            "word_count": result.word_count,
+            "papers": len(result.papers),
+            "phase_seconds": result.phase_seconds,
+            "peak_memory_mb": result.peak_memory_mb,
+            "resumed_phases": result.resumed_phases,
+        })
+        logger.info(f"Job {job['job_id']} succeeded in {job['finished'] - job['started']:.1f}s")
+
+    def health(self) -> Dict:
+        return {
+            "status": "ok",
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "workers": self.workers,
+            "running": self.store.count("running"),
+            "queued": self.store.count("queued"),
+            "max_queued": self.max_queued,
+            "caches": {
+                "search": search_cache.stats(),
+                "analysis": analysis_cache.stats(),
+                "fetch_failures": get_fetch_failures().stats(),
+            },
+            "pdf_hedging": hedge_delay.stats(),
+            "pdf_hosts": host_breaker.stats(),
+            "model_tiers": model_router.stats(),
+            "context_cache": context_cache.stats(),
+        }
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """Routes HTTP requests to the ReviewService attached to the server"""
+
+    server_version = "LitSynth/1.0"
+
+    @property
+    def service(self) -> ReviewService:
+        return self.server.service
+
+    def log_message(self, format, *args):
+        logger.info(f"HTTP {self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, body, headers: Dict = None):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _route(self) -> Tuple[List[str], Optional[Dict]]:
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        job = self.service.store.get(parts[1]) if len(parts) >= 2 and parts[0] == "jobs" else None
+        return parts, job
+
+    def do_GET(self):
+        parts, job = self._route()
+        if parts == ["health"]:
+            return self._send_json(200, self.service.health())
+        if parts == ["jobs"]:
+            return self._send_json(200, {"jobs": self.service.store.list()})
+        if not parts or parts[0] != "jobs" or len(parts) > 3:
+            return self._send_json(404, {"error": "Not found"})
+        if job is None:
+            return self._send_json(404, {"error": f"Unknown job '{parts[1]}'"})
+        if len(parts) == 2:
+            return self._send_json(200, job)
+        if parts[2] == "events":
+            return self._stream_events(job)
+        if parts[2] == "review":
+            return self._send_review(job)
+        return self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        parts, _ = self._route()
+        if parts != ["jobs"]:
+            return self._send_json(404, {"error": "Not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError):
+            return self._send_json(400, {"error": "Request body must be JSON"})
+
+        topic = body.get("topic")
+        max_papers = body.get("max_papers", 5)
+        if not isinstance(topic, str) or not topic.strip():
+            return self._send_json(400, {"error": "'topic' must be a non-empty string"})
+        if not isinstance(max_papers, int) or not 1 <= max_papers <= MAX_PAPERS_LIMIT:
+            return self._send_json(400, {"error": f"'max_papers' must be an integer from 1 to {MAX_PAPERS_LIMIT}"})
+
+        try:
+            job = self.service.submit(topic.strip(), max_papers)
+        except OverflowError as e:
+            return self._send_json(503, {"error": str(e)}, headers={"Retry-After": "30"})
+        return self._send_json(202, job, headers={"Location": f"/jobs/{job['job_id']}"})
+
+    def do_DELETE(self):
+        parts, job = self._route()
+        if len(parts) != 2 or parts[0] != "jobs":
+            return self._send_json(404, {"error": "Not found"})
+        if job is None:
+            return self._send_json(404, {"error": f"Unknown job '{parts[1]}'"})
+        return self._send_json(200, self.service.cancel(job["job_id"]))
+
+    def _send_review(self, job: Dict):
+        if job["status"] != "succeeded":
+            return self._send_json(409, {"error": f"Job is {job['status']}"})
+        try:
+            # Every job has its own run directory, so jobs on the same topic never share a file
+            with open(os.path.join(run_directory(job["run_id"]), REVIEW_FILENAME), "rb") as f:
+                payload = f.read()
+        except OSError as e:
+            return self._send_json(410, {"error": f"Review file is no longer available: {e}"})
+        self.send_response(200)
+        self.send_header("Content-Type", "text/markdown; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream_events(self, job: Dict):
+        """Streams job events as SSE; honours Last-Event-ID on reconnect"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        last_event_id = self.headers.get("Last-Event-ID")
+        cursor = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+        events = self.service.events(job["job_id"])
+
+        try:
+            # A job finished by an earlier service process has no live events
+            if job["status"] in FINAL_STATUSES and not events.closed:
+                self._write_event(cursor, "status", {"status": job["status"], "error": job["error"],
+                                                      "result": job["result"]})
+                self._write_event(cursor + 1, "end", {})
+                return
+
+            while True:
+                batch, closed = events.wait(cursor, SSE_KEEPALIVE_SECONDS)
+                for event_id, event_type, data in batch:
+                    self._write_event(event_id, event_type, data)
+                    cursor = event_id + 1
+                if closed:
+                    self._write_event(cursor, "end", {})
+                    return
+                if not batch:
+                    self.wfile.write(b": keep-alive\n\n")
+                    self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def _write_event(self, event_id: int, event_type: str, data: Dict):
+        payload = json.dumps(data, ensure_ascii=False)
+        self.wfile.write(f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+
+def create_server(host: str = settings.SERVICE_HOST, port: int = settings.SERVICE_PORT,
+                  workers: int = settings.SERVICE_WORKERS) -> ThreadingHTTPServer:
+    """Creates the HTTP server with a started ReviewService attached"""
+    service = ReviewService(JobStore(), workers=workers)
+    service.start()
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LitSynth review-job service")
+    parser.add_argument("--host", default=settings.SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVICE_WORKERS,
+                        help="Reviews run concurrently")
+    args = parser.parse_args()
+
+    capture_root_logging()
+    server = create_server(args.host, args.port, args.workers)
+    print(f"🔬 LitSynth service listening on http://{args.host}:{server.server_address[1]} "
+          f"({args.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Shutting down (running jobs resume on next start)")
+    finally:
+        server.server_close()
+        server.service.stop()
+
+
+if __name__ == "__main__":
+    main()
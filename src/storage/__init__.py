@@ -0,0 +1,31 @@
+"""
+Persistent storage for LitSynth
+"""
+
+from .library import PaperLibrary, get_library
+from .analysis_cache import AnalysisCache, analysis_version
+from .citation_graph import CitationGraph, get_citation_graph
+from .fetch_failures import FetchFailureCache, get_fetch_failures
+from .jobs import JobStore
+from .search_cache import SearchCache, normalize_query
+from .runs import JsonlArtifact, RunCheckpoint, new_run_id, run_directory
+from .text_store import SegmentTextStore
+
+__all__ = [
+    "AnalysisCache",
+    "analysis_version",
+    "CitationGraph",
+    "get_citation_graph",
+    "FetchFailureCache",
+    "get_fetch_failures",
+    "JobStore",
+    "JsonlArtifact",
+    "RunCheckpoint",
+    "new_run_id",
+    "run_directory",
+    "SearchCache",
+    "normalize_query",
+    "PaperLibrary",
+    "get_library",
+    "SegmentTextStore"
+]
@@ -0,0 +1,165 @@
+"""
+Cross-run cache of per-paper analyses for LitSynth
+
+A paper analysis depends only on the paper, the analyzer instruction and the
+model, so it can be reused by every later review that includes the same
+paper. Entries are keyed by canonical paper ID and stamped with a version
+hash of (instruction, model); changing either one makes old entries
+invisible without any explicit invalidation step.
+
+On-disk layout: analyses.jsonl, one {"paper_id", "version", "analysis"}
+record per line, last record wins. Records of other versions and superseded
+records are dead; the log is rewritten with the live records once it holds
+COMPACTION_RATIO records per live entry. Another process sharing the cache
+may compact it under this one, so a record read at a remembered offset is
+checked and treated as a miss if it belongs to another entry.
+"""
+
+import hashlib
+import os
+import threading
+from typing import Dict, Optional
+
+from config import settings
+from records import dumps_line, loads_line
+from .runs import repair_torn_tail
+
+# Rewrite the log once it holds this many records per live entry
+COMPACTION_RATIO = 4
+
+
+def analysis_version(instruction: str, model: str) -> str:
+    """Hashes the analyzer instruction and model name into a cache version"""
+    digest = hashlib.sha256(f"{model}\n{instruction}".encode("utf-8")).hexdigest()
+    return digest[:16]
+
+
+class AnalysisCache:
+    """
+    Persistent paper-analysis store for one (instruction, model) version.
+    """
+
+    def __init__(self, version: str, directory: str = settings.ANALYSIS_CACHE_DIR):
+        self.version = version
+        self.directory = directory
+        self.path = os.path.join(directory, "analyses.jsonl")
+
+        self._lock = threading.Lock()
+        # paper_id -> byte offset of its latest record for this version
+        self._offsets: Dict[str, int] = {}
+        self._records = 0
+        self.stale_entries = 0
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        # A torn last record would otherwise be glued to the next append
+        repair_torn_tail(self.path)
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    record = loads_line(line)
+                except ValueError:
+                    # Garbled record; the previous one for that paper still stands
+                    offset += len(line)
+                    continue
+                self._records += 1
+                if record.get("version") == self.version:
+                    self._offsets[record["paper_id"]] = offset
+                else:
+                    self.stale_entries += 1
+                offset += len(line)
+        if self._records > COMPACTION_RATIO * max(1, len(self._offsets)):
+            self._compact()
+
+    def _compact(self):
+        """Rewrites the log with the latest record of each entry of this version"""
+        offsets = {}
+        temporary = self.path + ".tmp"
+        with open(self.path, "rb") as source, open(temporary, "wb") as f:
+            for paper_id, offset in self._offsets.items():
+                source.seek(offset)
+                offsets[paper_id] = f.tell()
+                f.write(source.readline())
+        os.replace(temporary, self.path)
+        self._offsets = offsets
+        self._records = len(offsets)
+        self.stale_entries = 0
+
+    def get(self, paper_id: str) -> Optional[str]:
+        """
+        Looks up the cached analysis of a paper.
+
+        Args:
+            paper_id: Canonical paper ID
+
+        Returns:
+            str | None: Analysis text, or None on a miss
+        """
+        with self._lock:
+            offset = self._offsets.get(paper_id)
+            if offset is None:
+                self.misses += 1
+                return None
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                line = f.readline()
+            try:
+                record = loads_line(line)
+            except ValueError:
+                record = None
+            if record is None or record.get("paper_id") != paper_id or record.get("version") != self.version:
+                # The log was compacted by another process; the entry is gone
+                del self._offsets[paper_id]
+                self.misses += 1
+                return None
+            self.hits += 1
+            return record["analysis"]
+
+    def put(self, paper_id: str, analysis: str, version: str = None):
+        """
+        Stores the analysis of a paper.
+
+        Args:
+            paper_id: Canonical paper ID
+            analysis: Analysis text
+            version: Version of the model that wrote it (default: the
+                     cache's); an analysis of another version is not
+                     stored, since this cache would never serve it
+        """
+        if not analysis or not analysis.strip() or (version or self.version) != self.version:
+            return
+        line = dumps_line({
+            "paper_id": paper_id,
+            "version": self.version,
+            "analysis": analysis,
+        })
+        with self._lock:
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+            self._offsets[paper_id] = offset
+            self._records += 1
+            if self._records > COMPACTION_RATIO * len(self._offsets):
+                self._compact()
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self._offsets
+
+    def stats(self) -> Dict:
+        """Reports hit/miss counts and cache size"""
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._offsets),
+            "stale_entries": self.stale_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
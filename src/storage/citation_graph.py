@@ -0,0 +1,319 @@
+"""
+Persistent citation graph for LitSynth
+
+Reference lists extracted by fetch_pdf are recorded as edges from the citing
+paper to every paper it cites. Discovery uses the graph to expand candidate
+sets without extra search calls:
+
+    backward snowballing  papers cited by the seeds
+    forward snowballing   papers (already known) that cite the seeds
+    co-citation           papers cited alongside the seeds by the same papers
+
+Nodes are interned to integer indices and edges are kept as adjacency lists
+of ints. On disk the graph is an append-only JSONL log (graph.jsonl) with
+one {"paper_id", "metadata", "references": [...]} record per citing paper,
+and one {"paper_id", "metadata", "update_of"} record per metadata update
+that re-files a node under its canonical ID. Once the log holds
+COMPACTION_RATIO records per citing paper it is rewritten with one record
+per node that cites papers (or is known under older IDs, listed in its
+"aliases"); nodes that are only cited come back through those references.
+
+Like the library, the graph has a single writer: the first process to open
+it holds the lock on its .lock file. Any other process (e.g. an ingest
+while the service runs) opens it read-only - its additions only reach its
+own in-memory graph.
+"""
+
+import os
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+from config import settings
+from records import dumps_line, loads_line
+from tools.citation_tools import canonical_paper_id
+from .library import acquire_write_lock
+from .runs import repair_torn_tail
+
+# Node metadata kept in memory; everything else in a reference is dropped
+NODE_FIELDS = ("title", "authors", "year", "venue", "url", "doi", "arxiv_id")
+
+# Relative weights of the three expansion signals
+BACKWARD_WEIGHT = 1.0
+FORWARD_WEIGHT = 1.0
+COCITATION_WEIGHT = 0.5
+
+# Rewrite the log once it holds this many records per citing paper
+COMPACTION_RATIO = 4
+
+
+def _normalize_url(url: str) -> str:
+    return (url or "").strip().lower().rstrip("/")
+
+
+class CitationGraph:
+    """
+    Compact adjacency-list citation graph persisted across runs.
+
+    Attributes:
+        read_only: True when another process holds the graph's write lock
+    """
+
+    def __init__(self, directory: str = settings.CITATION_GRAPH_DIR):
+        self.directory = directory
+        self.path = os.path.join(directory, "graph.jsonl")
+        self.lock_path = os.path.join(directory, ".lock")
+
+        self._lock = threading.RLock()
+        self._index: Dict[str, int] = {}
+        self._by_url: Dict[str, int] = {}
+        self._nodes: List[Dict] = []
+        self._node_ids: List[str] = []
+        # node -> nodes it cites / nodes citing it
+        self._cites: List[List[int]] = []
+        self._cited_by: List[List[int]] = []
+        # Records in graph.jsonl, records the last compaction wrote, and
+        # nodes citing at least one paper
+        self._records = 0
+        self._compacted = 0
+        self._citing = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = acquire_write_lock(self.lock_path)
+        self.read_only = self._lock_file is None
+        self._load()
+
+    def close(self):
+        """Releases the write lock (the graph stays readable)"""
+        with self._lock:
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+            self.read_only = True
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        if not self.read_only:
+            # A torn last record would otherwise be glued to the next append
+            repair_torn_tail(self.path)
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    record = loads_line(line)
+                except ValueError:
+                    # Garbled record; the graph is only a discovery aid
+                    continue
+                self._records += 1
+                if "update_of" in record:
+                    node = self._index.get(record["update_of"])
+                    if node is None:
+                        node = self._find(record.get("metadata", {}))
+                    if node is not None:
+                        self._update(node, record["paper_id"], record.get("metadata", {}))
+                else:
+                    node = self._apply(record["paper_id"], record.get("metadata", {}),
+                                       record.get("references", []))
+                    for alias in record.get("aliases", ()):
+                        self._index[alias] = node
+        self._maybe_compact()
+
+    def _compact(self):
+        """Rewrites the log with one record per citing (or re-filed) node"""
+        aliases: Dict[int, List[str]] = {}
+        for paper_id, node in self._index.items():
+            if paper_id != self._node_ids[node]:
+                aliases.setdefault(node, []).append(paper_id)
+
+        records = 0
+        temporary = self.path + ".tmp"
+        with open(temporary, "wb") as f:
+            for node, paper_id in enumerate(self._node_ids):
+                # Nodes that are only cited are restored by the references
+                if self._cited_by[node] and not self._cites[node] and node not in aliases:
+                    continue
+                record = {
+                    "paper_id": paper_id,
+                    "metadata": self._nodes[node],
+                    "references": [
+                        {**self._nodes[cited], "paper_id": self._node_ids[cited]} for cited in self._cites[node]
+                    ],
+                }
+                if node in aliases:
+                    record["aliases"] = aliases[node]
+                f.write(dumps_line(record))
+                records += 1
+        os.replace(temporary, self.path)
+        self._records = records
+        self._compacted = records
+
+    def _maybe_compact(self):
+        if not self.read_only and self._records > COMPACTION_RATIO * max(1, self._citing, self._compacted):
+            self._compact()
+
+    def _append(self, record: Dict):
+        if self.read_only:
+            return
+        with open(self.path, "ab") as f:
+            f.write(dumps_line(record))
+        self._records += 1
+        self._maybe_compact()
+
+    # ------------------------------------------------------------------
+    # Graph construction
+    # ------------------------------------------------------------------
+
+    def _node(self, paper_id: str, metadata: Dict) -> int:
+        """Returns the node of a paper, creating it and merging metadata"""
+        node = self._index.get(paper_id)
+        if node is None and metadata.get("url"):
+            node = self._by_url.get(_normalize_url(metadata["url"]))
+        if node is None:
+            node = len(self._nodes)
+            self._nodes.append({})
+            self._node_ids.append(paper_id)
+            self._cites.append([])
+            self._cited_by.append([])
+        self._index[paper_id] = node
+
+        fields = self._nodes[node]
+        for key in NODE_FIELDS:
+            if metadata.get(key) and not fields.get(key):
+                fields[key] = metadata[key]
+        if fields.get("url"):
+            self._by_url[_normalize_url(fields["url"])] = node
+        return node
+
+    def _apply(self, paper_id: str, metadata: Dict, references: List[Dict]) -> int:
+        citing = self._node(paper_id, metadata)
+        known = set(self._cites[citing])
+        if not known and references:
+            self._citing += 1
+        for reference in references:
+            cited = self._node(reference["paper_id"], reference)
+            if cited != citing and cited not in known:
+                known.add(cited)
+                self._cites[citing].append(cited)
+                self._cited_by[cited].append(citing)
+        return citing
+
+    def add_references(self, paper_id: str, metadata: Dict, references: List[Dict]):
+        """
+        Records the reference list of a paper.
+
+        Args:
+            paper_id: Canonical ID of the citing paper
+            metadata: Citing paper metadata (at least its URL)
+            references: Parsed references (see tools.reference_tools)
+        """
+        compact_references = []
+        for reference in references:
+            compact = {key: reference[key] for key in NODE_FIELDS if reference.get(key)}
+            compact["paper_id"] = canonical_paper_id(reference)
+            compact_references.append(compact)
+        compact_metadata = {key: metadata[key] for key in NODE_FIELDS if metadata.get(key)}
+
+        with self._lock:
+            self._apply(paper_id, compact_metadata, compact_references)
+            self._append({
+                "paper_id": paper_id,
+                "metadata": compact_metadata,
+                "references": compact_references,
+            })
+
+    def _update(self, node: int, paper_id: str, metadata: Dict):
+        self._index[paper_id] = node
+        self._node_ids[node] = paper_id
+        self._node(paper_id, metadata)
+
+    def update_metadata(self, paper: Dict):
+        """
+        Attaches discovery metadata (and its canonical ID) to a known node.
+        Nothing is written when the node already has that ID and metadata.
+        """
+        with self._lock:
+            node = self._find(paper)
+            if node is None:
+                return
+            paper_id = canonical_paper_id(paper)
+            previous_id = self._node_ids[node]
+            fields = self._nodes[node]
+            compact_metadata = {key: paper[key] for key in NODE_FIELDS if paper.get(key)}
+            if previous_id == paper_id and all(fields.get(key) for key in compact_metadata):
+                return
+            self._update(node, paper_id, compact_metadata)
+            self._append({
+                "paper_id": paper_id,
+                "metadata": compact_metadata,
+                "update_of": previous_id,
+            })
+
+    # ------------------------------------------------------------------
+    # Snowballing
+    # ------------------------------------------------------------------
+
+    def _find(self, paper: Dict) -> Optional[int]:
+        node = self._index.get(paper.get("paper_id") or canonical_paper_id(paper))
+        if node is None and paper.get("url"):
+            node = self._by_url.get(_normalize_url(paper["url"]))
+        return node
+
+    def snowball(self, seeds: List[Dict], limit: int = 20) -> List[Dict]:
+        """
+        Expands seed papers through the citation graph.
+
+        Each neighbour is scored by how many seeds cite it (backward), how
+        many seeds it cites (forward) and how often it is co-cited with the
+        seeds by other papers.
+
+        Args:
+            seeds: Paper metadata dicts (from discovery or the library)
+            limit: Maximum number of candidates to return
+
+        Returns:
+            List[dict]: Candidate metadata with "paper_id" and "snowball_score",
+                        best first; seeds themselves are excluded
+        """
+        with self._lock:
+            seed_nodes = {node for node in (self._find(seed) for seed in seeds) if node is not None}
+            if not seed_nodes:
+                return []
+
+            scores = Counter()
+            for seed in seed_nodes:
+                for cited in self._cites[seed]:
+                    scores[cited] += BACKWARD_WEIGHT
+                for citing in self._cited_by[seed]:
+                    scores[citing] += FORWARD_WEIGHT
+                    for co_cited in self._cites[citing]:
+                        scores[co_cited] += COCITATION_WEIGHT
+
+            for seed in seed_nodes:
+                scores.pop(seed, None)
+
+            return [
+                {**self._nodes[node], "paper_id": self._node_ids[node], "snowball_score": score}
+                for node, score in scores.most_common(limit)
+            ]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "read_only": self.read_only,
+                "nodes": len(self._nodes),
+                "edges": sum(len(cited) for cited in self._cites),
+                "citing_papers": sum(1 for cited in self._cites if cited),
+            }
+
+
+_graph: Optional[CitationGraph] = None
+_graph_lock = threading.Lock()
+
+
+def get_citation_graph() -> CitationGraph:
+    """Returns the process-wide citation graph, loading it on first use"""
+    global _graph
+    with _graph_lock:
+        if _graph is None:
+            _graph = CitationGraph()
+        return _graph
@@ -0,0 +1,122 @@
+"""
+Negative cache of PDF URLs that fail permanently
+
+Paywalls (401/402/403), missing files (404/410), legal blocks (451) and URLs
+that serve HTML instead of a PDF fail the same way on every run. fetch_pdf
+records them here and answers them from the cache until the TTL passes,
+instead of spending a download (or a timeout) on each review.
+
+On-disk layout: failures.jsonl, one {"url", "status", "message",
+"stored_at"} record per line, last record wins.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from config import settings
+from records import dumps_line, loads_line
+from .runs import repair_torn_tail
+
+# Rewrite the log once it holds this many records per live entry
+COMPACTION_RATIO = 4
+
+# HTTP statuses that will not change by retrying
+PERMANENT_STATUSES = frozenset({401, 402, 403, 404, 410, 451})
+
+
+class FetchFailureCache:
+    """
+    Persistent map of URL -> last permanent failure.
+
+    Args:
+        directory: Directory of failures.jsonl
+        ttl: Seconds a failure is remembered (0 disables the cache)
+    """
+
+    def __init__(self, directory: str = settings.FETCH_FAILURE_DIR,
+                 ttl: float = settings.FETCH_FAILURE_TTL_SECONDS):
+        self.directory = directory
+        self.path = os.path.join(directory, "failures.jsonl")
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._records = 0
+        self.hits = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        # A torn last record would otherwise be glued to the next append
+        repair_torn_tail(self.path)
+        now = time.time()
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    record = loads_line(line)
+                except ValueError:
+                    # Garbled record; the previous one still stands
+                    continue
+                self._records += 1
+                if now - record["stored_at"] > self.ttl:
+                    self._entries.pop(record["url"], None)
+                else:
+                    self._entries[record["url"]] = record
+        if self._records > COMPACTION_RATIO * max(1, len(self._entries)):
+            self._compact()
+
+    def _compact(self):
+        temporary = self.path + ".tmp"
+        with open(temporary, "wb") as f:
+            for record in self._entries.values():
+                f.write(dumps_line(record))
+        os.replace(temporary, self.path)
+        self._records = len(self._entries)
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Returns the remembered failure of a URL, or None if it may be fetched"""
+        if not self.ttl:
+            return None
+        with self._lock:
+            record = self._entries.get(url)
+            if record is not None and time.time() - record["stored_at"] > self.ttl:
+                del self._entries[url]
+                record = None
+            if record is not None:
+                self.hits += 1
+            return record
+
+    def put(self, url: str, message: str, status: int | None = None):
+        """Remembers a permanent failure of a URL"""
+        if not self.ttl:
+            return
+        record = {"url": url, "status": status, "message": message, "stored_at": time.time()}
+        with self._lock:
+            self._entries[url] = record
+            with open(self.path, "ab") as f:
+                f.write(dumps_line(record))
+            self._records += 1
+            if self._records > COMPACTION_RATIO * len(self._entries):
+                self._compact()
+
+    def stats(self) -> Dict:
+        """Reports the number of remembered failures and cache hits"""
+        return {"entries": len(self._entries), "hits": self.hits}
+
+
+_failures: Optional[FetchFailureCache] = None
+_failures_lock = threading.Lock()
+
+
+def get_fetch_failures() -> FetchFailureCache:
+    """Returns the process-wide failure cache, opening it on first use"""
+    global _failures
+    with _failures_lock:
+        if _failures is None:
+            _failures = FetchFailureCache()
+        return _failures
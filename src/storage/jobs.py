@@ -0,0 +1,91 @@
+"""
+Persistent review-job queue for the LitSynth service
+
+Jobs are kept in an append-only JSONL log (jobs.jsonl) with one full job
+record per state change; the last record of a job wins. Jobs still queued
+or running when the service stopped are picked up again on restart, and
+running ones resume from their run checkpoints.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional
+
+from config import settings
+from records import dumps_line, loads_line
+from .runs import repair_torn_tail
+
+PENDING_STATUSES = ("queued", "running")
+FINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+# Rewrite the log once it holds this many records per live job
+COMPACTION_RATIO = 4
+
+
+class JobStore:
+    """
+    Job records persisted across service restarts.
+    """
+
+    def __init__(self, directory: str = settings.SERVICE_DIR):
+        self.directory = directory
+        self.path = os.path.join(directory, "jobs.jsonl")
+
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict] = {}
+        self._records = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        # A torn last record would otherwise be glued to the next append
+        repair_torn_tail(self.path)
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    job = loads_line(line)
+                except ValueError:
+                    # Garbled record; the previous one still stands
+                    continue
+                self._jobs[job["job_id"]] = job
+                self._records += 1
+        if self._records > COMPACTION_RATIO * max(1, len(self._jobs)):
+            self._compact()
+
+    def _compact(self):
+        temporary = self.path + ".tmp"
+        with open(temporary, "wb") as f:
+            for job in self._jobs.values():
+                f.write(dumps_line(job))
+        os.replace(temporary, self.path)
+        self._records = len(self._jobs)
+
+    def save(self, job: Dict):
+        """Records the current state of a job"""
+        with self._lock:
+            self._jobs[job["job_id"]] = dict(job)
+            with open(self.path, "ab") as f:
+                f.write(dumps_line(job))
+            self._records += 1
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self) -> List[Dict]:
+        with self._lock:
+            return [dict(job) for job in self._jobs.values()]
+
+    def pending(self) -> List[Dict]:
+        """Queued and interrupted jobs, oldest first"""
+        with self._lock:
+            jobs = [dict(job) for job in self._jobs.values() if job["status"] in PENDING_STATUSES]
+        return sorted(jobs, key=lambda job: job["created"])
+
+    def count(self, status: str) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job["status"] == status)
@@ -0,0 +1,460 @@
+"""
+Persistent local paper library for LitSynth
+
+Every paper fetched by fetch_pdf is kept on disk together with its metadata
+and extracted text, and indexed in a full-text inverted index. Discovery
+queries the library before calling google_search, so repeat topics can be
+served without any network round-trip.
+
+On-disk layout (logs are append-only JSON lines):
+    documents.jsonl  {"paper_id", "metadata"} - last record wins, a record
+                     with "deleted": true removes the paper
+    postings.jsonl   {"paper_id", "terms": {term: tf}} - index delta per add
+    text/            extracted texts in memory-mapped segment files (see
+                     storage.text_store)
+
+Replaced and deleted papers leave superseded records behind; both logs are
+rewritten with the live records once they hold COMPACTION_RATIO records per
+paper.
+
+Libraries written before the segment store kept the text inside
+documents.jsonl; it is moved into text/ the first time they are opened.
+
+Only one process writes a library: the first to open it holds an exclusive
+lock on its .lock file until it exits (POSIX only). Any other process
+(e.g. an ingest while the service runs) opens it read-only - it can search
+and read texts as of opening time, and its writes are dropped.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter
+from typing import IO, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from config import settings
+from records import Paper, dumps_line, loads_line
+from tools.citation_tools import canonical_paper_id
+from tools.ranking_tools import BM25_B, BM25_K1, tokenize
+from .runs import repair_torn_tail
+from .text_store import SegmentTextStore
+
+logger = logging.getLogger("LitSynth")
+
+# Full text contributes only terms that occur at least this often; title and
+# abstract terms are always indexed. Keeps the in-memory index compact.
+MIN_TEXT_TERM_FREQUENCY = 2
+
+# Title terms are weighted like in the candidate ranker
+TITLE_WEIGHT = 2
+
+# Rewrite the logs once they hold this many records per live paper
+COMPACTION_RATIO = 4
+
+
+def _normalize_url(url: str) -> str:
+    return (url or "").strip().lower().rstrip("/")
+
+
+def acquire_write_lock(lock_path: str) -> Optional[IO]:
+    """
+    Takes the exclusive single-writer lock of a store (POSIX only).
+
+    Returns:
+        The open lock file, which holds the lock until it is closed; None
+        if another process holds it. Without fcntl (Windows) every process
+        gets an unlocked file.
+    """
+    lock_file = open(lock_path, "a+")
+    if fcntl is not None:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return None
+    lock_file.seek(0)
+    lock_file.truncate()
+    lock_file.write(str(os.getpid()))
+    lock_file.flush()
+    return lock_file
+
+
+class PaperLibrary:
+    """
+    Append-only paper store with an incrementally maintained inverted index.
+
+    Adding a document appends one line to each log file and patches the
+    in-memory postings - the index is never rebuilt from scratch.
+
+    Attributes:
+        read_only: True when another process holds the library's write lock
+    """
+
+    def __init__(self, directory: str = settings.LIBRARY_DIR):
+        self.directory = directory
+        self.documents_path = os.path.join(directory, "documents.jsonl")
+        self.postings_path = os.path.join(directory, "postings.jsonl")
+        self.lock_path = os.path.join(directory, ".lock")
+
+        self._lock = threading.RLock()
+        # paper_id -> byte offset of its latest record in documents.jsonl
+        self._offsets: Dict[str, int] = {}
+        # paper_id -> compact metadata record (interned authors and venues)
+        self._metadata: Dict[str, Paper] = {}
+        self._by_url: Dict[str, str] = {}
+        # term -> {paper_id: term frequency}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        # Records in documents.jsonl (live and superseded)
+        self._records = 0
+
+        self._query_count = 0
+        self._query_time_ms = 0.0
+        self.last_query_ms = 0.0
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = acquire_write_lock(self.lock_path)
+        self.read_only = self._lock_file is None
+        if self.read_only:
+            logger.warning(f"Paper library {directory} is locked by another process; opened read-only")
+        self.texts = SegmentTextStore(os.path.join(directory, "text"))
+        self._load()
+
+    def close(self):
+        """Releases the write lock (the library stays readable)"""
+        with self._lock:
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+            self.read_only = True
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        """Replays both logs into memory (the only full scan, done once)"""
+        # paper_id -> offset of a record that still carries its text inline
+        inline_text: Dict[str, int] = {}
+        if os.path.exists(self.documents_path):
+            if not self.read_only:
+                # A torn last record would otherwise be glued to the next append
+                repair_torn_tail(self.documents_path)
+            with open(self.documents_path, "rb") as f:
+                offset = 0
+                for line in f:
+                    try:
+                        record = loads_line(line)
+                    except ValueError:
+                        # Garbled record; the previous one for that paper still stands
+                        offset += len(line)
+                        continue
+                    self._records += 1
+                    paper_id = record["paper_id"]
+                    inline_text.pop(paper_id, None)
+                    if record.get("deleted"):
+                        self._forget(paper_id)
+                    else:
+                        if "text" in record:
+                            inline_text[paper_id] = offset
+                        self._offsets[paper_id] = offset
+                        self._metadata[paper_id] = Paper.from_dict(record.get("metadata", {}))
+                        url = self._metadata[paper_id].url
+                        if url:
+                            self._by_url[_normalize_url(url)] = paper_id
+                    offset += len(line)
+
+        if os.path.exists(self.postings_path):
+            if not self.read_only:
+                repair_torn_tail(self.postings_path)
+            with open(self.postings_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = loads_line(line)
+                    except ValueError:
+                        continue
+                    if record["paper_id"] in self._offsets:
+                        self._index(record["paper_id"], record["terms"])
+
+        if self.read_only:
+            return
+        if inline_text:
+            self._migrate_inline_text(inline_text)
+        elif self._records > COMPACTION_RATIO * max(1, len(self._offsets)):
+            self._compact()
+
+    def _migrate_inline_text(self, inline_text: Dict[str, int]):
+        """Moves texts stored in documents.jsonl into the segment store"""
+        with open(self.documents_path, "rb") as f:
+            for paper_id, offset in inline_text.items():
+                if paper_id not in self.texts:
+                    f.seek(offset)
+                    self.texts.put(paper_id, loads_line(f.readline()).get("text") or "")
+        # Drops the inline texts along with superseded records
+        self._compact()
+
+    def _compact(self):
+        """Rewrites both logs with the latest record of each live paper only"""
+        offsets = {}
+        temporary = self.documents_path + ".tmp"
+        with open(temporary, "wb") as f:
+            for paper_id, metadata in self._metadata.items():
+                offsets[paper_id] = f.tell()
+                f.write(dumps_line({"paper_id": paper_id, "metadata": metadata.to_dict()}))
+        os.replace(temporary, self.documents_path)
+
+        temporary = self.postings_path + ".tmp"
+        with open(temporary, "wb") as f:
+            for paper_id, terms in self._doc_terms.items():
+                f.write(dumps_line({"paper_id": paper_id, "terms": terms}))
+        os.replace(temporary, self.postings_path)
+
+        self._offsets = offsets
+        self._records = len(offsets)
+
+    def _forget(self, paper_id: str):
+        self._offsets.pop(paper_id, None)
+        metadata = self._metadata.pop(paper_id, None)
+        if metadata and metadata.url:
+            self._by_url.pop(_normalize_url(metadata.url), None)
+        self._unindex(paper_id)
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def _index(self, paper_id: str, terms: Dict[str, int]):
+        self._unindex(paper_id)
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[paper_id] = tf
+        self._doc_terms[paper_id] = terms
+        length = sum(terms.values())
+        self._doc_lengths[paper_id] = length
+        self._total_length += length
+
+    def _unindex(self, paper_id: str):
+        terms = self._doc_terms.pop(paper_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(paper_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(paper_id, 0)
+
+    @staticmethod
+    def _document_terms(metadata: Dict, text: str) -> Dict[str, int]:
+        terms = Counter()
+        for term in tokenize(metadata.get("title", "")):
+            terms[term] += TITLE_WEIGHT
+        terms.update(tokenize(metadata.get("abstract", "")))
+        text_terms = Counter(tokenize(text))
+        for term, tf in text_terms.items():
+            if tf >= MIN_TEXT_TERM_FREQUENCY or term in terms:
+                terms[term] += tf
+        return dict(terms)
+
+    def _append(self, path: str, record: Dict) -> int:
+        """Appends one JSON line and returns the offset it was written at"""
+        line = dumps_line(record)
+        with open(path, "ab") as f:
+            offset = f.tell()
+            f.write(line)
+        if path == self.documents_path:
+            self._records += 1
+        return offset
+
+    def _maybe_compact(self):
+        if self._records > COMPACTION_RATIO * max(1, len(self._offsets)):
+            self._compact()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def add_document(self, paper_id: str, metadata: Dict, text: str):
+        """
+        Stores (or replaces) a paper and indexes it incrementally.
+
+        Args:
+            paper_id: Canonical paper ID (see canonical_paper_id)
+            metadata: Paper metadata (title, authors, year, venue, url...)
+            text: Extracted full text
+        """
+        with self._lock:
+            if self.read_only:
+                return
+            self.texts.put(paper_id, text)
+            self._file(paper_id, metadata, self._document_terms(metadata, text))
+            self._maybe_compact()
+
+    def _file(self, paper_id: str, metadata: Dict, terms: Dict[str, int]):
+        """Logs a paper's metadata and index delta and applies them in memory"""
+        offset = self._append(self.documents_path, {"paper_id": paper_id, "metadata": metadata})
+        self._append(self.postings_path, {"paper_id": paper_id, "terms": terms})
+
+        self._offsets[paper_id] = offset
+        self._metadata[paper_id] = Paper.from_dict(metadata)
+        if metadata.get("url"):
+            self._by_url[_normalize_url(metadata["url"])] = paper_id
+        self._index(paper_id, terms)
+
+    def remove_document(self, paper_id: str):
+        """Deletes a paper from the library (appends a tombstone)"""
+        with self._lock:
+            if self.read_only or paper_id not in self._offsets:
+                return
+            self._append(self.documents_path, {"paper_id": paper_id, "deleted": True})
+            self._forget(paper_id)
+            self.texts.delete(paper_id)
+            self._maybe_compact()
+
+    def update_metadata(self, paper: Dict) -> Optional[str]:
+        """
+        Attaches discovery metadata to a paper already fetched by URL.
+
+        fetch_pdf only knows the URL, so it files papers under a URL-derived
+        ID. Once the pipeline knows the title, authors etc. the document is
+        re-filed under its canonical ID and re-indexed with the title terms.
+        The text stays where it is in the segment store. Nothing is written
+        when the paper is already filed with the same metadata.
+
+        Args:
+            paper: Paper metadata dict from discovery
+
+        Returns:
+            str | None: Canonical paper ID, or None if the paper was never fetched
+        """
+        with self._lock:
+            paper_id = canonical_paper_id(paper)
+            existing_id = paper_id if paper_id in self._offsets else self._by_url.get(
+                _normalize_url(paper.get("url", ""))
+            )
+            if existing_id is None:
+                return None
+
+            current = self._metadata[existing_id].to_dict()
+            metadata = {**current, **paper}
+            metadata.pop("relevance_score", None)
+            # Compare in record form: the library keeps e.g. "paper_id" keys out of it
+            if existing_id == paper_id and Paper.from_dict(metadata).to_dict() == current:
+                return paper_id
+            if self.read_only:
+                return None
+
+            text = self.get_text(existing_id) or ""
+            if existing_id != paper_id:
+                self.texts.rename(existing_id, paper_id)
+                self._append(self.documents_path, {"paper_id": existing_id, "deleted": True})
+                self._forget(existing_id)
+            self._file(paper_id, metadata, self._document_terms(metadata, text))
+            self._maybe_compact()
+            return paper_id
+
+    def get_metadata(self, paper_id: str) -> Optional[Dict]:
+        metadata = self._metadata.get(paper_id)
+        return metadata.to_dict() if metadata is not None else None
+
+    def get_text(self, paper_id: str) -> Optional[str]:
+        """Reads a paper's text from its memory-mapped segment"""
+        if paper_id not in self._offsets:
+            return None
+        return self.texts.get(paper_id)
+
+    def find_by_url(self, url: str) -> Optional[str]:
+        """Returns the paper ID stored for a URL, checking canonical IDs too"""
+        paper_id = self._by_url.get(_normalize_url(url))
+        if paper_id is None:
+            candidate_id = canonical_paper_id({"url": url})
+            if candidate_id in self._offsets:
+                paper_id = candidate_id
+        return paper_id
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.0) -> List[Dict]:
+        """
+        Full-text BM25 search over the library.
+
+        Args:
+            query: Free-text query (usually the review topic)
+            limit: Maximum number of results
+            min_score: Drop results scoring below this
+
+        Returns:
+            List[dict]: Paper metadata dicts with "paper_id" and
+                        "relevance_score", best first
+        """
+        start = time.perf_counter()
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            scores: Dict[str, float] = {}
+            if doc_count:
+                avg_length = (self._total_length / doc_count) or 1.0
+                for term, query_tf in Counter(tokenize(query)).items():
+                    postings = self._postings.get(term)
+                    if not postings:
+                        continue
+                    idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for paper_id, tf in postings.items():
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[paper_id] / avg_length)
+                        scores[paper_id] = scores.get(paper_id, 0.0) + query_tf * idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+            ranked = sorted(scores.items(), key=lambda item: -item[1])
+            results = [
+                {**self._metadata[paper_id].to_dict(), "paper_id": paper_id, "relevance_score": round(score, 4)}
+                for paper_id, score in ranked[:limit]
+                if score >= min_score
+            ]
+
+        self.last_query_ms = (time.perf_counter() - start) * 1000
+        self._query_count += 1
+        self._query_time_ms += self.last_query_ms
+        return results
+
+    def stats(self) -> Dict:
+        """Reports library size, index size and query latency"""
+        def file_size(path: str) -> int:
+            return os.path.getsize(path) if os.path.exists(path) else 0
+
+        with self._lock:
+            return {
+                "documents": len(self._offsets),
+                "read_only": self.read_only,
+                "terms": len(self._postings),
+                "postings": sum(len(p) for p in self._postings.values()),
+                "documents_bytes": file_size(self.documents_path),
+                "index_bytes": file_size(self.postings_path),
+                "text_store": self.texts.stats(),
+                "queries": self._query_count,
+                "last_query_ms": round(self.last_query_ms, 3),
+                "avg_query_ms": round(self._query_time_ms / self._query_count, 3) if self._query_count else 0.0,
+            }
+
+
+_library: Optional[PaperLibrary] = None
+_library_lock = threading.Lock()
+
+
+def get_library() -> PaperLibrary:
+    """Returns the process-wide library, opening it on first use"""
+    global _library
+    with _library_lock:
+        if _library is None:
+            _library = PaperLibrary()
+        return _library
@@ -0,0 +1,177 @@
+"""
+Per-review run artifacts for LitSynth
+
+Each review gets a run directory under data/runs/<run_id>/. Phase outputs
+are appended to JSONL artifacts there as soon as they are produced, and
+later phases stream them back one record at a time instead of holding every
+paper's analysis in memory. The same files double as checkpoints: an
+interrupted review resumed under its run ID skips every completed phase
+and every paper already analyzed.
+"""
+
+import json
+import os
+import re
+import secrets
+import time
+from typing import Dict, Iterator, Optional
+
+from config import settings
+from records import dumps_line, loads_line
+
+
+def run_directory(run_id: str) -> str:
+    """Returns (and creates) the directory holding one run's artifacts"""
+    path = os.path.join(settings.RUNS_DIR, run_id)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def repair_torn_tail(path: str) -> bool:
+    """
+    Drops a torn trailing record left by an interrupted append to a JSONL
+    file, so the next append starts on a fresh line.
+
+    Returns:
+        bool: True if the file had a torn tail
+    """
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return False
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return False
+        # Scan backwards for the end of the last complete record
+        position = end
+        while position > 0:
+            start = max(0, position - 65536)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return True
+            position = start
+        f.truncate(0)
+        return True
+
+
+class JsonlArtifact:
+    """
+    Append-only JSONL file of phase records.
+
+    Writes are flushed per record, so a record is on disk as soon as append
+    returns. Iteration reads the file lazily; only one record is decoded at
+    a time.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._count = 0
+        if os.path.exists(path):
+            repair_torn_tail(path)
+            with open(path, "rb") as f:
+                self._count = sum(1 for _ in f)
+
+    def append(self, record: Dict):
+        with open(self.path, "ab") as f:
+            f.write(dumps_line(record))
+        self._count += 1
+
+    def __iter__(self) -> Iterator[Dict]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            for line in f:
+                yield loads_line(line)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def size_bytes(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+
+def new_run_id(topic: str) -> str:
+    """
+    Stable, human-readable run ID: timestamp, topic slug and a short random
+    suffix so concurrent reviews of the same topic never share a directory.
+    """
+    slug = re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")[:30].rstrip("-")
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{slug or 'review'}-{secrets.token_hex(2)}"
+
+
+class RunCheckpoint:
+    """
+    Phase checkpoints of one review, kept in its run directory.
+
+    run.json records the run parameters and the phases completed so far;
+    each phase's output sits next to it (papers.json, analyses.jsonl,
+    draft.md, review.md). Files are replaced atomically, so an interrupted
+    write never leaves a half-written checkpoint behind.
+    """
+
+    MANIFEST = "run.json"
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.directory = run_directory(run_id)
+        self.manifest = self.load_json(self.MANIFEST) or {}
+
+    @classmethod
+    def open_existing(cls, run_id: str) -> "RunCheckpoint":
+        """Opens a run to resume; raises ValueError if it was never started"""
+        if not os.path.exists(os.path.join(settings.RUNS_DIR, run_id, cls.MANIFEST)):
+            raise ValueError(f"No checkpointed run with ID '{run_id}' in {settings.RUNS_DIR}")
+        return cls(run_id)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def start(self, topic: str, max_papers: int, update_of: str = None):
+        """Records the run parameters (kept as-is when resuming)"""
+        if not self.manifest:
+            self.manifest = {
+                "run_id": self.run_id,
+                "topic": topic,
+                "max_papers": max_papers,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "completed_phases": [],
+            }
+            if update_of:
+                # Run ID of the review this run brings up to date
+                self.manifest["update_of"] = update_of
+            self.save_json(self.MANIFEST, self.manifest)
+
+    def is_complete(self, phase: str) -> bool:
+        return phase in self.manifest.get("completed_phases", [])
+
+    def complete(self, phase: str):
+        if not self.is_complete(phase):
+            self.manifest["completed_phases"].append(phase)
+        self.manifest["updated"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.save_json(self.MANIFEST, self.manifest)
+
+    def _write_atomic(self, name: str, data: str):
+        temporary = self.path(name) + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(temporary, self.path(name))
+
+    def save_json(self, name: str, value):
+        self._write_atomic(name, json.dumps(value, indent=2, ensure_ascii=False))
+
+    def load_json(self, name: str):
+        if not os.path.exists(self.path(name)):
+            return None
+        with open(self.path(name), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_text(self, name: str, text: str):
+        self._write_atomic(name, text)
+
+    def load_text(self, name: str) -> Optional[str]:
+        if not os.path.exists(self.path(name)):
+            return None
+        with open(self.path(name), "r", encoding="utf-8") as f:
+            return f.read()
@@ -0,0 +1,172 @@
+"""
+Cache of discovery search results for LitSynth
+
+Discovery answers depend on the search query, the discovery instruction and
+the model. Results are keyed by the normalized query (lowercase terms
+without stopwords, deduplicated and sorted, so reordered or re-punctuated
+variants of a query share an entry) and stamped with a version hash of
+(instruction, model). Entries expire after a TTL, and at most max_entries
+are kept; the least recently used ones are evicted first (after a restart,
+by the time they were stored).
+
+On-disk layout: searches.jsonl, one {"key", "version", "query", "count",
+"stored_at", "papers"} record per line, last record wins.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from config import settings
+from records import dumps_line, loads_line
+from tools.ranking_tools import tokenize
+from .runs import repair_torn_tail
+
+# Rewrite the log once it holds this many records per live entry
+COMPACTION_RATIO = 4
+
+
+def normalize_query(query: str) -> str:
+    """Reduces a search query to its sorted set of search terms"""
+    return " ".join(sorted(set(tokenize(query))))
+
+
+class SearchCache:
+    """
+    Persistent, bounded store of parsed discovery results for one
+    (instruction, model) version.
+
+    Args:
+        version: Cache version (see storage.analysis_cache.analysis_version)
+        directory: Directory of searches.jsonl
+        ttl: Seconds an entry stays valid (0 disables the cache)
+        max_entries: Entries kept before the least recently used is evicted
+    """
+
+    def __init__(self, version: str, directory: str = settings.SEARCH_CACHE_DIR,
+                 ttl: float = settings.SEARCH_CACHE_TTL_SECONDS,
+                 max_entries: int = settings.SEARCH_CACHE_MAX_ENTRIES):
+        self.version = version
+        self.directory = directory
+        self.path = os.path.join(directory, "searches.jsonl")
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+
+        self._lock = threading.Lock()
+        # key -> latest record, least recently used first
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._records = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        # A torn last record would otherwise be glued to the next append
+        repair_torn_tail(self.path)
+        now = time.time()
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    record = loads_line(line)
+                except ValueError:
+                    # Garbled record; the previous one still stands
+                    continue
+                self._records += 1
+                if record.get("version") != self.version or self._is_expired(record, now):
+                    self._entries.pop(record["key"], None)
+                    continue
+                self._entries[record["key"]] = record
+                self._entries.move_to_end(record["key"])
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if self._records > COMPACTION_RATIO * max(1, len(self._entries)):
+            self._compact()
+
+    def _compact(self):
+        temporary = self.path + ".tmp"
+        with open(temporary, "wb") as f:
+            for record in self._entries.values():
+                f.write(dumps_line(record))
+        os.replace(temporary, self.path)
+        self._records = len(self._entries)
+
+    def _is_expired(self, record: Dict, now: float) -> bool:
+        return now - record["stored_at"] > self.ttl
+
+    def get(self, query: str, count: int) -> Optional[List[Dict]]:
+        """
+        Looks up the results of a search asking for count candidates.
+
+        Args:
+            query: Search query (normalized before lookup)
+            count: Number of candidates wanted; entries stored for a
+                   smaller request do not answer a larger one
+
+        Returns:
+            list | None: Up to count candidate paper dicts, or None on a miss
+        """
+        key = normalize_query(query)
+        if not self.ttl or not key:
+            return None
+        with self._lock:
+            record = self._entries.get(key)
+            if record is not None and self._is_expired(record, time.time()):
+                del self._entries[key]
+                self.expired += 1
+                record = None
+            if record is None or record["count"] < count:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return [dict(paper) for paper in record["papers"][:count]]
+
+    def put(self, query: str, count: int, papers: List[Dict], version: str = None):
+        """
+        Stores the parsed results of a search that asked for count candidates.
+        Results of another version (a different model answered) are not
+        stored, since this cache would never serve them.
+        """
+        key = normalize_query(query)
+        if not self.ttl or not key or not papers or (version or self.version) != self.version:
+            return
+        record = {
+            "key": key,
+            "version": self.version,
+            "query": query,
+            "count": count,
+            "stored_at": time.time(),
+            "papers": papers,
+        }
+        with self._lock:
+            self._entries[key] = record
+            self._entries.move_to_end(key)
+            with open(self.path, "ab") as f:
+                f.write(dumps_line(record))
+            self._records += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            if self._records > COMPACTION_RATIO * len(self._entries):
+                self._compact()
+
+    def stats(self) -> Dict:
+        """Reports hit/miss counts and cache size"""
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,274 @@
+"""
+Append-only segment store for extracted paper text
+
+Texts are appended to a few large segment files instead of one file per
+paper, and an in-memory offset index (paper_id -> segment, offset, length)
+is rebuilt from a small log on startup. Reads are slices of memory-mapped
+segments: get_view() returns a zero-copy memoryview, get() decodes it.
+
+Replacing or deleting a paper leaves its old bytes behind as dead space;
+once dead bytes make up more than COMPACTION_DEAD_SHARE of the store, live
+texts are copied into fresh segments and the old ones are removed.
+
+On-disk layout:
+    segment-000001.dat ...   UTF-8 texts, back to back
+    index.jsonl              {"paper_id", "segment", "offset", "length"} per
+                             append, {"paper_id", "deleted": true} per
+                             delete - last record wins
+"""
+
+import mmap
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from config import settings
+from records import dumps_line, loads_line
+
+# Compact once dead bytes exceed this share of all stored bytes
+COMPACTION_DEAD_SHARE = 0.5
+
+# Stores smaller than this are never compacted (not worth the rewrite)
+COMPACTION_MIN_BYTES = 4 * 1024 * 1024
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".dat"
+
+
+class SegmentTextStore:
+    """
+    Paper texts in append-only, memory-mapped segment files.
+
+    Args:
+        directory: Directory of the segments and index.jsonl
+        segment_bytes: A new segment is started once the current one
+                       would grow beyond this size
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = settings.TEXT_SEGMENT_MB * 1024 * 1024):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.jsonl")
+        self.segment_bytes = max(1, segment_bytes)
+
+        self._lock = threading.RLock()
+        # paper_id -> (segment, offset, length)
+        self._entries: Dict[str, Tuple[int, int, int]] = {}
+        # segment -> mapping of its first mapped bytes (remapped when it grows)
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._segment = 1
+        self._segment_size = 0
+        self._live_bytes = 0
+        self._dead_bytes = 0
+        self.compactions = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{segment:06d}{SEGMENT_SUFFIX}")
+
+    def _segments_on_disk(self) -> list:
+        return sorted(
+            int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        segments = self._segments_on_disk()
+        sizes = {segment: os.path.getsize(self._segment_path(segment)) for segment in segments}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = loads_line(line)
+                    except ValueError:
+                        # Torn write from a crash; the previous record still stands
+                        continue
+                    if record.get("deleted"):
+                        self._entries.pop(record["paper_id"], None)
+                        continue
+                    entry = (record["segment"], record["offset"], record["length"])
+                    if entry[1] + entry[2] > sizes.get(entry[0], -1):
+                        # Index written but text lost (crash between the two writes)
+                        continue
+                    self._entries[record["paper_id"]] = entry
+
+        if segments:
+            self._segment = segments[-1]
+            self._segment_size = sizes[self._segment]
+        self._live_bytes = sum(entry[2] for entry in self._entries.values())
+        # Bytes no live entry points to (superseded, deleted or orphaned)
+        self._dead_bytes = max(0, sum(sizes.values()) - self._live_bytes)
+
+    def _drop(self, paper_id: str):
+        entry = self._entries.pop(paper_id, None)
+        if entry is not None:
+            self._live_bytes -= entry[2]
+            self._dead_bytes += entry[2]
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _append_index(self, record: Dict):
+        with open(self.index_path, "ab") as f:
+            f.write(dumps_line(record))
+
+    def put(self, paper_id: str, text: str) -> Tuple[int, int, int]:
+        """
+        Stores (or replaces) the text of a paper.
+
+        Returns:
+            tuple: (segment, offset, length) of the stored bytes
+        """
+        data = text.encode("utf-8")
+        with self._lock:
+            if self._segment_size and self._segment_size + len(data) > self.segment_bytes:
+                self._segment += 1
+                self._segment_size = 0
+            with open(self._segment_path(self._segment), "ab") as f:
+                offset = f.tell()
+                f.write(data)
+            entry = (self._segment, offset, len(data))
+            self._segment_size = offset + len(data)
+            # Text first, then the index: a crash in between only orphans bytes
+            self._append_index({"paper_id": paper_id, "segment": entry[0], "offset": entry[1],
+                                "length": entry[2]})
+            self._drop(paper_id)
+            self._entries[paper_id] = entry
+            self._live_bytes += entry[2]
+            self._maybe_compact()
+            return entry
+
+    def rename(self, paper_id: str, new_id: str) -> bool:
+        """Files a stored text under another paper ID without copying it"""
+        with self._lock:
+            entry = self._entries.get(paper_id)
+            if entry is None:
+                return False
+            if paper_id == new_id:
+                return True
+            self._append_index({"paper_id": new_id, "segment": entry[0], "offset": entry[1],
+                                "length": entry[2]})
+            self._append_index({"paper_id": paper_id, "deleted": True})
+            self._drop(new_id)
+            del self._entries[paper_id]
+            self._entries[new_id] = entry
+            return True
+
+    def delete(self, paper_id: str):
+        """Removes a paper's text (its bytes are reclaimed by compaction)"""
+        with self._lock:
+            if paper_id not in self._entries:
+                return
+            self._append_index({"paper_id": paper_id, "deleted": True})
+            self._drop(paper_id)
+            self._maybe_compact()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _map(self, segment: int, end: int) -> mmap.mmap:
+        """Mapping of a segment that covers at least its first end bytes"""
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < end:
+            # The old mapping is dropped, not closed: views handed out earlier
+            # keep it alive until they are released
+            with open(self._segment_path(segment), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = mapped
+        return mapped
+
+    def get_view(self, paper_id: str) -> Optional[memoryview]:
+        """Zero-copy view of a paper's UTF-8 text, or None if it is not stored"""
+        with self._lock:
+            entry = self._entries.get(paper_id)
+            if entry is None:
+                return None
+            segment, offset, length = entry
+            if length == 0:
+                return memoryview(b"")
+            return memoryview(self._map(segment, offset + length))[offset:offset + length]
+
+    def get(self, paper_id: str) -> Optional[str]:
+        """A paper's text, or None if it is not stored"""
+        view = self.get_view(paper_id)
+        if view is None:
+            return None
+        try:
+            return str(view, "utf-8")
+        finally:
+            view.release()
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def _maybe_compact(self):
+        total = self._live_bytes + self._dead_bytes
+        if total >= COMPACTION_MIN_BYTES and self._dead_bytes > COMPACTION_DEAD_SHARE * total:
+            self.compact()
+
+    def compact(self):
+        """Copies live texts into fresh segments and removes the old ones"""
+        with self._lock:
+            old_segments = self._segments_on_disk()
+            first = (old_segments[-1] if old_segments else 0) + 1
+            segment, size = first, 0
+            entries: Dict[str, Tuple[int, int, int]] = {}
+            output = open(self._segment_path(segment), "wb")
+            try:
+                # Segment order keeps reads of each old segment sequential
+                for paper_id, (old_segment, offset, length) in sorted(
+                        self._entries.items(), key=lambda item: item[1]):
+                    if size and size + length > self.segment_bytes:
+                        output.close()
+                        segment, size = segment + 1, 0
+                        output = open(self._segment_path(segment), "wb")
+                    output.write(self._map(old_segment, offset + length)[offset:offset + length])
+                    entries[paper_id] = (segment, size, length)
+                    size += length
+            finally:
+                output.close()
+
+            temporary = self.index_path + ".tmp"
+            with open(temporary, "wb") as f:
+                for paper_id, entry in entries.items():
+                    f.write(dumps_line({"paper_id": paper_id, "segment": entry[0], "offset": entry[1],
+                                        "length": entry[2]}))
+            os.replace(temporary, self.index_path)
+
+            self._entries = entries
+            self._maps.clear()
+            for old in old_segments:
+                try:
+                    os.remove(self._segment_path(old))
+                except OSError:
+                    # Still mapped by a reader on a platform that forbids it; left as garbage
+                    pass
+            self._segment, self._segment_size = segment, size
+            self._dead_bytes = 0
+            self.compactions += 1
+
+    def stats(self) -> Dict:
+        """Reports stored texts, segment count and live/dead bytes"""
+        with self._lock:
+            return {
+                "texts": len(self._entries),
+                "segments": len(self._segments_on_disk()),
+                "live_bytes": self._live_bytes,
+                "dead_bytes": self._dead_bytes,
+                "compactions": self.compactions,
+            }
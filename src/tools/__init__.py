@@ -2,12 +2,17 @@
 Custom tools for LitSynth
 """
 
-from .pdf_tools import fetch_pdf
+from .pdf_tools import fetch_pdf, afetch_pdf
 from .citation_tools import extract_citation
 from .evaluation_tools import evaluate_draft
+from .ranking_tools import rank_candidates
+from .reference_tools import parse_references
 
 __all__ = [
     "fetch_pdf",
+    "afetch_pdf",
     "extract_citation", 
-    "evaluate_draft"
+    "evaluate_draft",
+    "rank_candidates",
+    "parse_references"
 ]
\ No newline at end of file
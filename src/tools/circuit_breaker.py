@@ -0,0 +1,95 @@
+"""
+Per-host circuit breaker for LitSynth downloads
+
+A host that is down costs a full timeout per paper. After a run of
+consecutive failures (timeouts, connection errors, 5xx and 429 answers) the
+host's circuit opens and requests to it fail at once. Once the reset time
+has passed, a single trial request is let through: success closes the
+circuit, failure keeps it open for another reset period.
+"""
+
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlsplit
+
+from config import settings
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit is open"""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"{host} is failing repeatedly; skipped for another {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+class HostCircuitBreaker:
+    """
+    Tracks consecutive failures per host.
+
+    Args:
+        threshold: Consecutive failures that open a host's circuit
+        reset_seconds: Seconds an open circuit fails fast before a trial request
+    """
+
+    def __init__(self, threshold: int = settings.CIRCUIT_FAILURE_THRESHOLD,
+                 reset_seconds: float = settings.CIRCUIT_RESET_SECONDS):
+        self.threshold = max(1, threshold)
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        # host -> consecutive failures
+        self._failures: Dict[str, int] = {}
+        # host -> time before which requests fail fast (open circuits only)
+        self._retry_at: Dict[str, float] = {}
+        self.opened = 0
+        self.rejected = 0
+
+    def before_request(self, url: str):
+        """
+        Lets a request through, or raises CircuitOpenError while the host's
+        circuit is open. The first request after the reset time is the
+        trial; until it reports back, later requests keep failing fast.
+        """
+        host = host_of(url)
+        now = time.monotonic()
+        with self._lock:
+            retry_at = self._retry_at.get(host)
+            if retry_at is None:
+                return
+            if now < retry_at:
+                self.rejected += 1
+                raise CircuitOpenError(host, retry_at - now)
+            # Half-open: a trial that never reports back (cancelled) expires too
+            self._retry_at[host] = now + self.reset_seconds
+
+    def record(self, url: str, failed: bool):
+        """Reports the outcome of a request that was let through"""
+        host = host_of(url)
+        with self._lock:
+            if not failed:
+                self._failures.pop(host, None)
+                self._retry_at.pop(host, None)
+                return
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            if failures >= self.threshold:
+                if host not in self._retry_at:
+                    self.opened += 1
+                self._retry_at[host] = time.monotonic() + self.reset_seconds
+
+    def record_status(self, url: str, status_code: int):
+        """Reports an HTTP answer: 5xx and 429 count as host failures"""
+        self.record(url, failed=status_code >= 500 or status_code == 429)
+
+    def stats(self) -> Dict:
+        """Reports open circuits and fast-failed requests"""
+        now = time.monotonic()
+        with self._lock:
+            open_hosts = sorted(host for host, retry_at in self._retry_at.items() if retry_at > now)
+        return {"open_hosts": open_hosts, "opened": self.opened, "rejected": self.rejected}
@@ -2,8 +2,18 @@
 Citation extraction and formatting tools for LitSynth
 """
 
+import hashlib
+import re
 from typing import List, Dict
-from datetime import datetime
+
+from records import validate_citation_fields
+
+# DOI and arXiv identifiers as they appear in URLs and metadata
+DOI_PATTERN = re.compile(r"(10\.\d{4,9}/[^\s?#]+)", re.IGNORECASE)
+ARXIV_PATTERN = re.compile(
+    r"arxiv\.org/(?:abs|pdf)/([a-z\-]+(?:\.[a-z]{2})?/\d{7}|\d{4}\.\d{4,5})",
+    re.IGNORECASE
+)
 
 def extract_citation(
     title: str,
@@ -16,15 +26,10 @@ def extract_citation(
     """
     try:
         # Validate metadata first
-        validated = validate_citation_metadata(title, authors, year, venue)
-        
-        title = validated["validated_title"]
-        authors = validated["validated_authors"] 
-        year = validated["validated_year"]
-        venue = validated["validated_venue"]
+        title, authors, year, venue, issues = validate_citation_fields(title, authors, year, venue)
         
-        if validated["validation_issues"]:
-            print(f"Citation validation issues: {validated['validation_issues']}")
+        if issues:
+            print(f"Citation validation issues: {list(issues)}")
         
         # Format authors with improved function
         formatted_authors = format_authors_apa(authors)
@@ -48,7 +53,7 @@ def extract_citation(
             "status": "success",
             "citation": citation,
             "bibtex": bibtex,
-            "validation_issues": validated["validation_issues"],
+            "validation_issues": list(issues),
             "message": "Citation generated successfully"
         }
         
@@ -138,6 +143,47 @@ def generate_bibtex(title: str, authors: List[str], year: int, venue: str) -> st
     return bibtex
 
 
+def canonical_paper_id(paper: Dict) -> str:
+    """
+    Derives a stable identity for a paper across runs and sources.
+
+    Preference order: DOI, arXiv ID (without version), normalized title hash,
+    and finally a hash of the URL when nothing else is known.
+
+    Args:
+        paper: Paper metadata dict (title, url, optional doi/arxiv_id)
+
+    Returns:
+        str: Identifier such as "doi:10.1000/xyz", "arxiv:1706.03762",
+             "title:<hash>" or "url:<hash>"
+    """
+    url = str(paper.get("url") or "")
+
+    doi = str(paper.get("doi") or "")
+    match = DOI_PATTERN.search(doi) or DOI_PATTERN.search(url)
+    if match:
+        doi = match.group(1).lower()
+        if doi.endswith(".pdf"):
+            doi = doi[:-4]
+        return f"doi:{doi.rstrip('.')}"
+
+    arxiv_id = str(paper.get("arxiv_id") or "")
+    if arxiv_id:
+        arxiv_id = re.sub(r"v\d+$", "", arxiv_id.strip().lower())
+        return f"arxiv:{arxiv_id}"
+    match = ARXIV_PATTERN.search(url)
+    if match:
+        return f"arxiv:{match.group(1).lower()}"
+
+    title = str(paper.get("title") or "")
+    normalized_title = " ".join(re.findall(r"[a-z0-9]+", title.lower()))
+    if normalized_title:
+        return f"title:{hashlib.sha1(normalized_title.encode('utf-8')).hexdigest()[:16]}"
+
+    normalized_url = url.strip().lower().rstrip("/")
+    return f"url:{hashlib.sha1(normalized_url.encode('utf-8')).hexdigest()[:16]}"
+
+
 # Test function for development
 if __name__ == "__main__":
     print("Testing citation formatter...")
@@ -167,34 +213,14 @@ if __name__ == "__main__":
 def validate_citation_metadata(title: str, authors: List[str], year: int, venue: str) -> Dict:
     """
     Validate citation metadata before generating citation
+    (dict form of records.validate_citation_fields)
     """
-    issues = []
-    
-    if not title or len(title.strip()) < 5:
-        issues.append("Title too short or missing")
-        title = "Unknown Title"
-    
-    if not authors or len(authors) == 0:
-        issues.append("No authors provided")
-        authors = ["Unknown"]
-    else:
-        # Clean author list
-        authors = [author.strip() for author in authors if author and author.strip()]
-        if not authors:
-            authors = ["Unknown"]
-    
-    if not year or year < 1900 or year > 2030:
-        issues.append(f"Invalid year: {year}")
-        year = datetime.now().year  # Default to current year
-    
-    if not venue or len(venue.strip()) < 2:
-        issues.append("Venue missing or too short")
-        venue = "Unknown Venue"
+    title, authors, year, venue, issues = validate_citation_fields(title, authors, year, venue)
     
     return {
         "validated_title": title,
-        "validated_authors": authors,
+        "validated_authors": list(authors),
         "validated_year": year,
         "validated_venue": venue,
-        "validation_issues": issues
+        "validation_issues": list(issues)
     }
\ No newline at end of file
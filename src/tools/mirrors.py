@@ -0,0 +1,169 @@
+"""
+Mirrors of PDF sources and the hedge delay for LitSynth downloads
+
+fetch_pdf hedges slow downloads: when the first request for a paper has not
+answered within a high percentile of recent response times, the same
+document is requested from a mirror and the first usable answer wins.
+
+Mirrors are found by rewriting the URL:
+
+    arxiv.org/pdf/<id>             <-> export.arxiv.org/pdf/<id>
+    doi.org/10.48550/arXiv.<id>     -> arxiv.org/pdf/<id>, export.arxiv.org/pdf/<id>
+    doi.org/10.18653/v1/<id>        -> aclanthology.org/<id>.pdf
+    any other DOI                   -> open-access copy from Unpaywall
+                                       (only with LITSYNTH_UNPAYWALL_EMAIL set)
+
+Unpaywall answers need a lookup, so they are listed as "unpaywall:<doi>"
+placeholders and resolved only when the hedge actually fires.
+
+A DOI resolver (doi.org) usually answers with the publisher's HTML landing
+page. That says nothing about whether an open-access PDF exists, so such
+answers are not negative-cached (see is_doi_resolver).
+"""
+
+import re
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+from urllib.parse import quote, urlsplit
+
+from config import settings
+from .citation_tools import DOI_PATTERN
+
+UNPAYWALL_PREFIX = "unpaywall:"
+UNPAYWALL_API = "https://api.unpaywall.org/v2/"
+
+ARXIV_HOSTS = ("arxiv.org", "export.arxiv.org")
+DOI_RESOLVER_HOSTS = ("doi.org", "dx.doi.org")
+ARXIV_PATH_PATTERN = re.compile(r"^/(?:pdf|abs)/(.+?)(?:\.pdf)?/?$", re.IGNORECASE)
+ARXIV_DOI_PATTERN = re.compile(r"^10\.48550/arxiv\.(.+)$", re.IGNORECASE)
+ACL_DOI_PATTERN = re.compile(r"^10\.18653/v1/(.+)$", re.IGNORECASE)
+
+# Response times kept for the hedge percentile, and the samples needed before using it
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+
+
+def _arxiv_urls(arxiv_id: str) -> List[str]:
+    return [f"https://{host}/pdf/{arxiv_id}" for host in ARXIV_HOSTS]
+
+
+def _host(url: str) -> str:
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def is_doi_resolver(url: str) -> bool:
+    """True for doi.org URLs, which redirect to a landing page rather than a PDF"""
+    return _host(url) in DOI_RESOLVER_HOSTS
+
+
+def mirror_urls(url: str) -> List[str]:
+    """
+    Lists alternative sources of the document behind a PDF URL.
+
+    Args:
+        url: URL of the primary source
+
+    Returns:
+        list: Mirror URLs in preference order (never including url itself);
+              Unpaywall lookups appear as "unpaywall:<doi>" placeholders
+    """
+    parts = urlsplit(url)
+    host = _host(url)
+
+    candidates = []
+    if host in ARXIV_HOSTS:
+        match = ARXIV_PATH_PATTERN.match(parts.path)
+        if match:
+            # Same host first would be pointless; the other arXiv host is the mirror
+            candidates = [u for u in _arxiv_urls(match.group(1)) if urlsplit(u).hostname != host]
+    else:
+        match = DOI_PATTERN.search(url)
+        if match:
+            doi = match.group(1).rstrip(".").removesuffix(".pdf")
+            arxiv = ARXIV_DOI_PATTERN.match(doi)
+            acl = ACL_DOI_PATTERN.match(doi)
+            if arxiv:
+                candidates = _arxiv_urls(arxiv.group(1))
+            elif acl:
+                candidates = [f"https://aclanthology.org/{acl.group(1)}.pdf"]
+            elif settings.UNPAYWALL_EMAIL:
+                candidates = [UNPAYWALL_PREFIX + doi]
+
+    return [candidate for candidate in dict.fromkeys(candidates) if candidate != url]
+
+
+def unpaywall_request(placeholder: str) -> Dict:
+    """Returns the requests/httpx keyword arguments of the lookup behind a placeholder"""
+    doi = placeholder[len(UNPAYWALL_PREFIX):]
+    return {
+        "url": UNPAYWALL_API + quote(doi, safe="/"),
+        "params": {"email": settings.UNPAYWALL_EMAIL},
+    }
+
+
+def unpaywall_pdf_url(answer: Dict) -> Optional[str]:
+    """Picks the PDF URL of the best open-access location from an Unpaywall answer"""
+    locations = [answer.get("best_oa_location")] + list(answer.get("oa_locations") or [])
+    for location in locations:
+        if location and location.get("url_for_pdf"):
+            return location["url_for_pdf"]
+    return None
+
+
+class HedgeDelay:
+    """
+    Rolling window of first-response times of PDF downloads, and the delay
+    after which a download is hedged: the configured percentile of the
+    window, clamped to [min_delay, default_delay * 4]. Until the window
+    holds enough samples the default delay is used.
+
+    Args:
+        percentile: Percentile of recent response times to wait (0-100)
+        default_delay: Seconds to wait before enough samples were seen
+        min_delay: Lower bound of the delay in seconds
+    """
+
+    def __init__(self, percentile: float = settings.HEDGE_PERCENTILE,
+                 default_delay: float = settings.HEDGE_DEFAULT_DELAY,
+                 min_delay: float = settings.HEDGE_MIN_DELAY):
+        self.percentile = min(100.0, max(0.0, percentile))
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self._samples = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedged = 0
+        self.mirror_wins = 0
+
+    def record(self, seconds: float):
+        """Adds the response time of a primary request to the window"""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def delay(self) -> float:
+        """Seconds to wait for the primary before asking a mirror"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return self.default_delay
+        index = min(len(samples) - 1, int(len(samples) * self.percentile / 100))
+        return min(max(samples[index], self.min_delay), self.default_delay * 4)
+
+    def count(self, hedged: bool, mirror_won: bool):
+        """Counts one download for stats()"""
+        with self._lock:
+            self.requests += 1
+            self.hedged += hedged
+            self.mirror_wins += mirror_won
+
+    def stats(self) -> Dict:
+        """Reports how often downloads were hedged and how often a mirror won"""
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "mirror_wins": self.mirror_wins,
+            "hedge_rate": round(self.hedged / self.requests, 3) if self.requests else 0.0,
+            "delay_seconds": round(self.delay(), 3),
+        }
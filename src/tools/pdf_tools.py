@@ -3,11 +3,80 @@ PDF fetching and parsing tools for LitSynth
 """
 
 import requests
+import asyncio
+import atexit
 import io
-from typing import Dict
+import re
+import ssl
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+import httpx
 import PyPDF2
+from PyPDF2 import PageObject
+from PyPDF2.generic import IndirectObject, NameObject
 import fitz  # pymupdf - better text extraction
 
+from config import settings
+from .citation_tools import canonical_paper_id
+from .circuit_breaker import CircuitOpenError, HostCircuitBreaker
+from .mirrors import (UNPAYWALL_PREFIX, HedgeDelay, is_doi_resolver, mirror_urls, unpaywall_pdf_url,
+                      unpaywall_request)
+from .pdf_workers import ParseWorkerPool, default_start_method
+from .reference_tools import parse_references
+
+# Only the first pages and characters of a paper are sent to the analyzer
+MAX_PAGES = 50
+MAX_CHARS = 100000
+
+# Raw characters to parse before stopping; leaves headroom for boilerplate removal
+PARSE_CHAR_BUDGET = int(MAX_CHARS * 1.3)
+
+# Documents with less text than this are treated as scanned/image-based
+MIN_TEXT_CHARS = 100
+
+# Image-only documents are abandoned after this many pages
+SCANNED_PROBE_PAGES = 3
+
+# Leading bytes requested by the first download request
+RANGE_PROBE_BYTES = 256 * 1024
+
+# Files larger than this are parsed in place via Range requests when possible
+RANGE_MIN_SIZE = 2 * 1024 * 1024
+
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# Top/bottom fraction of the page where running headers and footers live
+MARGIN_ZONE = 0.08
+
+# Left/right fraction of the page where line-number gutters live
+GUTTER_ZONE = 0.12
+
+# A margin line repeated on at least this share of pages is page furniture
+REPEATED_LINE_SHARE = 0.5
+
+PAGE_NUMBER_PATTERN = re.compile(r"^(page\s*)?\d{1,4}(\s*(of|/)\s*\d{1,4})?$", re.IGNORECASE)
+LINE_NUMBER_PATTERN = re.compile(r"^\d{1,4}$")
+ARXIV_STAMP_PATTERN = re.compile(r"^arXiv:\s*\d{4}\.\d{4,5}(v\d+)?\s*\[[^\]]+\]", re.IGNORECASE)
+REFERENCES_HEADING_PATTERN = re.compile(
+    r"^(\d+\.?\s*|[IVX]+\.?\s*)?(references|bibliography|works cited|literature cited)$",
+    re.IGNORECASE
+)
+
+# A (text, zone) pair; zone is "body", "header", "footer", "gutter", "rotated" or
+# "edge" (first or last lines of a page without coordinates, see _plain_page_lines)
+Line = Tuple[str, str]
+
+# Response times of first requests, shared by all downloads of this process
+hedge_delay = HedgeDelay()
+
+# Hosts that keep failing are skipped for a while
+host_breaker = HostCircuitBreaker()
+
 
 def fetch_pdf(url: str) -> Dict:
     """
@@ -15,6 +84,19 @@ def fetch_pdf(url: str) -> Dict:
     
     This tool is used by PaperAnalyzerAgent to download and read academic papers.
     It handles various PDF sources and performs robust text extraction.
+    Papers already in the local library are served from disk without any
+    network access; newly fetched papers are added to it. Large files on
+    servers that support HTTP Range requests are parsed in place, so only
+    the bytes of the pages actually read are downloaded. Slow sources are
+    hedged: if the first request has not answered within the usual response
+    time, a mirror (export.arxiv.org, an open-access copy of a DOI) is asked
+    as well and the first usable answer wins. URLs that failed permanently
+    (paywall, 404, not a PDF) are not retried until a TTL passes, and hosts
+    that keep failing are skipped for a while. Parsing runs in
+    sandboxed worker processes with CPU, memory and wall-clock limits, so a
+    hostile or broken PDF yields an error result instead of a hung review.
+
+    This is the synchronous wrapper around afetch_pdf, which does the work.
     
     Args:
         url: Direct URL to a PDF file (e.g., arxiv.org, ACL anthology, etc.)
@@ -24,6 +106,7 @@ def fetch_pdf(url: str) -> Dict:
             "status": "success" | "error",
             "text": "extracted text content" | None,
             "page_count": int | None,
+            "bytes_downloaded": int,
             "message": "error description if failed"
         }
     
@@ -35,97 +118,109 @@ def fetch_pdf(url: str) -> Dict:
         15
     """
     try:
-        # Step 1: Download the PDF
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(afetch_pdf(url))
+    # Called from inside an event loop (a sync tool on the loop thread):
+    # run the download on a helper thread with its own loop
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="litsynth-fetch") as executor:
+        return executor.submit(asyncio.run, afetch_pdf(url)).result()
+
+
+async def afetch_pdf(url: str) -> Dict:
+    """
+    Fetches a PDF from a URL and extracts its text content without blocking
+    the event loop.
+
+    Same behaviour and result as fetch_pdf: downloads use async HTTP, and
+    parsing waits on the sandboxed worker pool from a helper thread.
+
+    Args:
+        url: Direct URL to a PDF file (e.g., arxiv.org, ACL anthology, etc.)
+
+    Returns:
+        dict: {
+            "status": "success" | "error",
+            "text": "extracted text content" | None,
+            "page_count": int | None,
+            "bytes_downloaded": int,
+            "message": "error description if failed"
         }
-        
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()  # Raise exception for bad status codes
-        
-        # Verify it's actually a PDF
-        content_type = response.headers.get('content-type', '').lower()
-        if 'application/pdf' not in content_type and not url.endswith('.pdf'):
-            return {
-                "status": "error",
-                "text": None,
-                "page_count": None,
-                "message": f"URL does not point to a PDF file. Content-Type: {content_type}"
-            }
-        
-        # Step 2: Extract text using PyMuPDF (better quality than PyPDF2)
-        pdf_bytes = io.BytesIO(response.content)
-        
-        try:
-            # Try PyMuPDF first (better quality)
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-            text_parts = []
-            page_count = len(doc)
-            
-            # Limit to first 50 pages to manage context size
-            max_pages = min(page_count, 50)
-            
-            for page_num in range(max_pages):
-                page = doc[page_num]
-                text_parts.append(page.get_text())
-            
-            doc.close()
-            extracted_text = "\n\n".join(text_parts)
-            
-        except Exception as pymupdf_error:
-            # Fallback to PyPDF2 if PyMuPDF fails
-            pdf_bytes.seek(0)  # Reset stream
-            pdf_reader = PyPDF2.PdfReader(pdf_bytes)
-            page_count = len(pdf_reader.pages)
-            max_pages = min(page_count, 50)
-            
-            text_parts = []
-            for page_num in range(max_pages):
-                page = pdf_reader.pages[page_num]
-                text_parts.append(page.extract_text())
-            
-            extracted_text = "\n\n".join(text_parts)
-        
-        # Step 3: Clean and limit the text
-        # Remove excessive whitespace
-        extracted_text = " ".join(extracted_text.split())
-        
-        # Limit to ~100,000 characters to manage context
-        if len(extracted_text) > 100000:
-            extracted_text = extracted_text[:100000] + "\n\n[Text truncated due to length...]"
-        
-        # Check if we actually got meaningful text
-        if len(extracted_text.strip()) < 100:
-            return {
-                "status": "error",
-                "text": None,
-                "page_count": page_count,
-                "message": "PDF text extraction yielded very little text. PDF may be scanned/image-based."
-            }
-        
+    """
+    try:
+        # Step 0: Serve from the local library if we fetched this paper before
+        cached = await asyncio.to_thread(_load_from_library, url)
+        if cached is not None:
+            return cached
+        known_failure = await asyncio.to_thread(_load_failure, url)
+        if known_failure is not None:
+            return known_failure
+
+        async with httpx.AsyncClient(headers=REQUEST_HEADERS, timeout=30, follow_redirects=True,
+                                     verify=_get_ssl_context()) as client:
+            # Step 1: Download the PDF. The first request asks for a leading byte
+            # range, so servers that support Range requests reveal the full size.
+            # It is hedged across mirrors; the rest comes from whichever answered
+            source, response = await _ahedged_probe(client, url)
+            try:
+                # Verify it's actually a PDF before reading the body
+                not_pdf = _check_content_type(source, response)
+                if not_pdf is not None:
+                    if not is_doi_resolver(source):
+                        await asyncio.to_thread(_save_failure, url, not_pdf["message"])
+                    return not_pdf
+                await response.aread()
+            finally:
+                await response.aclose()
+
+            # Step 2: Extract text. Large files on Range-capable servers are parsed
+            # in place, downloading only the byte ranges the parser touches
+            total_size = _content_range_total(response)
+
+            if settings.RANGE_REQUESTS and total_size and total_size > RANGE_MIN_SIZE:
+                # The worker downloads the ranges it needs and reports the byte count
+                result = await asyncio.to_thread(
+                    _parse, {"url": source, "size": total_size, "prefix": response.content}
+                )
+                bytes_downloaded = result.pop("bytes_downloaded", len(response.content))
+            else:
+                pdf_data = response.content
+                bytes_downloaded = len(pdf_data)
+                if total_size and len(pdf_data) < total_size:
+                    rest = await client.get(source, headers={"Range": f"bytes={len(pdf_data)}-"})
+                    rest.raise_for_status()
+                    pdf_data = pdf_data + rest.content if rest.status_code == 206 else rest.content
+                    bytes_downloaded += len(rest.content)
+                result = await asyncio.to_thread(_parse, {"data": pdf_data})
+
+        # Step 3: File the paper and its references
+        return await asyncio.to_thread(_finish_fetch, url, result, bytes_downloaded)
+
+    except CircuitOpenError as e:
         return {
-            "status": "success",
-            "text": extracted_text,
-            "page_count": page_count,
-            "message": f"Successfully extracted text from {max_pages} pages"
+            "status": "error",
+            "text": None,
+            "page_count": None,
+            "message": f"Skipped: {str(e)}"
         }
-        
-    except requests.exceptions.Timeout:
+
+    except httpx.TimeoutException:
         return {
             "status": "error",
             "text": None,
             "page_count": None,
             "message": "Request timed out. The PDF source may be slow or unavailable."
         }
-    
-    except requests.exceptions.RequestException as e:
+
+    except httpx.HTTPError as e:
+        await asyncio.to_thread(_save_http_failure, url, e)
         return {
             "status": "error",
             "text": None,
             "page_count": None,
             "message": f"Failed to download PDF: {str(e)}"
         }
-    
+
     except Exception as e:
         return {
             "status": "error",
@@ -135,6 +230,725 @@ def fetch_pdf(url: str) -> Dict:
         }
 
 
+_ssl_context: ssl.SSLContext | None = None
+_ssl_context_lock = threading.Lock()
+
+
+def _get_ssl_context() -> ssl.SSLContext:
+    """
+    Returns the process-wide TLS context for download clients. Loading the
+    CA bundle takes tens of milliseconds, too long to repeat per download.
+    """
+    global _ssl_context
+    with _ssl_context_lock:
+        if _ssl_context is None:
+            _ssl_context = httpx.create_ssl_context()
+        return _ssl_context
+
+
+async def _aprobe(client: httpx.AsyncClient, url: str) -> Tuple[str, httpx.Response]:
+    """
+    Sends the first request of a download: a Range request for the leading
+    bytes, streamed so only the headers have arrived when it returns.
+    Unpaywall placeholders are resolved to their open-access URL first.
+
+    Returns:
+        tuple: (URL actually requested, response with its body not read yet)
+    """
+    if url.startswith(UNPAYWALL_PREFIX):
+        lookup = await client.get(**unpaywall_request(url))
+        lookup.raise_for_status()
+        url = unpaywall_pdf_url(lookup.json())
+        if not url:
+            raise httpx.HTTPError("No open-access copy found")
+    host_breaker.before_request(url)
+    request = client.build_request("GET", url, headers={"Range": f"bytes=0-{RANGE_PROBE_BYTES - 1}"})
+    try:
+        response = await client.send(request, stream=True)
+    except httpx.TransportError:
+        host_breaker.record(url, failed=True)
+        raise
+    host_breaker.record_status(url, response.status_code)
+    try:
+        response.raise_for_status()
+    except httpx.HTTPStatusError:
+        await response.aclose()
+        raise
+    return url, response
+
+
+async def _ahedged_probe(client: httpx.AsyncClient, url: str) -> Tuple[str, httpx.Response]:
+    """
+    Sends the first request of a download, hedged across mirrors.
+
+    The primary is asked first. Whenever hedge_delay passes without a usable
+    answer, or the latest request fails, the next mirror is asked as well.
+    The first 2xx PDF response wins; the other requests are cancelled and
+    their responses closed. If no source answers usably, the primary's
+    response is returned (or its error raised).
+
+    Returns:
+        tuple: (URL that answered, response)
+    """
+    mirrors = mirror_urls(url) if settings.HEDGE_REQUESTS else []
+    started = time.monotonic()
+    if not mirrors:
+        source, response = await _aprobe(client, url)
+        hedge_delay.record(time.monotonic() - started)
+        hedge_delay.count(hedged=False, mirror_won=False)
+        return source, response
+
+    delay = hedge_delay.delay()
+    waiting = [url] + mirrors
+    pending = {}
+    outcomes = {}
+    winner = None
+    next_launch = started
+    try:
+        while winner is None and (waiting or pending):
+            now = time.monotonic()
+            if waiting and (now >= next_launch or not pending):
+                candidate = waiting.pop(0)
+                pending[asyncio.create_task(_aprobe(client, candidate))] = candidate
+                next_launch = now + delay
+                continue
+            done, _ = await asyncio.wait(pending, timeout=max(0.0, next_launch - now) if waiting else None,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                candidate = pending.pop(task)
+                try:
+                    outcomes[candidate] = task.result()
+                except Exception as e:
+                    outcomes[candidate] = e
+                if _usable_probe(url, candidate, outcomes[candidate], started):
+                    winner = candidate
+                    break
+                next_launch = time.monotonic()
+
+        chosen, losers = _settle_hedge(url, winner, outcomes, started, launched=len(outcomes) + len(pending))
+        for response in losers:
+            await response.aclose()
+        if isinstance(outcomes[chosen], Exception):
+            raise outcomes[chosen]
+        return outcomes[chosen]
+    finally:
+        for task in pending:
+            task.cancel()
+        for outcome in await asyncio.gather(*pending, return_exceptions=True):
+            if isinstance(outcome, tuple):
+                await outcome[1].aclose()
+
+
+def _usable_probe(url: str, candidate: str, outcome, started: float) -> bool:
+    """Records the primary's response time and tells whether an answer wins the hedge"""
+    if isinstance(outcome, Exception):
+        return False
+    if candidate == url:
+        hedge_delay.record(time.monotonic() - started)
+    source, response = outcome
+    return _check_content_type(source, response) is None
+
+
+def _settle_hedge(url: str, winner: str | None, outcomes: Dict, started: float,
+                  launched: int) -> Tuple[str, List]:
+    """
+    Books a finished hedge.
+
+    Returns:
+        tuple: (source whose outcome to use - the winner, else the primary,
+                responses of the other sources to close)
+    """
+    if url not in outcomes:
+        # The primary never answered; it took at least this long
+        hedge_delay.record(time.monotonic() - started)
+    hedge_delay.count(hedged=launched > 1, mirror_won=winner not in (None, url))
+    chosen = winner if winner is not None else url
+    losers = [
+        outcome[1] for candidate, outcome in outcomes.items()
+        if candidate != chosen and not isinstance(outcome, Exception)
+    ]
+    return chosen, losers
+
+
+def _check_content_type(url: str, response) -> Dict | None:
+    """
+    Returns an error result unless the response looks like a PDF. Callers do
+    not negative-cache it for DOI resolver URLs: the landing page a DOI
+    resolves to says nothing about whether a PDF exists elsewhere.
+    """
+    content_type = response.headers.get('content-type', '').lower()
+    if 'application/pdf' not in content_type and not url.endswith('.pdf'):
+        return {
+            "status": "error",
+            "text": None,
+            "page_count": None,
+            "message": f"URL does not point to a PDF file. Content-Type: {content_type}"
+        }
+    return None
+
+
+def _finish_fetch(url: str, result: Dict, bytes_downloaded: int) -> Dict:
+    """
+    Keeps the bibliography out of the tool result sent to the model, but
+    records it in the citation graph for snowball discovery, and files
+    successfully parsed papers in the library.
+    """
+    references = result.pop("references", "")
+    result["bytes_downloaded"] = bytes_downloaded
+
+    if result["status"] == "success":
+        _save_to_library(url, result["text"], result["page_count"])
+        _record_references(url, references)
+
+    return result
+
+
+def _content_range_total(response) -> int | None:
+    """Returns the full file size of a 206 Partial Content response"""
+    if response.status_code != 206:
+        return None
+    match = re.search(r"/(\d+)$", response.headers.get("content-range", ""))
+    return int(match.group(1)) if match else None
+
+
+class HTTPRangeFile(io.RawIOBase):
+    """
+    Read-only, seekable view of a remote file backed by HTTP Range requests.
+
+    Reads are served from fixed-size cached blocks; missing blocks that are
+    adjacent are fetched with a single request. PyPDF2 reads the xref
+    trailer first and then only the objects of the pages it parses, so a
+    200-page thesis costs a handful of small requests instead of a full
+    download.
+    """
+
+    def __init__(self, url: str, size: int, headers: Dict, prefix: bytes = b"",
+                 block_size: int | None = None):
+        super().__init__()
+        self.url = url
+        self.size = size
+        self.headers = headers
+        self.block_size = block_size or settings.RANGE_BLOCK_SIZE
+        self.bytes_downloaded = len(prefix)
+        self.request_count = 0
+        self._position = 0
+        self._session = requests.Session()
+        self._blocks: Dict[int, bytes] = {}
+
+        # Seed the cache with the bytes the probe request already returned
+        full_blocks = len(prefix) // self.block_size
+        for index in range(full_blocks):
+            self._blocks[index] = prefix[index * self.block_size:(index + 1) * self.block_size]
+        if len(prefix) == size and len(prefix) % self.block_size:
+            self._blocks[full_blocks] = prefix[full_blocks * self.block_size:]
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._position = offset
+        elif whence == io.SEEK_CUR:
+            self._position += offset
+        elif whence == io.SEEK_END:
+            self._position = self.size + offset
+        self._position = max(0, self._position)
+        return self._position
+
+    def _fetch_blocks(self, first: int, last: int):
+        """Downloads blocks first..last (inclusive) with one Range request"""
+        start = first * self.block_size
+        end = min(self.size, (last + 1) * self.block_size) - 1
+        response = self._session.get(
+            self.url,
+            headers={**self.headers, "Range": f"bytes={start}-{end}"},
+            timeout=30
+        )
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise IOError("Server stopped honouring Range requests")
+        data = response.content
+        self.request_count += 1
+        self.bytes_downloaded += len(data)
+        for index in range(first, last + 1):
+            offset = (index - first) * self.block_size
+            self._blocks[index] = data[offset:offset + self.block_size]
+
+    def read(self, size: int = -1) -> bytes:
+        if self._position >= self.size:
+            return b""
+        if size is None or size < 0:
+            size = self.size - self._position
+        end = min(self.size, self._position + size)
+        first = self._position // self.block_size
+        last = (end - 1) // self.block_size
+
+        # Fetch each contiguous run of missing blocks in one request
+        index = first
+        while index <= last:
+            if index in self._blocks:
+                index += 1
+                continue
+            run_end = index
+            while run_end + 1 <= last and run_end + 1 not in self._blocks:
+                run_end += 1
+            self._fetch_blocks(index, run_end)
+            index = run_end + 1
+
+        data = b"".join(self._blocks[i] for i in range(first, last + 1))
+        offset = self._position - first * self.block_size
+        chunk = data[offset:offset + (end - self._position)]
+        self._position += len(chunk)
+        return chunk
+
+    def readinto(self, buffer) -> int:
+        chunk = self.read(len(buffer))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+    def close(self):
+        self._session.close()
+        super().close()
+
+
+def _parse_lazily(page_count: int, read_page) -> Tuple[List[List[Line]], bool]:
+    """
+    Parses pages one at a time until the character budget is met.
+
+    Returns:
+        (pages, image_only): the parsed page lines, and True when the first
+        pages yielded (almost) no text and the document was abandoned
+    """
+    pages = []
+    chars = 0
+    for page_num in range(min(page_count, MAX_PAGES)):
+        lines = read_page(page_num)
+        pages.append(lines)
+        chars += sum(len(text) for text, _ in lines)
+        if chars >= PARSE_CHAR_BUDGET:
+            break
+        if (page_num + 1 == SCANNED_PROBE_PAGES and page_count > SCANNED_PROBE_PAGES
+                and chars < MIN_TEXT_CHARS):
+            return pages, True
+    return pages, False
+
+
+def _finish_extraction(pages: List[List[Line]], page_count: int, image_only: bool) -> Dict:
+    """Cleans parsed pages into the fetch_pdf result dict"""
+    if image_only:
+        return {
+            "status": "error",
+            "text": None,
+            "page_count": page_count,
+            "message": (
+                f"No text found in the first {len(pages)} pages. "
+                "PDF is likely scanned/image-based."
+            )
+        }
+    
+    # Strip page furniture and references, then limit the text
+    cleaned = clean_page_lines(pages, strip_references=settings.STRIP_REFERENCES)
+    extracted_text = cleaned["text"]
+    
+    # Limit to ~100,000 characters to manage context
+    if len(extracted_text) > MAX_CHARS:
+        extracted_text = extracted_text[:MAX_CHARS] + "\n\n[Text truncated due to length...]"
+    
+    # Check if we actually got meaningful text
+    if len(extracted_text.strip()) < MIN_TEXT_CHARS:
+        return {
+            "status": "error",
+            "text": None,
+            "page_count": page_count,
+            "message": "PDF text extraction yielded very little text. PDF may be scanned/image-based."
+        }
+    
+    return {
+        "status": "success",
+        "text": extracted_text,
+        "page_count": page_count,
+        "pages_parsed": len(pages),
+        "chars_removed": cleaned["chars_removed"],
+        "references": cleaned["references"],
+        "message": (
+            f"Successfully extracted text from {len(pages)} pages "
+            f"({cleaned['chars_removed']} boilerplate characters removed)"
+        )
+    }
+
+
+def parse_pdf_bytes(pdf_data: bytes) -> Dict:
+    """
+    Extracts and cleans the text of a fully downloaded PDF.
+
+    Args:
+        pdf_data: Raw PDF bytes
+
+    Returns:
+        dict: fetch_pdf-style result, plus "references" (bibliography text)
+    """
+    pdf_bytes = io.BytesIO(pdf_data)
+    
+    try:
+        # Try PyMuPDF first (better quality, with layout information)
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        page_count = len(doc)
+        pages, image_only = _parse_lazily(page_count, lambda n: _pymupdf_page_lines(doc[n]))
+        doc.close()
+        
+    except Exception as pymupdf_error:
+        # Fallback to PyPDF2 if PyMuPDF fails
+        pdf_bytes.seek(0)  # Reset stream
+        pdf_reader = PyPDF2.PdfReader(pdf_bytes)
+        page_count = len(pdf_reader.pages)
+        pages, image_only = _parse_lazily(
+            page_count,
+            lambda n: _plain_page_lines(pdf_reader.pages[n].extract_text() or "")
+        )
+    
+    return _finish_extraction(pages, page_count, image_only)
+
+
+def parse_pdf_range(remote_file: HTTPRangeFile) -> Dict:
+    """
+    Extracts and cleans the text of a remote PDF without downloading all of it.
+
+    PyMuPDF needs the complete file in memory, so partial parsing goes through
+    PyPDF2, which resolves objects by seeking within the file.
+
+    Args:
+        remote_file: Seekable Range-backed view of the PDF
+
+    Returns:
+        dict: fetch_pdf-style result, plus "references" (bibliography text)
+    """
+    pdf_reader = PyPDF2.PdfReader(remote_file)
+    page_tree = pdf_reader.trailer["/Root"]["/Pages"]
+    page_count = int(page_tree.get("/Count", 0))
+    page_iterator = _iter_pages_lazily(pdf_reader, pdf_reader.trailer["/Root"].raw_get("/Pages"))
+    pages, image_only = _parse_lazily(
+        page_count,
+        lambda n: _plain_page_lines(next(page_iterator).extract_text() or "")
+    )
+    return _finish_extraction(pages, page_count, image_only)
+
+
+def parse_pdf_source(task: Dict) -> Dict:
+    """
+    Parsing entry point run inside a sandboxed worker.
+
+    Args:
+        task: {"data": bytes} for a downloaded PDF, or {"url", "size",
+              "prefix"} for a remote PDF to parse through Range requests
+
+    Returns:
+        dict: fetch_pdf-style result, plus "references" and, for remote
+              PDFs, "bytes_downloaded"
+    """
+    if "data" in task:
+        return parse_pdf_bytes(task["data"])
+
+    remote_file = HTTPRangeFile(task["url"], task["size"], REQUEST_HEADERS, prefix=task["prefix"])
+    try:
+        try:
+            result = parse_pdf_range(remote_file)
+        except Exception:
+            # Unusual structure - fetch the missing bytes and parse the whole file
+            remote_file.seek(0)
+            result = parse_pdf_bytes(remote_file.read())
+        result["bytes_downloaded"] = remote_file.bytes_downloaded
+        return result
+    finally:
+        remote_file.close()
+
+
+_parse_pool: ParseWorkerPool | None = None
+_parse_pool_lock = threading.Lock()
+
+
+def _get_parse_pool() -> ParseWorkerPool:
+    """Returns the process-wide parse worker pool, creating it on first use"""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ParseWorkerPool(
+                parse_pdf_source,
+                size=settings.PARSE_WORKERS,
+                cpu_seconds=settings.PARSE_CPU_SECONDS,
+                memory_mb=settings.PARSE_MEMORY_MB,
+                timeout=settings.PARSE_TIMEOUT_SECONDS,
+                start_method=settings.PARSE_START_METHOD or default_start_method(),
+            )
+            atexit.register(_parse_pool.close)
+        return _parse_pool
+
+
+def resize_parse_pool(size: int) -> ParseWorkerPool:
+    """Sets the number of parse worker processes (extra workers start on demand)"""
+    pool = _get_parse_pool()
+    pool.size = max(1, size)
+    return pool
+
+
+def _parse(task: Dict) -> Dict:
+    """Parses in a sandboxed worker, or in-process when sandboxing is off"""
+    if settings.PARSE_SANDBOX:
+        return _get_parse_pool().parse(task)
+    return parse_pdf_source(task)
+
+
+# Page attributes a page inherits from its ancestors in the page tree
+INHERITABLE_PAGE_ATTRIBUTES = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+
+def _iter_pages_lazily(pdf_reader, node_reference, inherited: Dict | None = None):
+    """
+    Yields the pages of a PyPDF2 document in order, resolving page-tree
+    nodes only as they are reached.
+
+    pdf_reader.pages flattens the whole tree on first access, which touches
+    every page object - and therefore every region of a Range-backed file.
+    """
+    node = node_reference.get_object()
+    attributes = dict(inherited or {})
+    for key in INHERITABLE_PAGE_ATTRIBUTES:
+        if key in node:
+            attributes[key] = node.raw_get(key)
+
+    if "/Kids" in node:
+        for kid in node["/Kids"]:
+            yield from _iter_pages_lazily(pdf_reader, kid, attributes)
+        return
+
+    page = PageObject(
+        pdf_reader,
+        node_reference if isinstance(node_reference, IndirectObject) else None
+    )
+    page.update(node)
+    for key, value in attributes.items():
+        if key not in page:
+            page[NameObject(key)] = value
+    yield page
+
+
+def _pymupdf_page_lines(page) -> List[Line]:
+    """
+    Extracts the text lines of a PyMuPDF page, tagged with their page zone.
+
+    Uses the block/line/span structure so that margins, gutters and rotated
+    stamps can be told apart from body text.
+    """
+    width, height = page.rect.width, page.rect.height
+    lines = []
+    for block in page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT)["blocks"]:
+        for line in block.get("lines", []):
+            text = "".join(span["text"] for span in line["spans"]).strip()
+            if not text:
+                continue
+            x0, y0, x1, y1 = line["bbox"]
+            if abs(line["dir"][1]) > 0.1:
+                zone = "rotated"
+            elif y1 <= height * MARGIN_ZONE:
+                zone = "header"
+            elif y0 >= height * (1 - MARGIN_ZONE):
+                zone = "footer"
+            elif x1 <= width * GUTTER_ZONE or x0 >= width * (1 - GUTTER_ZONE):
+                zone = "gutter"
+            else:
+                zone = "body"
+            lines.append((text, zone))
+    return lines
+
+
+def _plain_page_lines(page_text: str) -> List[Line]:
+    """
+    Tags plain-text lines (PyPDF2 fallback). Without coordinates only the
+    first and last two lines of a page can be margin lines; they are tagged
+    "edge" and dropped only if they repeat across pages.
+    """
+    raw_lines = [line.strip() for line in page_text.splitlines() if line.strip()]
+    return [
+        (text, "edge" if index < 2 or index >= len(raw_lines) - 2 else "body")
+        for index, text in enumerate(raw_lines)
+    ]
+
+
+def _furniture_key(text: str) -> str:
+    """Normalizes a margin line so 'Page 3' and 'Page 4' compare equal"""
+    return re.sub(r"\d+", "#", " ".join(text.lower().split()))
+
+
+def _edge_key(text: str, page_index: int) -> str:
+    """
+    Furniture key of an edge line: a bare number only repeats when it counts
+    up with the pages, so a page number matches but a stray year does not
+    """
+    if LINE_NUMBER_PATTERN.match(text):
+        return f"page-number {int(text) - page_index}"
+    return _furniture_key(text)
+
+
+def clean_page_lines(pages: List[List[Line]], strip_references: bool = True) -> Dict:
+    """
+    Removes boilerplate from extracted page lines.
+
+    Drops running headers/footers repeated across pages, page numbers,
+    line-number gutters and arXiv side stamps ("edge" lines, whose margin
+    position is unknown, only when they repeat), joins words hyphenated
+    across line breaks and optionally cuts everything after the
+    References heading.
+
+    Args:
+        pages: One list of (text, zone) lines per page
+        strip_references: Cut the bibliography and anything after it
+
+    Returns:
+        dict: {
+            "text": cleaned body text (whitespace collapsed),
+            "references": text after the References heading ("" if none found),
+            "chars_removed": int, characters dropped versus the raw text
+        }
+    """
+    raw_chars = sum(len(" ".join(text.split())) + 1 for page in pages for text, _ in page)
+
+    # Margin lines that repeat on many pages are running headers/footers
+    furniture_counts = Counter()
+    for page_index, page in enumerate(pages):
+        furniture_counts.update({
+            _edge_key(text, page_index) if zone == "edge" else _furniture_key(text)
+            for text, zone in page if zone in ("header", "footer", "edge")
+        })
+    repeat_threshold = max(2, int(len(pages) * REPEATED_LINE_SHARE))
+    repeated = {key for key, count in furniture_counts.items() if count >= repeat_threshold}
+
+    body_lines = []
+    for page_index, page in enumerate(pages):
+        for text, zone in page:
+            if zone == "rotated" or ARXIV_STAMP_PATTERN.match(text):
+                continue
+            if zone == "gutter" and LINE_NUMBER_PATTERN.match(text):
+                continue
+            if zone in ("header", "footer"):
+                if PAGE_NUMBER_PATTERN.match(text) or _furniture_key(text) in repeated:
+                    continue
+            if zone == "edge" and _edge_key(text, page_index) in repeated:
+                continue
+            body_lines.append(text)
+
+    # Locate the bibliography; ignore headings in the first 30% (tables of contents)
+    references = ""
+    for index in range(len(body_lines) - 1, int(len(body_lines) * 0.3) - 1, -1):
+        if REFERENCES_HEADING_PATTERN.match(body_lines[index]):
+            references = "\n".join(body_lines[index + 1:])
+            if strip_references:
+                body_lines = body_lines[:index]
+            break
+
+    # Join words hyphenated across line breaks ("mecha-" + "nisms")
+    parts = []
+    for text in body_lines:
+        if parts and parts[-1].endswith("-") and parts[-1][-2:-1].isalpha() and text[:1].islower():
+            parts[-1] = parts[-1][:-1] + text
+        else:
+            parts.append(text)
+
+    text = " ".join(" ".join(parts).split())
+    return {
+        "text": text,
+        "references": references,
+        "chars_removed": max(0, raw_chars - len(text)),
+    }
+
+
+def _load_from_library(url: str) -> Dict | None:
+    """Returns a fetch_pdf result from the local library, or None on a miss"""
+    try:
+        # Imported lazily: storage.library itself depends on the tools package
+        from storage.library import get_library
+        library = get_library()
+        paper_id = library.find_by_url(url)
+        text = library.get_text(paper_id) if paper_id else None
+        if not text:
+            return None
+        return {
+            "status": "success",
+            "text": text,
+            "page_count": library.get_metadata(paper_id).get("page_count"),
+            "bytes_downloaded": 0,
+            "message": "Served from local paper library"
+        }
+    except Exception:
+        # The library is an optimization - never fail a fetch because of it
+        return None
+
+
+def _load_failure(url: str) -> Dict | None:
+    """Returns an error result for a URL known to fail permanently, or None"""
+    try:
+        from storage.fetch_failures import get_fetch_failures
+        record = get_fetch_failures().get(url)
+    except Exception:
+        return None
+    if record is None:
+        return None
+    return {
+        "status": "error",
+        "text": None,
+        "page_count": None,
+        "message": f"Skipped: failed before and will not be retried yet ({record['message']})"
+    }
+
+
+def _save_failure(url: str, message: str, status: int | None = None):
+    """Remembers a permanent failure of a URL in the negative cache"""
+    try:
+        from storage.fetch_failures import get_fetch_failures
+        get_fetch_failures().put(url, message, status)
+    except Exception:
+        pass
+
+
+def _save_http_failure(url: str, error: Exception):
+    """Remembers HTTP errors that retrying will not fix (paywall, 404, ...)"""
+    try:
+        from storage.fetch_failures import PERMANENT_STATUSES, get_fetch_failures
+        status = getattr(getattr(error, "response", None), "status_code", None)
+        if status in PERMANENT_STATUSES:
+            get_fetch_failures().put(url, f"HTTP {status}", status)
+    except Exception:
+        pass
+
+
+def _save_to_library(url: str, text: str, page_count: int):
+    """Files a freshly extracted paper in the local library"""
+    try:
+        from storage.library import get_library
+        paper_id = canonical_paper_id({"url": url})
+        get_library().add_document(paper_id, {"url": url, "page_count": page_count}, text)
+    except Exception:
+        pass
+
+
+def _record_references(url: str, references_text: str):
+    """Parses a paper's bibliography into the persistent citation graph"""
+    if not references_text:
+        return
+    try:
+        from storage.citation_graph import get_citation_graph
+        references = parse_references(references_text)
+        if references:
+            paper_id = canonical_paper_id({"url": url})
+            get_citation_graph().add_references(paper_id, {"url": url}, references)
+    except Exception:
+        pass
+
+
 # Test function for development
 if __name__ == "__main__":
     # Test with a known working paper (Attention Is All You Need)
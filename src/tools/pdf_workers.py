@@ -0,0 +1,267 @@
+"""
+Sandboxed PDF parsing workers for LitSynth
+
+PDFs come from untrusted sources. Parsing runs in a pool of reusable worker
+processes so that a malformed or adversarial file cannot stall or crash the
+review:
+
+    - address space (RLIMIT_AS) is capped when a worker starts
+    - CPU time (RLIMIT_CPU) is re-armed before every document
+    - the parent kills a worker that overruns the wall-clock limit
+    - crashed, killed or worn-out workers are replaced automatically
+
+Resource limits need the POSIX resource module; elsewhere only the
+wall-clock watchdog applies.
+"""
+
+import multiprocessing
+import signal
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Workers are replaced after this many documents to shed leaked memory
+MAX_TASKS_PER_WORKER = 200
+
+
+def _error(message: str) -> Dict:
+    return {
+        "status": "error",
+        "text": None,
+        "page_count": None,
+        "message": message
+    }
+
+
+def _apply_memory_limit(memory_bytes: int):
+    if resource is None or not memory_bytes:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        memory_bytes = min(memory_bytes, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, hard))
+
+
+def _arm_cpu_limit(cpu_seconds: int):
+    """Allows cpu_seconds more CPU time from now (RLIMIT_CPU is cumulative)"""
+    if resource is None or not cpu_seconds:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = used + cpu_seconds
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(conn, target: Callable, cpu_seconds: int, memory_bytes: int):
+    """Worker loop: receive a task, parse it under limits, send the result"""
+    _apply_memory_limit(memory_bytes)
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+
+        _arm_cpu_limit(cpu_seconds)
+        try:
+            result = target(task)
+        except MemoryError:
+            result = _error(f"PDF parsing aborted: exceeded {memory_bytes // (1024 * 1024)} MB memory limit")
+        except Exception as e:
+            result = _error(f"Unexpected error processing PDF: {str(e)}")
+        conn.send(result)
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.tasks = 0
+
+
+class ParseWorkerPool:
+    """
+    Pool of reusable, resource-limited parsing processes.
+
+    Args:
+        target: Module-level function run in the worker for each task
+        size: Number of worker processes
+        cpu_seconds: CPU time allowed per document
+        memory_mb: Address-space limit per worker
+        timeout: Wall-clock seconds allowed per document
+        start_method: multiprocessing start method ("fork", "spawn", ...)
+    """
+
+    def __init__(self, target: Callable, size: int, cpu_seconds: int, memory_mb: int,
+                 timeout: float, start_method: Optional[str] = None):
+        self.target = target
+        self.size = max(1, size)
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_mb * 1024 * 1024
+        self.timeout = timeout
+        self._context = multiprocessing.get_context(start_method)
+        if self._context.get_start_method() == "forkserver":
+            # Workers are forked with the parsing code already imported
+            self._context.set_forkserver_preload([target.__module__])
+
+        self._idle: List[_Worker] = []
+        self._started = 0
+        self._condition = threading.Condition()
+        self._closed = False
+
+        # Bumped from every thread that parses; guarded by their own lock
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "tasks": 0,
+            "timeouts": 0,
+            "crashes": 0,
+            "workers_started": 0,
+        }
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    @property
+    def stats(self) -> Dict:
+        """Snapshot of the task, timeout, crash and worker-start counters"""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.target, self.cpu_seconds, self.memory_bytes),
+            daemon=True,
+            name="litsynth-pdf-parser",
+        )
+        process.start()
+        child_conn.close()
+        self._count("workers_started")
+        return _Worker(process, parent_conn)
+
+    def _acquire(self) -> _Worker:
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Parse worker pool is closed")
+                while self._idle:
+                    worker = self._idle.pop()
+                    if worker.process.is_alive():
+                        return worker
+                    # Died while idle (e.g. killed externally)
+                    self._started -= 1
+                    worker.conn.close()
+                if self._started < self.size:
+                    self._started += 1
+                    break
+                self._condition.wait()
+        try:
+            return self._spawn()
+        except BaseException:
+            with self._condition:
+                self._started -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, worker: _Worker, healthy: bool):
+        if healthy and worker.tasks >= MAX_TASKS_PER_WORKER:
+            healthy = False
+            self._stop(worker)
+        with self._condition:
+            if healthy and not self._closed:
+                self._idle.append(worker)
+            else:
+                # A replacement is spawned lazily by the next _acquire
+                self._started -= 1
+            self._condition.notify()
+
+    @staticmethod
+    def _stop(worker: _Worker, kill: bool = False):
+        try:
+            if kill:
+                worker.process.kill()
+            else:
+                worker.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        worker.process.join(timeout=1)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join(timeout=1)
+        worker.conn.close()
+
+    def parse(self, task) -> Dict:
+        """
+        Runs one parsing task in a sandboxed worker.
+
+        Returns:
+            dict: The target's result, or an error dict when the worker
+                  timed out, crashed or hit a resource limit
+        """
+        worker = self._acquire()
+        worker.tasks += 1
+        self._count("tasks")
+        start = time.monotonic()
+
+        try:
+            worker.conn.send(task)
+            if worker.conn.poll(self.timeout):
+                result = worker.conn.recv()
+                self._release(worker, healthy=worker.process.is_alive())
+                return result
+
+            # Watchdog: the document overran its wall-clock budget
+            self._count("timeouts")
+            self._stop(worker, kill=True)
+            self._release(worker, healthy=False)
+            return _error(f"PDF parsing aborted: exceeded {self.timeout:.0f}s wall-clock limit")
+
+        except (EOFError, OSError, BrokenPipeError):
+            self._count("crashes")
+            worker.process.join(timeout=1)
+            exit_code = worker.process.exitcode
+            self._stop(worker, kill=True)
+            self._release(worker, healthy=False)
+            if exit_code is not None and -exit_code == getattr(signal, "SIGXCPU", None):
+                return _error(f"PDF parsing aborted: exceeded {self.cpu_seconds}s CPU limit")
+            return _error(
+                f"PDF parser crashed after {time.monotonic() - start:.1f}s (exit code {exit_code})"
+            )
+
+        except BaseException:
+            # Unpicklable task, KeyboardInterrupt, ...: the worker may be left
+            # mid-task, so it is killed - and its slot is always given back
+            self._stop(worker, kill=True)
+            self._release(worker, healthy=False)
+            raise
+
+    def close(self):
+        """Stops all idle workers; busy workers stop when their task returns"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for worker in idle:
+            self._stop(worker)
+
+
+def default_start_method() -> str:
+    """
+    forkserver where available, else spawn. The parent is multithreaded
+    (asyncio to_thread workers, the log queue listener), and a fork could
+    copy a lock held by one of those threads into the worker. forkserver
+    forks workers from a single-threaded server instead.
+    """
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
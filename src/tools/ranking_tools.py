@@ -0,0 +1,185 @@
+"""
+Local relevance ranking tools for LitSynth
+"""
+
+import math
+import re
+import time
+from collections import Counter
+from typing import Dict, List
+
+# Lowercase alphanumeric runs; punctuation and LaTeX noise are dropped
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Common English and academic filler words that carry no topical signal
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or our
+that the their this to was were which with we via using based towards toward
+paper study approach new novel
+""".split())
+
+# Per-field weights: a topic term in the title counts more than one in the venue
+FIELD_WEIGHTS = {
+    "title": 2.0,
+    "abstract": 1.0,
+    "venue": 0.5,
+}
+
+# Standard BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into lowercase search terms, dropping stopwords and single characters.
+
+    Args:
+        text: Any free text (topic, title, abstract snippet...)
+
+    Returns:
+        List[str]: Normalized terms in their original order
+    """
+    if not text:
+        return []
+    return [
+        term for term in TOKEN_PATTERN.findall(text.lower())
+        if len(term) > 1 and term not in STOPWORDS
+    ]
+
+
+def _candidate_terms(paper: Dict) -> Counter:
+    """Builds the weighted term-frequency vector of a candidate paper"""
+    weighted_tf = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        value = paper.get(field) or ""
+        if isinstance(value, list):
+            value = " ".join(str(v) for v in value)
+        for term in tokenize(str(value)):
+            weighted_tf[term] += weight
+    return weighted_tf
+
+
+def bm25_scores(query_terms: List[str], documents: List[Counter]) -> List[float]:
+    """
+    Scores term-frequency vectors against a query with Okapi BM25.
+
+    Scoring is term-at-a-time over a small inverted index, so the cost is
+    proportional to the postings of the query terms rather than to
+    (documents x vocabulary). Hundreds of candidates score in well under
+    a millisecond.
+
+    Args:
+        query_terms: Tokenized query
+        documents: One (weighted) term-frequency Counter per document
+
+    Returns:
+        List[float]: BM25 score per document, in input order
+    """
+    doc_count = len(documents)
+    scores = [0.0] * doc_count
+    if doc_count == 0 or not query_terms:
+        return scores
+
+    lengths = [sum(doc.values()) for doc in documents]
+    avg_length = (sum(lengths) / doc_count) or 1.0
+
+    # Inverted index restricted to the query vocabulary
+    query_vocab = set(query_terms)
+    postings = {term: [] for term in query_vocab}
+    for doc_index, doc in enumerate(documents):
+        for term in query_vocab.intersection(doc):
+            postings[term].append(doc_index)
+
+    length_norms = [
+        BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length) for length in lengths
+    ]
+
+    for term, query_tf in Counter(query_terms).items():
+        doc_ids = postings[term]
+        if not doc_ids:
+            continue
+        # BM25+ style idf that stays positive for very common terms
+        idf = math.log(1 + (doc_count - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+        for doc_index in doc_ids:
+            tf = documents[doc_index][term]
+            scores[doc_index] += query_tf * idf * (tf * (BM25_K1 + 1)) / (tf + length_norms[doc_index])
+
+    return scores
+
+
+def rank_candidates(topic: str, candidates: List[Dict], top_k: int | None = None) -> Dict:
+    """
+    Ranks discovered candidate papers by BM25 relevance to the review topic.
+
+    Discovery over-fetches candidates; this ranker scores title, abstract
+    snippet and venue against the topic so that only the most relevant
+    papers go on to the expensive fetch-and-analyze phase.
+
+    Args:
+        topic: Research topic of the literature review
+        candidates: Paper metadata dicts as returned by PaperDiscoveryAgent
+        top_k: Number of papers to keep (default: keep all, ranked)
+
+    Returns:
+        dict: {
+            "status": "success" | "error",
+            "papers": List[dict] sorted by relevance, each with "relevance_score",
+            "candidate_count": int,
+            "elapsed_ms": float,
+            "message": str
+        }
+    """
+    start = time.perf_counter()
+    try:
+        documents = [_candidate_terms(paper) for paper in candidates]
+        scores = bm25_scores(tokenize(topic), documents)
+
+        # Stable sort keeps discovery order among equally relevant papers
+        order = sorted(range(len(candidates)), key=lambda i: -scores[i])
+        if top_k is not None:
+            order = order[:top_k]
+
+        ranked = []
+        for index in order:
+            paper = dict(candidates[index])
+            paper["relevance_score"] = round(scores[index], 4)
+            ranked.append(paper)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return {
+            "status": "success",
+            "papers": ranked,
+            "candidate_count": len(candidates),
+            "elapsed_ms": elapsed_ms,
+            "message": f"Ranked {len(candidates)} candidates, kept {len(ranked)}"
+        }
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "papers": list(candidates[:top_k] if top_k is not None else candidates),
+            "candidate_count": len(candidates),
+            "elapsed_ms": (time.perf_counter() - start) * 1000,
+            "message": f"Error ranking candidates: {str(e)}"
+        }
+
+
+# Test function for development
+if __name__ == "__main__":
+    print("Testing candidate ranker...")
+
+    candidates = [
+        {"title": "Deep Residual Learning for Image Recognition", "venue": "CVPR",
+         "abstract": "Residual networks ease the training of very deep convolutional networks."},
+        {"title": "Attention Is All You Need", "venue": "NeurIPS",
+         "abstract": "The Transformer relies entirely on self-attention mechanisms."},
+        {"title": "Efficient Transformers: A Survey", "venue": "ACM Computing Surveys",
+         "abstract": "A survey of efficient attention mechanisms in transformer models."},
+    ] * 100
+
+    result = rank_candidates("attention mechanisms in transformer models", candidates, top_k=3)
+    print(f"Status: {result['status']}")
+    print(f"Ranked {result['candidate_count']} candidates in {result['elapsed_ms']:.2f} ms")
+    for paper in result["papers"]:
+        print(f"  {paper['relevance_score']:.3f}  {paper['title']}")
@@ -0,0 +1,181 @@
+"""
+Reference list parsing tools for LitSynth
+"""
+
+import re
+from typing import Dict, List
+
+from .citation_tools import DOI_PATTERN
+
+# "[12] Vaswani, A. ..." style markers
+BRACKET_MARKER = re.compile(r"(?:^|\s)\[(\d{1,3})\]\s+")
+
+# "12. Vaswani, A. ..." style line starts
+NUMBERED_LINE = re.compile(r"^(\d{1,3})\.\s+\S")
+
+# A line that opens an author-year entry: "Vaswani, A." / "Vaswani A," / "A. Vaswani"
+AUTHOR_LINE_START = re.compile(r"^([A-Z][A-Za-z'\-]+,?\s+[A-Z]\.|[A-Z]\.\s*(?:[A-Z]\.\s*)?[A-Z][a-z])")
+
+YEAR_PATTERN = re.compile(r"\b(19[5-9]\d|20[0-4]\d)[a-z]?\b")
+ARXIV_REFERENCE_PATTERN = re.compile(
+    r"(?:arXiv[:\s]*|arxiv\.org/(?:abs|pdf)/)(\d{4}\.\d{4,5})(?:v\d+)?",
+    re.IGNORECASE
+)
+URL_PATTERN = re.compile(r"https?://\S+")
+QUOTED_TITLE = re.compile(r"[“\"]([^”\"]{10,300})[”\"]")
+
+# Sentence boundary that is not an author initial ("A. Vaswani")
+SEGMENT_BOUNDARY = re.compile(r"(?<!\b[A-Z])\.\s+(?=[A-Z0-9“\"]|arXiv)")
+
+# Any sentence boundary; used when initials close the author list ("Doe A. Title")
+LOOSE_SEGMENT_BOUNDARY = re.compile(r"\.\s+(?=[A-Z0-9“\"]|arXiv)")
+
+# Entries longer than this are almost certainly mis-split prose
+MAX_ENTRY_CHARS = 1000
+
+MIN_TITLE_WORDS = 3
+
+
+def split_reference_entries(text: str) -> List[str]:
+    """
+    Splits a bibliography into one string per entry.
+
+    Handles bracketed ([1]) and numbered (1.) lists, and falls back to
+    author-year lists where each entry starts with an author name on a
+    new line after a line ending in a period.
+    """
+    if not text or not text.strip():
+        return []
+
+    if len(BRACKET_MARKER.findall(text)) >= 3:
+        entries = BRACKET_MARKER.split(text)
+        # re.split keeps the captured numbers at odd positions
+        return [" ".join(entry.split()) for entry in entries[2::2] if entry.strip()]
+
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    numbered = sum(1 for line in lines if NUMBERED_LINE.match(line))
+
+    entries: List[str] = []
+    for line in lines:
+        if numbered >= 3:
+            starts_entry = bool(NUMBERED_LINE.match(line))
+            if starts_entry:
+                line = NUMBERED_LINE.sub(lambda m: m.group(0)[-1], line, count=1)
+        else:
+            starts_entry = bool(AUTHOR_LINE_START.match(line)) and (
+                not entries or entries[-1].rstrip().endswith(".")
+            )
+        if starts_entry or not entries:
+            entries.append(line)
+        elif entries[-1].endswith("-") and line[:1].islower():
+            entries[-1] = entries[-1][:-1] + line
+        else:
+            entries[-1] += " " + line
+
+    return [" ".join(entry.split()) for entry in entries]
+
+
+def parse_reference(entry: str) -> Dict | None:
+    """
+    Extracts structured fields from one bibliography entry.
+
+    Args:
+        entry: A single reference, e.g. "A. Vaswani, N. Shazeer. Attention is
+               all you need. NeurIPS, 2017."
+
+    Returns:
+        dict | None: {"title", "authors", "year", "arxiv_id", "doi", "url"},
+                     or None when no usable title or identifier is found
+    """
+    if not entry or len(entry) > MAX_ENTRY_CHARS:
+        return None
+
+    year_match = YEAR_PATTERN.search(entry)
+    arxiv_match = ARXIV_REFERENCE_PATTERN.search(entry)
+    doi_match = DOI_PATTERN.search(entry)
+    url_match = URL_PATTERN.search(entry)
+
+    # Title: a quoted title if present, else the first long segment after the authors
+    authors_segment = ""
+    title = ""
+    quoted = QUOTED_TITLE.search(entry)
+    if quoted:
+        title = quoted.group(1).strip().rstrip(",.")
+        authors_segment = entry[:quoted.start()]
+    else:
+        for boundary in (SEGMENT_BOUNDARY, LOOSE_SEGMENT_BOUNDARY):
+            segments = [segment.strip() for segment in boundary.split(entry) if segment.strip()]
+            if not segments:
+                continue
+            authors_segment = segments[0]
+            for segment in segments[1:]:
+                # Skip bare "(2017)" year segments and venue segments
+                if (len(segment.split()) >= MIN_TITLE_WORDS
+                        and not segment.lower().startswith(("in ", "proc", "arxiv"))):
+                    title = segment
+                    break
+            if title:
+                break
+
+    title = YEAR_PATTERN.sub("", title) if title.startswith("(") else title
+    title = title.strip(" .,()")
+
+    authors = [
+        name.strip(" .,")
+        for name in re.split(r",\s*(?:and\s+)?|\s+and\s+|;\s*|\s*&\s*", YEAR_PATTERN.sub("", authors_segment))
+        if len(name.strip(" .,()")) > 1
+    ][:10]
+
+    arxiv_id = arxiv_match.group(1) if arxiv_match else None
+    doi = doi_match.group(1).rstrip(".,") if doi_match else None
+    if arxiv_id:
+        url = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
+    elif url_match:
+        url = url_match.group(0).rstrip(".,")
+    elif doi:
+        url = f"https://doi.org/{doi}"
+    else:
+        url = None
+
+    if len(title.split()) < MIN_TITLE_WORDS and not (arxiv_id or doi):
+        return None
+
+    return {
+        "title": title,
+        "authors": authors,
+        "year": int(year_match.group(1)) if year_match else None,
+        "arxiv_id": arxiv_id,
+        "doi": doi,
+        "url": url,
+    }
+
+
+def parse_references(text: str) -> List[Dict]:
+    """
+    Parses the bibliography text of a paper into structured references.
+
+    Args:
+        text: Text following the References heading (see clean_page_lines)
+
+    Returns:
+        List[dict]: Parsed references (see parse_reference), in list order
+    """
+    references = []
+    for entry in split_reference_entries(text):
+        parsed = parse_reference(entry)
+        if parsed is not None:
+            references.append(parsed)
+    return references
+
+
+# Test function for development
+if __name__ == "__main__":
+    print("Testing reference parser...")
+
+    bibliography = """[1] A. Vaswani, N. Shazeer, N. Parmar. Attention is all you need. In NeurIPS, 2017.
+[2] J. Devlin, M. Chang, K. Lee, K. Toutanova. BERT: Pre-training of deep bidirectional
+transformers for language understanding. arXiv:1810.04805, 2018.
+[3] Y. Tay, M. Dehghani. “Efficient transformers: A survey,” ACM Computing Surveys, 2022. doi:10.1145/3530811"""
+
+    for reference in parse_references(bibliography):
+        print(f"  {reference['year']} | {reference['title']} | {reference['authors'][:2]} | {reference['url']}")
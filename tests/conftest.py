@@ -0,0 +1,19 @@
+"""
+Shared test setup: puts src/ on the import path and points every LitSynth
+data directory at a throwaway location before any module reads settings.
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DATA_DIR = tempfile.mkdtemp(prefix="litsynth-tests-")
+atexit.register(shutil.rmtree, DATA_DIR, ignore_errors=True)
+os.environ["LITSYNTH_DATA_DIR"] = DATA_DIR
+os.environ["LITSYNTH_CONTEXT_CACHE"] = "local"
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+sys.path.insert(0, os.path.join(ROOT, "src"))
@@ -0,0 +1,82 @@
+"""Tests for the cross-run analysis cache (storage.analysis_cache)"""
+
+from storage.analysis_cache import COMPACTION_RATIO, AnalysisCache
+
+
+def line_count(cache: AnalysisCache) -> int:
+    with open(cache.path, "rb") as f:
+        return sum(1 for _ in f)
+
+
+def test_analyses_survive_a_reopen(tmp_path):
+    cache = AnalysisCache("v1", directory=str(tmp_path))
+    cache.put("arxiv:1706.03762", "Summary of the transformer paper")
+
+    reopened = AnalysisCache("v1", directory=str(tmp_path))
+
+    assert reopened.get("arxiv:1706.03762") == "Summary of the transformer paper"
+    assert reopened.get("arxiv:1810.04805") is None
+    assert reopened.stats()["hits"] == 1
+    assert reopened.stats()["misses"] == 1
+
+
+def test_other_versions_are_neither_served_nor_stored(tmp_path):
+    cache = AnalysisCache("v1", directory=str(tmp_path))
+    cache.put("a", "written by the configured model")
+    cache.put("b", "written by a fallback model", version="v2")
+    cache.put("c", "   ")
+
+    assert cache.get("b") is None
+    assert cache.get("c") is None
+    assert line_count(cache) == 1
+    assert AnalysisCache("v2", directory=str(tmp_path)).get("a") is None
+
+
+def test_version_bump_compacts_old_analyses_away(tmp_path):
+    old = AnalysisCache("v1", directory=str(tmp_path))
+    for i in range(10):
+        old.put(f"paper-{i}", f"old analysis {i}")
+
+    new = AnalysisCache("v2", directory=str(tmp_path))
+    new.put("paper-0", "new analysis 0")
+
+    assert line_count(new) == 1
+    assert AnalysisCache("v2", directory=str(tmp_path)).get("paper-0") == "new analysis 0"
+
+
+def test_rewrites_compact_automatically(tmp_path):
+    cache = AnalysisCache("v1", directory=str(tmp_path))
+    for i in range(COMPACTION_RATIO * 3):
+        cache.put("paper", f"analysis {i}")
+
+    assert line_count(cache) <= COMPACTION_RATIO
+    assert cache.get("paper") == f"analysis {COMPACTION_RATIO * 3 - 1}"
+
+
+def test_compaction_by_another_process_is_a_miss(tmp_path):
+    first = AnalysisCache("v1", directory=str(tmp_path))
+    first.put("a", "analysis of a")
+    first.put("b", "analysis of b")
+    second = AnalysisCache("v1", directory=str(tmp_path))
+    for i in range(COMPACTION_RATIO * 3):
+        second.put("a", f"rewrite {i}")
+
+    # first still remembers offsets from before second compacted the log; it
+    # may miss or read an older analysis of the paper, never another paper's
+    analyses_of_a = {None, "analysis of a", *(f"rewrite {i}" for i in range(COMPACTION_RATIO * 3))}
+    assert first.get("a") in analyses_of_a
+    assert first.get("b") in (None, "analysis of b")
+
+
+def test_torn_tail_is_repaired_before_appending(tmp_path):
+    cache = AnalysisCache("v1", directory=str(tmp_path))
+    cache.put("a", "analysis of a")
+    with open(cache.path, "ab") as f:
+        f.write(b'{"paper_id": "b", "vers')
+
+    reopened = AnalysisCache("v1", directory=str(tmp_path))
+    reopened.put("c", "analysis of c")
+
+    final = AnalysisCache("v1", directory=str(tmp_path))
+    assert final.get("a") == "analysis of a"
+    assert final.get("c") == "analysis of c"
@@ -0,0 +1,92 @@
+"""Tests for the per-host download circuit breaker (tools.circuit_breaker)"""
+
+import pytest
+
+from tools import circuit_breaker
+from tools.circuit_breaker import CircuitOpenError, HostCircuitBreaker
+
+URL = "https://slow.example.org/paper.pdf"
+OTHER_URL = "https://fine.example.org/paper.pdf"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def fail(breaker, url, times):
+    for _ in range(times):
+        breaker.before_request(url)
+        breaker.record(url, failed=True)
+
+
+def test_opens_after_threshold_consecutive_failures(clock):
+    breaker = HostCircuitBreaker(threshold=3, reset_seconds=60)
+
+    fail(breaker, URL, 2)
+    breaker.before_request(URL)
+    fail(breaker, URL, 1)
+
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_request(URL)
+    assert error.value.host == "slow.example.org"
+    assert breaker.stats() == {"open_hosts": ["slow.example.org"], "opened": 1, "rejected": 1}
+
+
+def test_circuits_are_per_host(clock):
+    breaker = HostCircuitBreaker(threshold=1, reset_seconds=60)
+
+    fail(breaker, URL, 1)
+
+    breaker.before_request(OTHER_URL)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(URL)
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = HostCircuitBreaker(threshold=3, reset_seconds=60)
+
+    fail(breaker, URL, 2)
+    breaker.record(URL, failed=False)
+    fail(breaker, URL, 2)
+
+    breaker.before_request(URL)
+
+
+def test_single_trial_after_reset_time(clock):
+    breaker = HostCircuitBreaker(threshold=1, reset_seconds=60)
+    fail(breaker, URL, 1)
+
+    clock[0] += 61
+    breaker.before_request(URL)  # the trial
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(URL)
+
+    breaker.record(URL, failed=False)
+    breaker.before_request(URL)
+    assert breaker.stats()["open_hosts"] == []
+
+
+def test_failed_trial_keeps_the_circuit_open(clock):
+    breaker = HostCircuitBreaker(threshold=1, reset_seconds=60)
+    fail(breaker, URL, 1)
+
+    clock[0] += 61
+    fail(breaker, URL, 1)
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(URL)
+    assert breaker.opened == 1
+
+
+def test_only_server_errors_and_throttling_count(clock):
+    breaker = HostCircuitBreaker(threshold=1, reset_seconds=60)
+
+    breaker.record_status(URL, 404)
+    breaker.before_request(URL)
+    breaker.record_status(URL, 429)
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(URL)
@@ -0,0 +1,56 @@
+"""Tests for the persistent citation graph (storage.citation_graph)"""
+
+import pytest
+
+from storage.citation_graph import COMPACTION_RATIO, CitationGraph
+from storage.library import fcntl
+
+SEED = {"title": "Attention Is All You Need", "url": "https://arxiv.org/abs/1706.03762"}
+REFERENCES = [
+    {"title": "Neural Machine Translation by Jointly Learning to Align and Translate", "year": 2015},
+    {"title": "Long Short-Term Memory", "year": 1997},
+]
+
+
+def neighbours(graph: CitationGraph, seed=SEED):
+    return sorted(paper["title"] for paper in graph.snowball([seed]))
+
+
+def test_references_survive_a_reopen(tmp_path):
+    graph = CitationGraph(str(tmp_path))
+    graph.add_references("url:seed", SEED, REFERENCES)
+    graph.close()
+
+    reopened = CitationGraph(str(tmp_path))
+
+    assert neighbours(reopened) == sorted(reference["title"] for reference in REFERENCES)
+
+
+def test_repeated_metadata_updates_are_compacted(tmp_path):
+    graph = CitationGraph(str(tmp_path))
+    graph.add_references("url:seed", SEED, REFERENCES)
+    for year in range(2017, 2017 + COMPACTION_RATIO * 3):
+        graph.update_metadata({**SEED, "doi": f"10.1000/seed.{year}"})
+    graph.close()
+
+    with open(graph.path, "rb") as f:
+        assert sum(1 for _ in f) <= COMPACTION_RATIO
+    reopened = CitationGraph(str(tmp_path))
+    assert neighbours(reopened) == sorted(reference["title"] for reference in REFERENCES)
+    # Every ID the seed was filed under still finds it
+    assert neighbours(reopened, {"paper_id": "url:seed"}) == neighbours(reopened)
+    assert neighbours(reopened, {"doi": "10.1000/seed.2017"}) == neighbours(reopened)
+
+
+@pytest.mark.skipif(fcntl is None, reason="the write lock needs fcntl")
+def test_second_process_opens_read_only(tmp_path):
+    writer = CitationGraph(str(tmp_path))
+    reader = CitationGraph(str(tmp_path))
+
+    reader.add_references("url:seed", SEED, REFERENCES)
+
+    assert not writer.read_only
+    assert reader.read_only
+    assert len(neighbours(reader)) == 2
+    writer.close()
+    assert neighbours(CitationGraph(str(tmp_path))) == []
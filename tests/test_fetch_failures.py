@@ -0,0 +1,48 @@
+"""Tests for the negative cache of failing PDF URLs (storage.fetch_failures)"""
+
+from storage.fetch_failures import COMPACTION_RATIO, FetchFailureCache
+
+URL = "https://example.org/paywalled.pdf"
+
+
+def test_failures_survive_a_reopen(tmp_path):
+    FetchFailureCache(str(tmp_path), ttl=60).put(URL, "HTTP 403", status=403)
+
+    record = FetchFailureCache(str(tmp_path), ttl=60).get(URL)
+
+    assert record["status"] == 403
+    assert record["message"] == "HTTP 403"
+
+
+def test_failures_expire(tmp_path):
+    FetchFailureCache(str(tmp_path), ttl=60).put(URL, "HTTP 404", status=404)
+
+    assert FetchFailureCache(str(tmp_path), ttl=-1).get(URL) is None
+
+
+def test_zero_ttl_disables_the_cache(tmp_path):
+    cache = FetchFailureCache(str(tmp_path), ttl=0)
+    cache.put(URL, "HTTP 404", status=404)
+
+    assert cache.get(URL) is None
+
+
+def test_repeated_failures_are_compacted(tmp_path):
+    cache = FetchFailureCache(str(tmp_path), ttl=60)
+    for _ in range(COMPACTION_RATIO * 3):
+        cache.put(URL, "HTTP 403", status=403)
+
+    with open(cache.path, "rb") as f:
+        assert sum(1 for _ in f) <= COMPACTION_RATIO
+
+
+def test_torn_tail_is_repaired_before_appending(tmp_path):
+    FetchFailureCache(str(tmp_path), ttl=60).put(URL, "HTTP 403", status=403)
+    with open(tmp_path / "failures.jsonl", "ab") as f:
+        f.write(b'{"url": "https://example.org/torn.pdf", "sta')
+
+    FetchFailureCache(str(tmp_path), ttl=60).put("https://example.org/gone.pdf", "HTTP 410", status=410)
+
+    final = FetchFailureCache(str(tmp_path), ttl=60)
+    assert final.get(URL)["status"] == 403
+    assert final.get("https://example.org/gone.pdf")["status"] == 410
@@ -0,0 +1,68 @@
+"""Tests for bulk ingest (ingest.ingest and its failure breakdown)"""
+
+import asyncio
+
+import ingest
+from records import Paper
+
+
+class FakeLibrary:
+    def __init__(self, known=()):
+        self.known = set(known)
+        self.filed = []
+
+    def find_by_url(self, url):
+        return f"url:{url}" if url in self.known else None
+
+    def get_metadata(self, paper_id):
+        return {"title": "Known paper"}
+
+    def update_metadata(self, metadata):
+        self.filed.append(metadata["url"])
+
+
+def _run(monkeypatch, library, fetch, urls, concurrency=2):
+    async def fake_fetch(url):
+        return fetch(url)
+
+    monkeypatch.setattr(ingest, "get_library", lambda: library)
+    monkeypatch.setattr(ingest, "afetch_pdf", fake_fetch)
+    papers = [Paper(title=f"Paper at {url}", url=url) for url in urls]
+    return asyncio.run(ingest.ingest(papers, concurrency=concurrency))
+
+
+def test_counts_fetched_skipped_and_failed(monkeypatch):
+    library = FakeLibrary(known={"https://a.org/known.pdf"})
+
+    def fetch(url):
+        if "missing" in url:
+            return {"status": "error", "message": "Failed to download PDF: 404 Client Error"}
+        return {"status": "success", "bytes_downloaded": 1000}
+
+    report = _run(monkeypatch, library, fetch,
+                  ["https://a.org/known.pdf", "https://a.org/new.pdf", "https://a.org/missing.pdf"])
+
+    assert (report.skipped, report.fetched, report.failed) == (1, 1, 1)
+    assert report.bytes_downloaded == 1000
+    assert report.failures == {"HTTP 404": 1}
+    assert library.filed == ["https://a.org/new.pdf"]
+
+
+def test_an_exception_fails_one_paper_not_the_run(monkeypatch):
+    def fetch(url):
+        if "broken" in url:
+            raise RuntimeError("parser pool closed")
+        return {"status": "success", "bytes_downloaded": 10}
+
+    urls = [f"https://a.org/{name}.pdf" for name in ("one", "broken", "two", "three")]
+    report = _run(monkeypatch, FakeLibrary(), fetch, urls, concurrency=1)
+
+    assert report.done == len(urls)
+    assert (report.fetched, report.failed) == (3, 1)
+    assert report.failures == {"ingest error (RuntimeError)": 1}
+
+
+def test_failure_categories():
+    assert ingest.failure_category("Request timed out. The PDF source may be slow or unavailable.") == "timeout"
+    assert ingest.failure_category("URL does not point to a PDF file. Content-Type: text/html") == "not a PDF"
+    assert ingest.failure_category("Ingest error: OSError: disk full") == "ingest error (OSError)"
@@ -0,0 +1,45 @@
+"""Tests for the persistent review-job queue (storage.jobs)"""
+
+from storage.jobs import COMPACTION_RATIO, JobStore
+
+
+def job(job_id: str, status: str = "queued", created: float = 0.0) -> dict:
+    return {"job_id": job_id, "status": status, "created": created, "topic": "graph neural networks"}
+
+
+def test_last_state_of_each_job_survives_a_restart(tmp_path):
+    store = JobStore(str(tmp_path))
+    store.save(job("a", created=1.0))
+    store.save(job("b", created=2.0))
+    store.save(job("a", "running", created=1.0))
+    store.save(job("b", "succeeded", created=2.0))
+
+    reopened = JobStore(str(tmp_path))
+
+    assert reopened.get("a")["status"] == "running"
+    assert [pending["job_id"] for pending in reopened.pending()] == ["a"]
+    assert reopened.count("succeeded") == 1
+
+
+def test_state_changes_are_compacted_on_restart(tmp_path):
+    store = JobStore(str(tmp_path))
+    for status in ["queued", "running"] * COMPACTION_RATIO + ["succeeded"]:
+        store.save(job("a", status))
+
+    reopened = JobStore(str(tmp_path))
+
+    with open(reopened.path, "rb") as f:
+        assert sum(1 for _ in f) == 1
+    assert reopened.get("a")["status"] == "succeeded"
+
+
+def test_torn_tail_is_repaired_before_appending(tmp_path):
+    JobStore(str(tmp_path)).save(job("a", created=1.0))
+    with open(tmp_path / "jobs.jsonl", "ab") as f:
+        f.write(b'{"job_id": "a", "status": "runn')
+
+    JobStore(str(tmp_path)).save(job("b", created=2.0))
+
+    final = JobStore(str(tmp_path))
+    assert final.get("a")["status"] == "queued"
+    assert [pending["job_id"] for pending in final.pending()] == ["a", "b"]
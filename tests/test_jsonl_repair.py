@@ -0,0 +1,63 @@
+"""Tests for torn-tail repair of append-only JSONL files (storage.runs)"""
+
+from storage.runs import JsonlArtifact, repair_torn_tail
+
+
+def write(path, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def read(path) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_torn_last_record_is_dropped(tmp_path):
+    path = tmp_path / "log.jsonl"
+    write(path, b'{"a": 1}\n{"b": 2}\n{"c": ')
+
+    assert repair_torn_tail(str(path)) is True
+    assert read(path) == b'{"a": 1}\n{"b": 2}\n'
+
+
+def test_complete_file_is_left_alone(tmp_path):
+    path = tmp_path / "log.jsonl"
+    write(path, b'{"a": 1}\n')
+
+    assert repair_torn_tail(str(path)) is False
+    assert read(path) == b'{"a": 1}\n'
+
+
+def test_empty_file_is_left_alone(tmp_path):
+    path = tmp_path / "log.jsonl"
+    write(path, b"")
+
+    assert repair_torn_tail(str(path)) is False
+
+
+def test_file_with_only_a_torn_record_is_emptied(tmp_path):
+    path = tmp_path / "log.jsonl"
+    write(path, b'{"never finished": ')
+
+    assert repair_torn_tail(str(path)) is True
+    assert read(path) == b""
+
+
+def test_torn_record_longer_than_the_scan_window(tmp_path):
+    path = tmp_path / "log.jsonl"
+    write(path, b'{"a": 1}\n{"text": "' + b"x" * 200_000)
+
+    assert repair_torn_tail(str(path)) is True
+    assert read(path) == b'{"a": 1}\n'
+
+
+def test_artifact_appends_after_a_torn_tail(tmp_path):
+    path = tmp_path / "analyses.jsonl"
+    write(path, b'{"paper_id": "a"}\n{"paper_id": "b", "anal')
+
+    artifact = JsonlArtifact(str(path))
+    artifact.append({"paper_id": "c"})
+
+    assert len(artifact) == 2
+    assert [record["paper_id"] for record in JsonlArtifact(str(path))] == ["a", "c"]
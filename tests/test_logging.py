@@ -0,0 +1,37 @@
+"""Tests for LitSynth's logging setup (observability)"""
+
+import logging
+
+import observability
+
+
+def test_importing_litsynth_leaves_the_root_logger_alone(caplog):
+    root_handlers = list(logging.getLogger().handlers)
+
+    logger = observability.setup_logging()
+
+    assert logging.getLogger().handlers == root_handlers
+    assert logger.name == "LitSynth"
+    assert not logger.propagate
+    assert any(isinstance(handler, observability.ContextQueueHandler) for handler in logger.handlers)
+
+    with caplog.at_level(logging.INFO):
+        logging.getLogger("host.app").info("host record")
+    assert "host record" in caplog.text
+
+
+def test_command_line_entry_points_capture_the_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    try:
+        observability.capture_root_logging()
+
+        assert len(root.handlers) == 1
+        assert isinstance(root.handlers[0], observability.ContextQueueHandler)
+        assert root.level == observability.setup_logging().level
+    finally:
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in handlers:
+            root.addHandler(handler)
+        root.setLevel(level)
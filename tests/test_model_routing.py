@@ -0,0 +1,92 @@
+"""Tests for latency-budget tier selection (model_routing.ModelRouter)"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import model_routing
+from model_routing import ModelRouter
+
+CONFIG = {
+    "model": "standard-model",
+    "tiers": {
+        "fast": {"model": "fast-model"},
+        "standard": {"model": "standard-model"},
+        "strong": {"model": "strong-model"},
+    },
+    "agents": {"SynthesisAgent": {"tier": "strong"}},
+    "latency_budgets": {"synthesis": 100},
+}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(model_routing.time, "perf_counter", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def router(clock):
+    router = ModelRouter(CONFIG)
+    router.start_phase("synthesis")
+    return router
+
+
+def timed(router, tier, seconds):
+    for _ in range(model_routing.MIN_TIMING_SAMPLES):
+        router.record("SynthesisAgent", tier, seconds)
+
+
+def test_configured_tier_without_budget(clock):
+    router = ModelRouter(CONFIG)
+    router.start_phase("analysis")
+    timed(router, "strong", 1000)
+
+    assert router.select_tier("SynthesisAgent") == ("strong", False)
+
+
+def test_configured_tier_until_calls_are_timed(router):
+    assert router.select_tier("SynthesisAgent") == ("strong", False)
+
+
+def test_configured_tier_while_it_fits_the_budget(router, clock):
+    timed(router, "strong", 50)
+    clock[0] = 40
+
+    assert router.select_tier("SynthesisAgent") == ("strong", False)
+
+
+def test_falls_back_to_the_next_tier_that_fits(router, clock):
+    timed(router, "strong", 50)
+    timed(router, "standard", 20)
+    clock[0] = 70
+
+    assert router.select_tier("SynthesisAgent") == ("standard", True)
+
+
+def test_fastest_tier_once_the_budget_is_spent(router, clock):
+    clock[0] = 101
+
+    assert router.select_tier("SynthesisAgent") == ("fast", True)
+
+
+def test_fallback_runs_on_a_copy(router, clock):
+    agent = SimpleNamespace(name="SynthesisAgent", model="strong-model", tools=[])
+    agent.model_copy = lambda update: SimpleNamespace(**{**vars(agent), **update})
+    clock[0] = 101
+
+    routed, tier, fallback = router.route(agent)
+
+    assert (tier, fallback) == ("fast", True)
+    assert routed.model == "fast-model"
+    assert agent.model == "strong-model"
+    assert router.routed_model("SynthesisAgent", tier, fallback) == "fast-model"
+
+
+def test_search_grounded_agents_never_fall_back(router, clock):
+    agent = SimpleNamespace(name="SynthesisAgent", model="strong-model",
+                            tools=[SimpleNamespace(name="google_search")])
+    clock[0] = 101
+
+    assert router.route(agent) == (agent, "strong", False)
@@ -0,0 +1,43 @@
+"""Tests for paper identity (tools.citation_tools.canonical_paper_id)"""
+
+from tools.citation_tools import canonical_paper_id
+
+
+def test_doi_wins_and_is_normalized():
+    paper = {"doi": "10.1000/XYZ.123", "arxiv_id": "1706.03762", "title": "A title"}
+
+    assert canonical_paper_id(paper) == "doi:10.1000/xyz.123"
+
+
+def test_doi_in_url_drops_pdf_suffix():
+    paper = {"url": "https://aclanthology.org/doi/10.18653/v1/N19-1423.pdf"}
+
+    assert canonical_paper_id(paper) == "doi:10.18653/v1/n19-1423"
+
+
+def test_arxiv_id_without_version():
+    assert canonical_paper_id({"arxiv_id": "1706.03762v5"}) == "arxiv:1706.03762"
+    assert canonical_paper_id({"url": "https://arxiv.org/pdf/1706.03762v5.pdf"}) == "arxiv:1706.03762"
+
+
+def test_same_paper_from_different_sources_shares_an_id():
+    from_search = {"title": "Attention Is All You Need", "url": "https://arxiv.org/abs/1706.03762"}
+    from_library = {"title": "Attention is all you need.", "arxiv_id": "1706.03762v7"}
+
+    assert canonical_paper_id(from_search) == canonical_paper_id(from_library)
+
+
+def test_title_hash_ignores_case_and_punctuation():
+    first = canonical_paper_id({"title": "Deep Residual Learning: for Image Recognition"})
+    second = canonical_paper_id({"title": "deep residual learning for image recognition!"})
+
+    assert first.startswith("title:")
+    assert first == second
+
+
+def test_url_hash_as_last_resort():
+    first = canonical_paper_id({"url": "https://example.com/paper/"})
+    second = canonical_paper_id({"url": "HTTPS://EXAMPLE.COM/paper"})
+
+    assert first.startswith("url:")
+    assert first == second
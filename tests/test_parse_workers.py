@@ -0,0 +1,77 @@
+"""Tests for the sandboxed parse worker pool (tools.pdf_workers)"""
+
+import os
+import time
+
+import pytest
+
+from tools.pdf_workers import ParseWorkerPool, default_start_method
+
+
+def echo(task):
+    return {"status": "success", "text": task}
+
+
+def slow(task):
+    time.sleep(task)
+    return {"status": "success", "text": None}
+
+
+def crash(task):
+    os._exit(3)
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(target, size=1, timeout=10):
+        pool = ParseWorkerPool(target, size=size, cpu_seconds=0, memory_mb=0, timeout=timeout,
+                               start_method=default_start_method())
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def test_workers_are_reused(make_pool):
+    pool = make_pool(echo)
+
+    assert pool.parse("first")["text"] == "first"
+    assert pool.parse("second")["text"] == "second"
+    assert pool.stats["workers_started"] == 1
+
+
+def test_overrunning_worker_is_killed(make_pool):
+    pool = make_pool(slow, timeout=0.5)
+
+    result = pool.parse(30)
+
+    assert result["status"] == "error"
+    assert "wall-clock" in result["message"]
+    assert pool.stats["timeouts"] == 1
+    assert pool.parse(0)["status"] == "success"
+
+
+def test_crashed_worker_is_replaced(make_pool):
+    pool = make_pool(crash)
+
+    result = pool.parse("anything")
+
+    assert result["status"] == "error"
+    assert "exit code 3" in result["message"]
+    assert pool.stats["crashes"] == 1
+    assert pool._started == 0
+
+
+def test_failed_send_gives_the_slot_back(make_pool):
+    pool = make_pool(echo, size=1)
+
+    for _ in range(3):
+        with pytest.raises(Exception):
+            pool.parse(lambda: "cannot be pickled")
+
+    assert pool._started == 0
+    assert pool.parse("after")["text"] == "after"
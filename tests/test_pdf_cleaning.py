@@ -0,0 +1,93 @@
+"""Tests for page boilerplate removal (tools.pdf_tools.clean_page_lines)"""
+
+from tools.pdf_tools import _plain_page_lines, clean_page_lines
+
+
+def body(text):
+    return (text, "body")
+
+
+def test_repeated_headers_and_page_numbers_are_dropped():
+    pages = [
+        [("Journal of Tests, Vol. 3", "header"), body(f"Body text of page {i}."), (str(i + 1), "footer")]
+        for i in range(4)
+    ]
+
+    result = clean_page_lines(pages)
+
+    assert result["text"] == " ".join(f"Body text of page {i}." for i in range(4))
+    assert result["chars_removed"] > 0
+
+
+def test_single_header_is_kept():
+    pages = [[("A one-off heading", "header"), body("First page.")], [body("Second page.")], [body("Third.")]]
+
+    assert clean_page_lines(pages)["text"].startswith("A one-off heading")
+
+
+def test_rotated_stamps_and_gutter_line_numbers_are_dropped():
+    pages = [[
+        ("arXiv:1706.03762v5 [cs.CL] 6 Dec 2017", "body"),
+        ("Sideways watermark", "rotated"),
+        ("12", "gutter"),
+        body("Actual content."),
+    ]]
+
+    assert clean_page_lines(pages)["text"] == "Actual content."
+
+
+def test_hyphenated_words_are_joined():
+    pages = [[body("attention mecha-"), body("nisms work")]]
+
+    assert clean_page_lines(pages)["text"] == "attention mechanisms work"
+
+
+def test_references_are_split_off():
+    lines = [body(f"Sentence {i}.") for i in range(10)]
+    lines += [body("References"), body("[1] A. Author. A paper. 2020.")]
+
+    result = clean_page_lines([lines])
+
+    assert "References" not in result["text"]
+    assert result["text"].endswith("Sentence 9.")
+    assert result["references"] == "[1] A. Author. A paper. 2020."
+
+
+def test_references_can_be_kept():
+    lines = [body(f"Sentence {i}.") for i in range(10)] + [body("References"), body("[1] Cited.")]
+
+    result = clean_page_lines([lines], strip_references=False)
+
+    assert result["text"].endswith("References [1] Cited.")
+    assert result["references"] == "[1] Cited."
+
+
+def test_plain_pages_tag_first_and_last_lines_as_edge():
+    lines = _plain_page_lines("Header\nSecond\nMiddle\nPenultimate\n7\n")
+
+    assert [zone for _, zone in lines] == ["edge", "edge", "body", "edge", "edge"]
+
+
+def test_plain_page_numbers_counting_up_are_dropped():
+    words = ["alpha", "beta", "gamma", "delta"]
+    pages = [_plain_page_lines(f"Running title\nopening {word}\nbody {word}\nclosing {word}\n{i + 1}")
+             for i, word in enumerate(words)]
+
+    text = clean_page_lines(pages)["text"]
+
+    assert "Running title" not in text
+    assert not any(character.isdigit() for character in text)
+    for word in words:
+        assert f"opening {word} body {word} closing {word}" in text
+
+
+def test_plain_edge_lines_that_do_not_repeat_are_kept():
+    # A year at the edge of one page is content, not a page number
+    words = ["alpha", "beta", "gamma", "delta"]
+    pages = [_plain_page_lines(f"opening {word}\nbody {word}\nclosing {word}\n{i + 1}")
+             for i, word in enumerate(words)]
+    pages[0].insert(0, ("2017", "edge"))
+
+    text = clean_page_lines(pages)["text"]
+
+    assert text.startswith("2017 opening alpha")
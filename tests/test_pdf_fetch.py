@@ -0,0 +1,80 @@
+"""Tests for downloading papers through fetch_pdf/afetch_pdf (tools.pdf_tools)"""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fitz
+import pytest
+
+from tools.pdf_tools import afetch_pdf, fetch_pdf
+
+
+def _make_pdf() -> bytes:
+    doc = fitz.open()
+    for number in range(3):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(72, 72, 540, 770),
+                            f"Section {number}. " + "Attention layers relate every token to every other. " * 20)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+PDF = _make_pdf()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/paper"):
+            body, content_type = PDF, "application/pdf"
+        else:
+            body, content_type = b"<html>Sign in to read</html>", "text/html"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_second_fetch_is_served_from_the_library(base_url):
+    first = fetch_pdf(f"{base_url}/paper?id=library")
+    second = fetch_pdf(f"{base_url}/paper?id=library")
+
+    assert first["status"] == "success"
+    assert first["bytes_downloaded"] == len(PDF)
+    assert second["text"] == first["text"]
+    assert second["bytes_downloaded"] == 0
+    assert second["message"] == "Served from local paper library"
+
+
+def test_landing_pages_are_reported_not_parsed(base_url):
+    result = fetch_pdf(f"{base_url}/landing?id=html")
+
+    assert result["status"] == "error"
+    assert "does not point to a PDF" in result["message"]
+    assert fetch_pdf(f"{base_url}/landing?id=html")["message"].startswith("Skipped")
+
+
+def test_sync_wrapper_works_inside_an_event_loop(base_url):
+    async def call_both():
+        return fetch_pdf(f"{base_url}/paper?id=loop"), await afetch_pdf(f"{base_url}/paper?id=loop")
+
+    synchronous, asynchronous = asyncio.run(call_both())
+
+    assert synchronous["status"] == "success"
+    assert asynchronous["text"] == synchronous["text"]
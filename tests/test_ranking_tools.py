@@ -0,0 +1,60 @@
+"""Tests for BM25 candidate ranking (tools.ranking_tools.rank_candidates)"""
+
+from tools.ranking_tools import rank_candidates
+
+CANDIDATES = [
+    {"title": "Deep Residual Learning for Image Recognition", "venue": "CVPR",
+     "abstract": "Residual networks ease the training of very deep convolutional networks."},
+    {"title": "Attention Is All You Need", "venue": "NeurIPS",
+     "abstract": "The Transformer relies entirely on self-attention mechanisms."},
+    {"title": "Efficient Transformers: A Survey", "venue": "ACM Computing Surveys",
+     "abstract": "A survey of efficient attention mechanisms in transformer models."},
+]
+
+
+def test_most_relevant_candidate_first():
+    result = rank_candidates("attention mechanisms in transformer models", CANDIDATES)
+
+    assert result["status"] == "success"
+    assert result["candidate_count"] == 3
+    titles = [paper["title"] for paper in result["papers"]]
+    assert titles[0] == "Efficient Transformers: A Survey"
+    assert titles[-1] == "Deep Residual Learning for Image Recognition"
+
+
+def test_scores_are_descending_and_attached():
+    result = rank_candidates("attention transformer", CANDIDATES)
+
+    scores = [paper["relevance_score"] for paper in result["papers"]]
+    assert scores == sorted(scores, reverse=True)
+    assert scores[-1] == 0
+
+
+def test_top_k_keeps_best_only():
+    result = rank_candidates("attention transformer", CANDIDATES, top_k=1)
+
+    assert len(result["papers"]) == 1
+    assert result["candidate_count"] == 3
+
+
+def test_ties_keep_discovery_order():
+    candidates = [{"title": f"Unrelated paper {i}"} for i in range(5)]
+
+    result = rank_candidates("quantum chromodynamics", candidates)
+
+    assert [paper["title"] for paper in result["papers"]] == [paper["title"] for paper in candidates]
+
+
+def test_candidates_are_not_modified():
+    candidates = [dict(paper) for paper in CANDIDATES]
+
+    rank_candidates("attention", candidates)
+
+    assert candidates == CANDIDATES
+
+
+def test_no_candidates():
+    result = rank_candidates("attention", [])
+
+    assert result["status"] == "success"
+    assert result["papers"] == []
@@ -0,0 +1,88 @@
+"""Tests for the compact records and the JSONL line codec (records)"""
+
+import pytest
+
+from records import (UNKNOWN_AUTHOR, UNKNOWN_TITLE, UNKNOWN_VENUE, Analysis, Paper, dumps_line, loads_line,
+                     validate_citation_fields)
+
+def test_valid_citation_fields_pass_unchanged():
+    title, authors, year, venue, issues = validate_citation_fields(
+        "Attention Is All You Need", [" Ashish Vaswani ", "Noam Shazeer", ""], "2017", "NeurIPS"
+    )
+
+    assert issues == ()
+    assert title == "Attention Is All You Need"
+    assert authors == ("Ashish Vaswani", "Noam Shazeer")
+    assert year == 2017
+    assert venue == "NeurIPS"
+
+
+def test_unusable_citation_fields_get_placeholders():
+    title, authors, year, venue, issues = validate_citation_fields("Hi", [], 1066, "")
+
+    assert title == UNKNOWN_TITLE
+    assert authors == (UNKNOWN_AUTHOR,)
+    assert isinstance(year, int) and year != 1066
+    assert venue == UNKNOWN_VENUE
+    assert issues == (
+        "Title too short or missing",
+        "No authors provided",
+        "Invalid year: 1066",
+        "Venue missing or too short",
+    )
+
+
+def test_author_names_are_interned():
+    _, first, _, _, _ = validate_citation_fields("A long title", ["Geoffrey " + "Hinton"], 2012, "NIPS")
+    _, second, _, _, _ = validate_citation_fields("Another title", ["Geoffrey Hinton"], 2012, "NIPS")
+
+    assert first[0] is second[0]
+
+
+def test_paper_round_trip_keeps_unknown_keys():
+    data = {"title": "Attention Is All You Need", "authors": ["Ashish Vaswani"], "year": 2017,
+            "venue": "NeurIPS", "url": "https://arxiv.org/abs/1706.03762", "relevance_score": 1.5,
+            "snowball_score": 0.5}
+
+    paper = Paper.from_dict(data)
+
+    assert paper.authors == ("Ashish Vaswani",)
+    assert paper.get("snowball_score") == 0.5
+    assert paper.to_dict() == data
+
+
+def test_paper_keeps_years_written_as_text():
+    paper = Paper.from_dict({"title": "A title", "year": "circa 2017"})
+
+    assert paper.year is None
+    assert paper.get("year") == "circa 2017"
+    assert paper.to_dict()["year"] == "circa 2017"
+
+
+def test_analysis_round_trip():
+    data = {"index": 2, "paper_id": "arxiv:1706.03762",
+            "metadata": {"title": "Attention Is All You Need", "authors": ["Ashish Vaswani"], "year": 2017},
+            "analysis": "Summary: ..."}
+
+    analysis = Analysis.from_dict(data)
+
+    assert analysis.paper.title == "Attention Is All You Need"
+    assert analysis.to_dict() == data
+
+
+def test_lines_round_trip_unicode():
+    record = {"title": "Über Maschinen – 機械学習", "authors": ["Zoë"], "year": 2020}
+
+    line = dumps_line(record)
+
+    assert isinstance(line, bytes)
+    assert line.endswith(b"\n") and line.count(b"\n") == 1
+    assert loads_line(line) == record
+    assert loads_line(line.decode("utf-8")) == record
+
+
+def test_torn_line_raises_value_error():
+    line = dumps_line({"paper_id": "a", "analysis": "text"})
+
+    with pytest.raises(ValueError):
+        loads_line(line[:-5])
@@ -0,0 +1,46 @@
+"""Tests for the refinement phase (refine_draft)"""
+
+import asyncio
+
+from google.adk.events import Event
+from google.genai import types
+
+import agent
+
+DRAFT = "## Introduction\n" + "Attention relates every token to every other token. " * 20
+
+
+def _event(text: str = None, call: str = None) -> Event:
+    part = types.Part(function_call=types.FunctionCall(name=call, args={})) if call else types.Part(text=text)
+    return Event(author="RefinementAgent", content=types.Content(role="model", parts=[part]))
+
+
+def _refine(monkeypatch, events) -> str:
+    class FakeRunner:
+        def __init__(self, agent, session_service, app_name):
+            pass
+
+        async def run_async(self, user_id, session_id, new_message):
+            for event in events:
+                yield event
+
+    monkeypatch.setattr(agent, "Runner", FakeRunner)
+    return asyncio.run(agent.refine_draft("attention", DRAFT, "user", f"refine-{id(events)}"))
+
+
+def test_keeps_the_last_rewritten_draft(monkeypatch):
+    first = DRAFT + "\n## Research Gaps\nLong contexts remain costly."
+    second = first + "\n## Conclusion\nAttention is here to stay."
+
+    refined = _refine(monkeypatch, [
+        _event(call="evaluate_draft"), _event(first),
+        _event(call="evaluate_draft"), _event(second),
+    ])
+
+    assert refined == second
+
+
+def test_verdicts_do_not_replace_the_draft(monkeypatch):
+    refined = _refine(monkeypatch, [_event(call="evaluate_draft"), _event("Score 9/10, accepted as is.")])
+
+    assert refined == DRAFT
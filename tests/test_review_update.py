@@ -0,0 +1,79 @@
+"""Tests for incremental review updates (split_sections, merge_sections, plan_update)"""
+
+from agent import merge_sections, plan_update, split_sections
+from storage.runs import RunCheckpoint, new_run_id
+
+REVIEW = """# Literature Review
+
+Opening remarks.
+
+## Introduction
+Intro text.
+
+## Methods
+Methods text.
+
+## Conclusion
+Closing text.
+"""
+
+
+def test_split_sections_round_trips():
+    sections = split_sections(REVIEW)
+
+    assert [heading.strip() for heading, _ in sections] == [
+        "# Literature Review", "## Introduction", "## Methods", "## Conclusion"
+    ]
+    assert "".join(heading + body for heading, body in sections) == REVIEW
+
+
+def test_split_sections_keeps_text_before_the_first_heading():
+    sections = split_sections("Preamble.\n## Only\nBody.\n")
+
+    assert sections == [("", "Preamble.\n"), ("## Only\n", "Body.\n")]
+
+
+def test_merge_replaces_matching_sections_only():
+    merged, changed = merge_sections(REVIEW, "## methods\nNew methods text (Lee, 2024).\n")
+
+    # Matched by heading text; the review keeps its own heading line
+    assert changed == ["Methods"]
+    assert "## Methods\nNew methods text (Lee, 2024)." in merged
+    assert "Methods text." not in merged
+    assert "Intro text." in merged and "Closing text." in merged
+    assert merged.index("New methods") < merged.index("## Conclusion")
+
+
+def test_merge_adds_new_sections_before_the_last_one():
+    merged, changed = merge_sections(REVIEW, "## Open Problems\nUnsolved things.\n")
+
+    assert changed == ["Open Problems"]
+    assert merged.index("## Methods") < merged.index("## Open Problems") < merged.index("## Conclusion")
+    assert "Closing text." in merged
+
+
+def test_merge_without_revisions_keeps_the_review():
+    assert merge_sections(REVIEW, "No changes needed.") == (REVIEW, [])
+
+
+def test_plan_update_appends_only_new_papers():
+    previous = RunCheckpoint(new_run_id("update test"))
+    old_papers = [
+        {"title": "Attention Is All You Need", "arxiv_id": "1706.03762"},
+        {"title": "Deep Residual Learning", "doi": "10.1109/CVPR.2016.90"},
+    ]
+    previous.save_json("papers.json", {"papers": old_papers, "candidate_count": 2})
+    ranking = {
+        "papers": [
+            {"title": "Attention is all you need", "url": "https://arxiv.org/pdf/1706.03762v7"},
+            {"title": "Efficient Transformers: A Survey", "url": "https://arxiv.org/pdf/2009.06732"},
+        ],
+        "candidate_count": 12,
+    }
+
+    plan = plan_update(previous, ranking)
+
+    assert plan["papers"][:2] == old_papers
+    assert [paper["title"] for paper in plan["papers"][2:]] == ["Efficient Transformers: A Survey"]
+    assert plan["new_paper_ids"] == ["arxiv:2009.06732"]
+    assert plan["candidate_count"] == 12
@@ -0,0 +1,44 @@
+"""Tests for the discovery search-result cache (storage.search_cache)"""
+
+from storage.search_cache import SearchCache, normalize_query
+
+PAPERS = [{"title": f"Paper {i}", "url": f"https://example.org/{i}.pdf"} for i in range(5)]
+
+
+def test_reordered_queries_share_an_entry(tmp_path):
+    cache = SearchCache("v1", directory=str(tmp_path))
+    cache.put("Transformers for protein folding", 5, PAPERS)
+
+    assert normalize_query("protein folding, transformers") == normalize_query("Transformers for protein folding")
+    assert cache.get("protein folding transformers", 3) == PAPERS[:3]
+    assert cache.get("protein folding transformers", 10) is None
+
+
+def test_other_versions_are_not_stored(tmp_path):
+    cache = SearchCache("v1", directory=str(tmp_path))
+    cache.put("graph neural networks", 5, PAPERS, version="v2")
+
+    assert cache.get("graph neural networks", 5) is None
+    assert SearchCache("v1", directory=str(tmp_path)).get("graph neural networks", 5) is None
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = SearchCache("v1", directory=str(tmp_path), ttl=60)
+    cache.put("graph neural networks", 5, PAPERS)
+
+    reopened = SearchCache("v1", directory=str(tmp_path), ttl=-1)
+
+    assert reopened.get("graph neural networks", 5) is None
+
+
+def test_torn_tail_is_repaired_before_appending(tmp_path):
+    cache = SearchCache("v1", directory=str(tmp_path))
+    cache.put("graph neural networks", 5, PAPERS)
+    with open(cache.path, "ab") as f:
+        f.write(b'{"key": "torn", "vers')
+
+    SearchCache("v1", directory=str(tmp_path)).put("protein folding", 5, PAPERS)
+
+    final = SearchCache("v1", directory=str(tmp_path))
+    assert final.get("graph neural networks", 5) == PAPERS
+    assert final.get("protein folding", 5) == PAPERS
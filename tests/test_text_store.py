@@ -0,0 +1,76 @@
+"""Tests for segment compaction in storage.text_store.SegmentTextStore"""
+
+import os
+
+from storage import text_store
+from storage.text_store import SegmentTextStore
+
+
+def segment_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith(text_store.SEGMENT_PREFIX))
+
+
+def test_compaction_keeps_live_texts_and_drops_dead_bytes(tmp_path):
+    store = SegmentTextStore(str(tmp_path), segment_bytes=1000)
+    for i in range(20):
+        store.put(f"paper:{i}", f"text ü {i} " * 20)
+    store.put("paper:3", "replaced")
+    store.delete("paper:4")
+    store.rename("paper:5", "paper:five")
+    before = segment_files(str(tmp_path))
+
+    store.compact()
+
+    stats = store.stats()
+    assert stats["dead_bytes"] == 0
+    assert stats["compactions"] == 1
+    assert stats["live_bytes"] == sum(os.path.getsize(os.path.join(str(tmp_path), name))
+                                      for name in segment_files(str(tmp_path)))
+    assert not set(before) & set(segment_files(str(tmp_path)))
+    assert store.get("paper:3") == "replaced"
+    assert store.get("paper:4") is None
+    assert store.get("paper:five") == "text ü 5 " * 20
+    assert store.get("paper:19") == "text ü 19 " * 20
+
+
+def test_compacted_store_reopens_with_the_same_texts(tmp_path):
+    store = SegmentTextStore(str(tmp_path), segment_bytes=1000)
+    for i in range(10):
+        store.put(f"paper:{i}", f"body {i} " * 30)
+    store.delete("paper:0")
+    store.compact()
+    store.put("paper:10", "written after compaction")
+
+    reopened = SegmentTextStore(str(tmp_path), segment_bytes=1000)
+
+    assert len(reopened) == len(store) == 10
+    for i in range(1, 10):
+        assert reopened.get(f"paper:{i}") == f"body {i} " * 30
+    assert reopened.get("paper:10") == "written after compaction"
+    assert reopened.stats()["dead_bytes"] == 0
+
+
+def test_views_taken_before_compaction_stay_readable(tmp_path):
+    store = SegmentTextStore(str(tmp_path))
+    store.put("paper:1", "still readable")
+    view = store.get_view("paper:1")
+
+    store.compact()
+
+    try:
+        assert bytes(view) == b"still readable"
+    finally:
+        view.release()
+
+
+def test_rewrites_compact_automatically(tmp_path, monkeypatch):
+    monkeypatch.setattr(text_store, "COMPACTION_MIN_BYTES", 1000)
+    store = SegmentTextStore(str(tmp_path), segment_bytes=1000)
+
+    for _ in range(50):
+        store.put("paper:hot", "x" * 500)
+
+    stats = store.stats()
+    assert stats["compactions"] > 0
+    assert stats["dead_bytes"] <= text_store.COMPACTION_DEAD_SHARE * (stats["live_bytes"] + stats["dead_bytes"])
+    assert store.get("paper:hot") == "x" * 500